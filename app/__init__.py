@@ -2,31 +2,84 @@
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
+from werkzeug.utils import import_string
 from config import Config
 
-# Настройка логирования для SQLAlchemy
-import logging
-logging.basicConfig()
-logging.getLogger('sqlalchemy.engine').setLevel(logging.INFO)
-
-# Инициализация расширений Flask
+# Инициализация расширений Flask.
+# Flask-Migrate (alembic), Flask-RESTful, WTForms и модули разделов импортируются
+# внутри create_app: процессы без веб-интерфейса (воркеры, скрипты) их не загружают.
 db = SQLAlchemy()
 login_manager = LoginManager()
 
 
-def create_app(config_class=Config):
-    # Создание и настройка приложения Flask
+def create_app(config_class=Config, web=True, migrations=None):
+    """
+    Создание и настройка приложения Flask.
+
+    web=False — приложение для скриптов и воркеров: только БД, модели и каталог,
+    без разделов, API, форм и обработчиков запросов.
+    migrations — подключить Flask-Migrate сразу; скриптам, вызывающим stamp(), нужно True.
+    По умолчанию веб-приложение подключает его при первом вызове `flask db`.
+    """
     app = Flask(__name__)
+    if isinstance(config_class, str):
+        config_class = import_string(config_class)
     app.config.from_object(config_class)
+    config_class.init_app(app)
 
     # Инициализация расширений с приложением
+    from app import database
+    database.configure_engine(app)
     db.init_app(app)
+    database.init_app(app, db)
+    from app import search
+    if migrations:
+        database.init_migrate(app, db, search.include_object)
+    elif migrations is None and web:
+        # `flask db` работает через веб-приложение, но alembic загружается только при вызове команды
+        app.cli.add_command(database.MigrateCommands(app, db, search.include_object))
+
+    # Пул хеширования паролей
+    from app import security
+    security.init_app(app)
+
+    # Снимок каталога заданий в памяти процесса
+    from app import catalog
+    catalog.init_app(app)
+
+    if web:
+        init_web(app)
+    return app
+
+
+def init_web(app):
+    """Веб-часть приложения: сессии, разделы, API и обработка запросов"""
     login_manager.init_app(app)
 
     # Настройка Flask-Login
     login_manager.login_view = 'auth.login'
     login_manager.login_message_category = 'info'
 
+    # Кэш пользователей сессии (загрузчик Flask-Login)
+    from app import user_cache
+    user_cache.init_app(app)
+
+    # Учет SQL-запросов по каждому HTTP-запросу (включается SQL_INSTRUMENTATION)
+    from app import instrumentation
+    instrumentation.init_app(app)
+
+    # Подсветка результатов полнотекстового поиска в шаблонах
+    from app import search
+    search.init_app(app)
+
+    # Байткод шаблонов на диске и кэш фрагментов каталога
+    from app import templating
+    templating.init_app(app)
+
+    # Сжатие ответов и статика с отпечатком содержимого
+    from app import assets
+    assets.init_app(app)
+
     # Регистрация модулей приложения
     from app.main import bp as main_bp
     from app.auth import bp as auth_bp
@@ -40,8 +93,6 @@ def create_app(config_class=Config):
     from app.api import api
     api.init_app(app)
 
-    return app
-
 
 # Импорт моделей в конце для избежания циклических импортов
-from app import models
\ No newline at end of file
+from app import models
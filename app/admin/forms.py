@@ -18,6 +18,14 @@ class FeedbackForm(FlaskForm):
     ])
     submit = SubmitField('Отправить отзыв')
 
+class QueueActionForm(FlaskForm):
+    """Пустая форма для действий с очередью проверки (защита от CSRF)"""
+    submit = SubmitField('Взять решения')
+
+class GradePendingForm(FlaskForm):
+    """Запуск пакетной автоматической проверки фоновой задачей"""
+    submit = SubmitField('Проверить накопившиеся решения')
+
 class TaskForm(FlaskForm):
     """Форма для создания и редактирования заданий"""
     category = SelectField('Категория', coerce=int, validators=[DataRequired()])
@@ -25,6 +33,10 @@ class TaskForm(FlaskForm):
         DataRequired(),
         Length(min=10, max=1000, message='Содержание задания должно быть от 10 до 1000 символов')
     ])
+    answer_key = StringField('Ключ ответа (варианты через |)', validators=[
+        Optional(),
+        Length(max=1000)
+    ])
     submit = SubmitField('Добавить задание')
 
     def validate_task_number(self, field):
@@ -0,0 +1,99 @@
+"""
+Очередь проверки решений. Преподаватель берет в работу (арендует) следующие
+непроверенные решения в порядке отправки; пока аренда не истекла, другим они
+не выдаются. Просроченная аренда освобождается сама: такие решения снова
+попадают в выборку.
+"""
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import select, update, or_, and_
+
+from app import db
+from app.database import claim_rows
+from app.models import Solution
+from app.progress import record_review
+
+
+def claimable(now):
+    """Условие: решение не проверено и не арендовано (или аренда истекла)"""
+    return and_(Solution.is_reviewed == False,
+                or_(Solution.claim_expires_at.is_(None), Solution.claim_expires_at <= now))
+
+
+def held_by(reviewer_id, now):
+    """Условие: решение арендовано преподавателем и аренда действует"""
+    return and_(Solution.is_reviewed == False,
+                Solution.claimed_by == reviewer_id,
+                Solution.claim_expires_at > now)
+
+
+def free_for(reviewer_id, now):
+    """Условие: решение не арендовано другим преподавателем (или его аренда истекла)"""
+    return or_(Solution.claimed_by.is_(None), Solution.claimed_by == reviewer_id,
+               Solution.claim_expires_at.is_(None), Solution.claim_expires_at <= now)
+
+
+def claim_solutions(reviewer_id, limit, lease_seconds=None):
+    """
+    Атомарно арендует до limit старейших свободных решений и возвращает их id
+    в порядке (submitted_at, id). Два преподавателя не получат одно и то же решение.
+    """
+    if limit <= 0:
+        return []
+    now = datetime.utcnow()
+    lease = lease_seconds or current_app.config['REVIEW_LEASE_SECONDS']
+    claimed = claim_rows(db.session, Solution, claimable(now), [Solution.submitted_at, Solution.id], limit,
+                         {'claimed_by': reviewer_id, 'claim_expires_at': now + timedelta(seconds=lease)})
+    db.session.commit()
+    return claimed
+
+
+def held_count(reviewer_id):
+    """Сколько решений преподаватель держит сейчас"""
+    return db.session.scalar(select(db.func.count()).select_from(Solution)
+                             .where(held_by(reviewer_id, datetime.utcnow())))
+
+
+def claim_next(reviewer_id):
+    """Добирает аренду преподавателя до REVIEW_CLAIM_BATCH решений"""
+    batch = current_app.config['REVIEW_CLAIM_BATCH']
+    return claim_solutions(reviewer_id, batch - held_count(reviewer_id))
+
+
+def release_solution(solution_id, reviewer_id):
+    """Возвращает решение в очередь; True, если оно было арендовано этим преподавателем"""
+    result = db.session.execute(
+        update(Solution)
+        .where(Solution.id == solution_id, Solution.claimed_by == reviewer_id)
+        .values(claimed_by=None, claim_expires_at=None),
+        execution_options={'synchronize_session': False},
+    )
+    db.session.commit()
+    return result.rowcount > 0
+
+
+def take_for_review(solution, reviewer_id):
+    """
+    Арендует решение перед сохранением отзыва (без commit). False — решение держит
+    другой преподаватель: отзыв не сохраняется. Аренда снимается в mark_reviewed.
+    """
+    now = datetime.utcnow()
+    lease = current_app.config['REVIEW_LEASE_SECONDS']
+    result = db.session.execute(
+        update(Solution)
+        .where(Solution.id == solution.id, free_for(reviewer_id, now))
+        .values(claimed_by=reviewer_id, claim_expires_at=now + timedelta(seconds=lease)),
+        execution_options={'synchronize_session': 'fetch'},
+    )
+    return result.rowcount > 0
+
+
+def mark_reviewed(solution, feedback):
+    """Сохраняет отзыв, снимает аренду и обновляет сводку студента (без commit)"""
+    record_review(solution)
+    solution.feedback = feedback
+    solution.is_reviewed = True
+    solution.reviewed_at = datetime.utcnow()
+    solution.claimed_by = None
+    solution.claim_expires_at = None
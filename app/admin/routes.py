@@ -1,10 +1,21 @@
-from flask import render_template, flash, redirect, url_for, request, abort
+from flask import render_template, flash, redirect, url_for, request, abort, current_app, jsonify
 from flask_login import login_required, current_user
 from datetime import datetime
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
 from app import db
 from app.admin import bp
-from app.admin.forms import TaskForm, FeedbackForm
-from app.models import Task, TaskCategory, Solution
+from app.admin.forms import TaskForm, FeedbackForm, QueueActionForm, GradePendingForm
+from app.admin.queue import claim_next, release_solution, held_by, take_for_review, mark_reviewed
+from app.catalog import get_catalog, with_content
+from app.jobs import enqueue
+from app.user_cache import get_user_cache
+from app.pagination import InvalidCursor, encode_cursor, decode_cursor, split_page, rows_after, \
+    decode_submission_cursor, submission_key
+from app.search import SCOPES, InvalidQuery, search as search_index
+from app.models import Task, Solution, User, Job
+
+HELD_BY_OTHER = 'Это решение сейчас проверяет другой преподаватель.'
 
 
 @bp.before_request
@@ -43,14 +54,19 @@ def solutions():
 @bp.route('/solution/<int:solution_id>', methods=['GET', 'POST'])
 def solution(solution_id):
     """Просмотр и оценка конкретного решения"""
-    solution = Solution.query.get_or_404(solution_id)
+    # Задание и студент загружаются тем же запросом, что и решение
+    solution = db.session.get(Solution, solution_id,
+                              options=[joinedload(Solution.task), joinedload(Solution.user)])
+    if solution is None:
+        abort(404)
     form = FeedbackForm()
 
     if form.validate_on_submit():
+        if not take_for_review(solution, current_user.id):
+            flash(HELD_BY_OTHER, 'warning')
+            return redirect(url_for('admin.solutions'))
         try:
-            solution.feedback = form.feedback.data
-            solution.is_reviewed = True
-            solution.reviewed_at = datetime.utcnow()
+            mark_reviewed(solution, form.feedback.data)
             solution.reviewed_by = current_user.id
             db.session.commit()
             flash('Отзыв успешно добавлен!', 'success')
@@ -62,15 +78,11 @@ def solution(solution_id):
     elif request.method == 'GET':
         form.feedback.data = solution.feedback
 
-    # Получаем связанные данные
-    task = Task.query.get(solution.task_id)
-    student = User.query.get(solution.user_id)
-
     return render_template('admin/solution.html',
                            title=f'Проверка решения #{solution.id}',
                            solution=solution,
-                           task=task,
-                           student=student,
+                           task=solution.task,
+                           student=solution.user,
                            form=form)
 
 
@@ -86,7 +98,7 @@ def users():
 @bp.route('/tasks')
 def tasks():
     """Список всех заданий с группировкой по категориям"""
-    tasks = Task.query.order_by(Task.category_id.asc(), Task.task_number.asc()).all()
+    tasks = get_catalog().tasks
     return render_template('admin/tasks.html',
                            title='Task Management',
                            tasks=tasks)
@@ -95,26 +107,179 @@ def tasks():
 @bp.route('/dashboard')
 @login_required
 def dashboard():
-    """Страница панели управления администратора"""
+    """
+    Страница панели управления администратора.
+    Сразу строится только сводка; списки заданий и решений подгружаются
+    отдельными запросами к фрагментам по мере открытия разделов.
+    """
     if not current_user.is_admin:
         flash('У вас нет доступа к этой странице.', 'danger')
         return redirect(url_for('main.index'))
     
-    tasks = Task.query.order_by(Task.category_id.asc(), Task.task_number.asc()).all()
-    categories = TaskCategory.query.all()
-    solutions = Solution.query.order_by(Solution.submitted_at.desc()).all()
+    catalog = get_catalog()
+    # Счетчики решений одним запросом по индексу (is_reviewed, submitted_at)
+    counts = dict(db.session.query(Solution.is_reviewed, func.count())
+                  .group_by(Solution.is_reviewed).all())
     
     form = TaskForm()
-    form.category.choices = [(c.id, c.name) for c in categories]
-    
-    feedback_form = FeedbackForm()
+    form.category.choices = [(c.id, c.name) for c in catalog.categories]
     
     return render_template('admin/dashboard.html',
                            title='Панель преподавателя',
-                           tasks=tasks,
+                           tasks_count=len(catalog.tasks),
+                           categories_count=len(catalog.categories),
+                           pending_count=counts.get(False, 0),
+                           reviewed_count=counts.get(True, 0),
+                           form=form)
+
+
+@bp.route('/dashboard/tasks')
+def dashboard_tasks():
+    """Фрагмент панели: очередная страница списка заданий"""
+    catalog = get_catalog()
+    limit = current_app.config['ADMIN_PAGE_SIZE']
+    try:
+        after = decode_cursor(request.args['cursor'], 3) if 'cursor' in request.args else None
+    except InvalidCursor:
+        abort(400)
+    tasks, next_cursor = split_page(catalog.tasks_after(after, limit + 1), limit,
+                                    lambda task: task.sort_key)
+    return render_template('admin/_dashboard_tasks.html',
+                           tasks=with_content(tasks),
+                           categories=catalog.categories_by_id,
+                           next_cursor=next_cursor)
+
+
+@bp.route('/dashboard/solutions/<any(pending, reviewed):state>')
+def dashboard_solutions(state):
+    """Фрагмент панели: очередная страница непроверенных или проверенных решений"""
+    limit = current_app.config['ADMIN_PAGE_SIZE']
+    # Шаблон обращается к solution.task и solution.user: грузим их одним JOIN
+    query = Solution.query \
+        .options(joinedload(Solution.task), joinedload(Solution.user)) \
+        .filter(Solution.is_reviewed == (state == 'reviewed'))
+    if 'cursor' in request.args:
+        try:
+            after = decode_submission_cursor(request.args['cursor'])
+        except InvalidCursor:
+            abort(400)
+        query = query.filter(rows_after([Solution.submitted_at, Solution.id], after, descending=True))
+    solutions = query.order_by(Solution.submitted_at.desc(), Solution.id.desc()).limit(limit + 1).all()
+    solutions, next_cursor = split_page(solutions, limit, submission_key)
+    return render_template('admin/_dashboard_solutions.html',
+                           state=state,
+                           solutions=solutions,
+                           next_cursor=next_cursor,
+                           feedback_form=FeedbackForm())
+
+
+@bp.route('/queue')
+def queue():
+    """Очередь проверки: решения, арендованные текущим преподавателем"""
+    limit = current_app.config['ADMIN_PAGE_SIZE']
+    query = Solution.query \
+        .options(joinedload(Solution.task), joinedload(Solution.user)) \
+        .filter(held_by(current_user.id, datetime.utcnow()))
+    if 'cursor' in request.args:
+        try:
+            after = decode_submission_cursor(request.args['cursor'])
+        except InvalidCursor:
+            abort(400)
+        query = query.filter(rows_after([Solution.submitted_at, Solution.id], after))
+    solutions = query.order_by(Solution.submitted_at, Solution.id).limit(limit + 1).all()
+    solutions, next_cursor = split_page(solutions, limit, submission_key)
+    return render_template('admin/queue.html',
+                           title='Очередь проверки',
                            solutions=solutions,
-                           form=form,
-                           feedback_form=feedback_form)
+                           next_cursor=next_cursor,
+                           action_form=QueueActionForm(),
+                           feedback_form=FeedbackForm())
+
+
+@bp.route('/queue/claim', methods=['POST'])
+def queue_claim():
+    """Взять в работу следующие решения из очереди"""
+    if QueueActionForm().validate_on_submit():
+        claimed = claim_next(current_user.id)
+        if claimed:
+            flash(f'Взято решений: {len(claimed)}', 'success')
+        else:
+            flash('Новых решений для проверки нет.', 'info')
+    return redirect(url_for('admin.queue'))
+
+
+@bp.route('/queue/release/<int:solution_id>', methods=['POST'])
+def queue_release(solution_id):
+    """Вернуть решение в общую очередь"""
+    if QueueActionForm().validate_on_submit() and not release_solution(solution_id, current_user.id):
+        abort(404)
+    return redirect(url_for('admin.queue'))
+
+
+@bp.route('/jobs')
+def jobs():
+    """Последние фоновые задачи: статус, прогресс и ошибки"""
+    limit = current_app.config['ADMIN_PAGE_SIZE']
+    query = Job.query
+    if 'cursor' in request.args:
+        try:
+            after_id = decode_cursor(request.args['cursor'], 1)[0]
+        except InvalidCursor:
+            abort(400)
+        query = query.filter(Job.id < after_id)
+    jobs = query.order_by(Job.id.desc()).limit(limit + 1).all()
+    jobs, next_cursor = split_page(jobs, limit, lambda job: [job.id])
+    return render_template('admin/jobs.html',
+                           title='Фоновые задачи',
+                           jobs=jobs,
+                           next_cursor=next_cursor,
+                           grade_form=GradePendingForm())
+
+
+@bp.route('/jobs/grade', methods=['POST'])
+def jobs_grade():
+    """Поставить в очередь пакетную проверку непроверенных решений"""
+    if GradePendingForm().validate_on_submit():
+        job = enqueue('grading.grade_pending', created_by=current_user.id)
+        db.session.commit()
+        flash(f'Проверка запущена в фоне (задача №{job.id}).', 'success')
+    return redirect(url_for('admin.jobs'))
+
+
+@bp.route('/stats/user-cache')
+def user_cache_stats():
+    """Счетчики кэша пользователей сессии этого процесса (JSON)"""
+    return jsonify(get_user_cache().stats())
+
+
+@bp.route('/search')
+def search():
+    """Полнотекстовый поиск по заданиям и решениям"""
+    query = request.args.get('q', '')
+    scope = request.args.get('scope', 'tasks')
+    if scope not in SCOPES:
+        abort(400)
+    sort = 'recent' if request.args.get('sort') == 'recent' else 'rank'
+    hits, next_cursor = [], None
+    if query.strip():
+        try:
+            after = decode_cursor(request.args['cursor'], 1)[0] if 'cursor' in request.args else None
+            hits, position = search_index(scope, query, current_app.config['ADMIN_PAGE_SIZE'], after, sort)
+        except InvalidCursor:
+            abort(400)
+        except InvalidQuery:
+            position = None
+        next_cursor = encode_cursor([position]) if position is not None else None
+    catalog = get_catalog()
+    return render_template('admin/search.html',
+                           title='Поиск',
+                           query=query,
+                           scope=scope,
+                           sort=sort,
+                           hits=hits,
+                           tasks=catalog.tasks_by_id,
+                           categories=catalog.categories_by_id,
+                           next_cursor=next_cursor)
 
 
 @bp.route('/add_task', methods=['POST'])
@@ -125,7 +290,7 @@ def add_task():
         return redirect(url_for('main.index'))
     
     form = TaskForm()
-    form.category.choices = [(c.id, c.name) for c in TaskCategory.query.all()]
+    form.category.choices = [(c.id, c.name) for c in get_catalog().categories]
     
     if form.validate_on_submit():
         try:
@@ -137,6 +302,7 @@ def add_task():
                 category_id=form.category.data,
                 task_number=next_task_number,
                 content=form.content.data,
+                answer_key=form.answer_key.data or None,
                 created_at=datetime.utcnow()
             )
             db.session.add(task)
@@ -165,14 +331,17 @@ def review_solution(solution_id):
     form = FeedbackForm()
     
     if form.validate_on_submit():
-        solution.feedback = form.feedback.data
-        solution.is_reviewed = True
-        solution.reviewed_at = datetime.utcnow()
-        solution.reviewed_by = current_user.id
-        db.session.commit()
-        flash('Отзыв успешно добавлен!', 'success')
+        if take_for_review(solution, current_user.id):
+            mark_reviewed(solution, form.feedback.data)
+            solution.reviewed_by = current_user.id
+            db.session.commit()
+            flash('Отзыв успешно добавлен!', 'success')
+        else:
+            flash(HELD_BY_OTHER, 'warning')
     else:
         for field, errors in form.errors.items():
             for error in errors:
                 flash(f'{getattr(form, field).label.text}: {error}', 'danger')
+    if request.args.get('from') == 'queue':
+        return redirect(url_for('admin.queue'))
     return redirect(url_for('admin.dashboard'))
\ No newline at end of file
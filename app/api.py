@@ -1,5 +1,24 @@
-from flask_restful import Resource, Api, reqparse
-from app.models import TaskCategory, Task
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+from flask import current_app, request, Response, stream_with_context, send_file
+from flask_login import current_user
+from flask_restful import Resource, Api, reqparse, inputs
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import load_only
+from pytz import UTC
+from werkzeug.http import http_date, quote_etag
+from app.models import TaskCategory, Task, Solution, Job
+from app.catalog import get_catalog, with_content
+from app.pagination import InvalidCursor, encode_cursor, decode_cursor, split_page, rows_after, \
+    decode_submission_cursor, submission_key
+from app.search import SCOPES, SORTS, InvalidQuery, search, highlight, plain
+from app.jobs import enqueue, result_path, QUEUED, RUNNING, SUCCEEDED
+from app.job_handlers import serialize_task, ndjson_line, import_tasks
+from app.progress import move_task, forget_task, forget_category
 from app import db
 
 api = Api()
@@ -9,32 +28,251 @@ task_parser = reqparse.RequestParser()
 task_parser.add_argument('category_id', type=int, required=True, help='Category ID is required')
 task_parser.add_argument('task_number', type=int, required=True, help='Task number is required')
 task_parser.add_argument('content', type=str, required=True, help='Task content is required')
+task_parser.add_argument('answer_key', type=str, required=False)
 
 """ Парсер для создания/обновления категорий """
 category_parser = reqparse.RequestParser()
 category_parser.add_argument('name', type=str, required=True, help='Category name is required')
 category_parser.add_argument('description', type=str, required=False)
 
+""" Парсер параметров постраничной выдачи списков """
+list_parser = reqparse.RequestParser()
+list_parser.add_argument('limit', type=int, location='args')
+list_parser.add_argument('cursor', type=str, location='args')
+
+task_list_parser = list_parser.copy()
+task_list_parser.add_argument('category_id', type=int, location='args')
+task_list_parser.add_argument('format', type=str, location='args', choices=('json', 'ndjson'), default='json')
+
+def utc_datetime(value):
+    """Дата или дата и время в ISO 8601; время с часовым поясом приводится к UTC (в БД — без пояса)"""
+    moment = datetime.fromisoformat(value)
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(UTC).replace(tzinfo=None)
+    return moment
+
+
+""" Фильтры списка решений; submitted_from включительно, submitted_to — не включая """
+solution_list_parser = list_parser.copy()
+solution_list_parser.add_argument('user_id', type=int, location='args')
+solution_list_parser.add_argument('task_id', type=int, location='args')
+solution_list_parser.add_argument('category_id', type=int, location='args')
+solution_list_parser.add_argument('is_reviewed', type=inputs.boolean, location='args')
+solution_list_parser.add_argument('submitted_from', type=utc_datetime, location='args',
+                                  help='submitted_from must be an ISO 8601 date or datetime')
+solution_list_parser.add_argument('submitted_to', type=utc_datetime, location='args',
+                                  help='submitted_to must be an ISO 8601 date or datetime')
+solution_list_parser.add_argument('fields', type=str, location='args', choices=('full', 'summary'), default='full')
+
+solution_parser = reqparse.RequestParser()
+solution_parser.add_argument('fields', type=str, location='args', choices=('full', 'summary'), default='full')
+
+job_parser = reqparse.RequestParser()
+job_parser.add_argument('wait', type=float, location='args', default=0)
+
+search_parser = list_parser.copy()
+search_parser.add_argument('q', type=str, location='args', required=True, help='Search query is required')
+search_parser.add_argument('scope', type=str, location='args', choices=SCOPES, default='tasks')
+search_parser.add_argument('sort', type=str, location='args', choices=SORTS, default='rank')
+
+
+def page_limit(limit):
+    """Ограничивает запрошенный размер страницы настройками приложения"""
+    if limit is None or limit <= 0:
+        return current_app.config['API_PAGE_SIZE']
+    return min(limit, current_app.config['API_MAX_PAGE_SIZE'])
+
+
+def make_etag(*parts):
+    """Строгий ETag из идентификаторов и версий (updated_at) строк"""
+    return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+
+def last_modified_of(updated_at):
+    """updated_at хранится без часового пояса (UTC); HTTP-даты имеют точность до секунды"""
+    if updated_at is None:
+        return None
+    return updated_at.replace(tzinfo=UTC, microsecond=0)
+
+
+def validator_headers(etag, last_modified=None):
+    headers = {'ETag': quote_etag(etag)}
+    if last_modified is not None:
+        headers['Last-Modified'] = http_date(last_modified)
+    return headers
+
+
+def not_modified(etag, last_modified=None):
+    """
+    Проверяет If-None-Match / If-Modified-Since запроса.
+    Возвращает готовый ответ 304, если у клиента актуальная версия, иначе None.
+    """
+    if request.if_none_match:
+        matched = request.if_none_match.contains_weak(etag)
+    elif last_modified is not None and request.if_modified_since is not None:
+        matched = last_modified <= request.if_modified_since
+    else:
+        matched = False
+    if not matched:
+        return None
+    return Response(status=304, headers=validator_headers(etag, last_modified))
+
+
+def page_response(rows, serialize, next_cursor):
+    """
+    Ответ со страницей списка. ETag считается по версиям строк страницы
+    до сериализации, поэтому на 304 тело не строится вовсе.
+    Курсор следующей страницы передается в заголовке X-Next-Cursor.
+    """
+    etag = make_etag(next_cursor, *((row.id, row.updated_at) for row in rows))
+    cached = not_modified(etag)
+    if cached is not None:
+        return cached
+    headers = validator_headers(etag)
+    if next_cursor:
+        headers['X-Next-Cursor'] = next_cursor
+    return [serialize(row) for row in rows], 200, headers
+
+
+def item_response(kind, record, serialize, not_found):
+    """
+    Ответ с одной записью каталога. Валидаторы строятся по версии записи (updated_at),
+    при совпадении отдается 304 без сериализации.
+    """
+    if record is None:
+        return {'message': not_found}, 404
+    etag = make_etag(kind, record.id, record.updated_at)
+    last_modified = last_modified_of(record.updated_at)
+    cached = not_modified(etag, last_modified)
+    if cached is not None:
+        return cached
+    return serialize(record), 200, validator_headers(etag, last_modified)
+
+
+def wants_async():
+    """Клиент просит выполнить операцию фоновой задачей (?async=1)"""
+    return request.args.get('async', '').lower() in ('1', 'true', 'yes')
+
+
+def requester_id():
+    return current_user.id if current_user.is_authenticated else None
+
+
+def accepted(job):
+    """Ответ 202 на поставленную в очередь задачу; статус — по ссылке из Location"""
+    db.session.commit()
+    return {'job': serialize_job(job)}, 202, {'Location': api.url_for(JobResource, job_id=job.id)}
+
+
+def serialize_job(job):
+    return {
+        'id': job.id,
+        'kind': job.kind,
+        'status': job.status,
+        'attempts': job.attempts,
+        'max_attempts': job.max_attempts,
+        'progress': {'done': job.progress_done, 'total': job.progress_total},
+        'result': json.loads(job.result) if job.result else None,
+        'error': job.error,
+        'created_at': job.created_at.isoformat(),
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+        'run_after': job.run_after.isoformat()
+    }
+
+
+def serialize_category(category):
+    return {
+        'id': category.id,
+        'name': category.name,
+        'description': category.description
+    }
+
+
+""" Столбцы решения без текстов; content и feedback читаются только при fields=full """
+SOLUTION_SUMMARY_COLUMNS = (Solution.id, Solution.user_id, Solution.task_id,
+                            Solution.submitted_at, Solution.reviewed_at, Solution.is_reviewed)
+SOLUTION_TEXT_COLUMNS = (Solution.content, Solution.feedback)
+
+
+def serialize_solution(solution, full=True):
+    data = {
+        'id': solution.id,
+        'user_id': solution.user_id,
+        'task_id': solution.task_id,
+        'is_reviewed': bool(solution.is_reviewed),
+        'submitted_at': solution.submitted_at.isoformat() if solution.submitted_at else None,
+        'reviewed_at': solution.reviewed_at.isoformat() if solution.reviewed_at else None
+    }
+    if full:
+        data.update(content=solution.content, feedback=solution.feedback)
+    return data
+
+
+def solution_columns(full):
+    """load_only: тексты решения и поля аренды не читаются, если не нужны"""
+    return load_only(*SOLUTION_SUMMARY_COLUMNS, *(SOLUTION_TEXT_COLUMNS if full else ()))
+
+
+def export_statement(category_id=None):
+    """Задания для выгрузки в порядке (категория, номер), читаются пачками (yield_per)"""
+    statement = select(Task).order_by(Task.category_id, Task.task_number, Task.id)
+    if category_id is not None:
+        statement = statement.where(Task.category_id == category_id)
+    return statement.execution_options(yield_per=current_app.config['API_EXPORT_BATCH_SIZE'])
+
+
+def export_tasks_ndjson(category_id=None):
+    """
+    Потоковая выгрузка заданий: по одному JSON-объекту на строку.
+    Строки читаются из БД пачками (yield_per), поэтому память ограничена
+    размером пачки, а первые байты уходят клиенту сразу.
+    """
+    statement = export_statement(category_id)
+
+    def generate():
+        for task in db.session.scalars(statement):
+            yield ndjson_line(task)
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+def category_page(catalog, args):
+    """Страница категорий из снимка каталога (общая для синхронного и асинхронного API)"""
+    limit = page_limit(args['limit'])
+    try:
+        after = decode_cursor(args['cursor'], 1)[0] if args['cursor'] else None
+    except InvalidCursor:
+        return {'message': 'Invalid cursor'}, 400
+    categories, next_cursor = split_page(
+        catalog.categories_after(after, limit + 1), limit, lambda cat: [cat.id]
+    )
+    return page_response(categories, serialize_category, next_cursor)
+
+
+def task_page(catalog, args):
+    """Страница заданий из снимка каталога в порядке (категория, номер)"""
+    limit = page_limit(args['limit'])
+    try:
+        after = decode_cursor(args['cursor'], 3) if args['cursor'] else None
+    except InvalidCursor:
+        return {'message': 'Invalid cursor'}, 400
+    tasks, next_cursor = split_page(
+        catalog.tasks_after(after, limit + 1, args['category_id']),
+        limit, lambda task: task.sort_key
+    )
+    return page_response(with_content(tasks), serialize_task, next_cursor)
+
+
 class CategoryResource(Resource):
     def get(self, category_id=None):
         if category_id is None:
-            """ Получить все категории """
-            categories = TaskCategory.query.all()
-            return [{
-                'id': cat.id,
-                'name': cat.name,
-                'description': cat.description
-            } for cat in categories]
+            """ Получить страницу категорий в порядке id """
+            return category_page(get_catalog(), list_parser.parse_args())
 
         """ Получить определенную категорию """
-        category = db.session.get(TaskCategory, category_id)
-        if category is None:
-            return {'message': 'Category not found'}, 404
-        return {
-            'id': category.id,
-            'name': category.name,
-            'description': category.description
-        }
+        category = get_catalog().categories_by_id.get(category_id)
+        return item_response('category', category, serialize_category, 'Category not found')
 
     def post(self):
         args = category_parser.parse_args()
@@ -51,11 +289,7 @@ class CategoryResource(Resource):
         db.session.add(category)
         db.session.commit()
         
-        return {
-            'id': category.id,
-            'name': category.name,
-            'description': category.description
-        }, 201
+        return serialize_category(category), 201
 
     def put(self, category_id):
         category = db.session.get(TaskCategory, category_id)
@@ -74,17 +308,21 @@ class CategoryResource(Resource):
         
         db.session.commit()
         
-        return {
-            'id': category.id,
-            'name': category.name,
-            'description': category.description
-        }
+        return serialize_category(category)
 
     def delete(self, category_id):
         category = db.session.get(TaskCategory, category_id)
         if category is None:
             return {'message': 'Category not found'}, 404
+        if wants_async():
+            """ Фоновое удаление категории со всеми заданиями и решениями """
+            return accepted(enqueue('categories.delete', {'category_id': category_id}, created_by=requester_id()))
             
+        """ Как и фоновое удаление: вместе с заданиями, решениями и сводкой успеваемости """
+        task_ids = select(Task.id).where(Task.category_id == category_id).scalar_subquery()
+        db.session.execute(delete(Solution).where(Solution.task_id.in_(task_ids)))
+        db.session.execute(delete(Task).where(Task.category_id == category_id))
+        forget_category(category_id)
         db.session.delete(category)
         db.session.commit()
         return '', 204
@@ -92,30 +330,20 @@ class CategoryResource(Resource):
 class TaskResource(Resource):
     def get(self, task_id=None):
         if task_id is None:
-            """ Получение всех заданий """
-            tasks = Task.query.all()
-            return [{
-                'id': task.id,
-                'category_id': task.category_id,
-                'task_number': task.task_number,
-                'content': task.content,
-                'created_at': task.created_at.isoformat(),
-                'full_id': task.get_full_id()
-            } for task in tasks]
+            """ Получение страницы заданий в порядке (категория, номер) """
+            args = task_list_parser.parse_args()
+            if args['format'] == 'ndjson':
+                if wants_async():
+                    return accepted(enqueue('tasks.export', {'category_id': args['category_id']},
+                                            created_by=requester_id()))
+                return export_tasks_ndjson(args['category_id'])
+
+            return task_page(get_catalog(), args)
         
         """ Получение определенного задания """
-        task = db.session.get(Task, task_id)
-        if task is None:
-            return {'message': 'Task not found'}, 404
-            
-        return {
-            'id': task.id,
-            'category_id': task.category_id,
-            'task_number': task.task_number,
-            'content': task.content,
-            'created_at': task.created_at.isoformat(),
-            'full_id': task.get_full_id()
-        }
+        task = get_catalog().tasks_by_id.get(task_id)
+        return item_response('task', task, lambda record: serialize_task(with_content([record])[0]),
+                             'Task not found')
 
     def post(self):
         args = task_parser.parse_args()
@@ -135,20 +363,19 @@ class TaskResource(Resource):
         task = Task(
             category_id=args['category_id'],
             task_number=args['task_number'],
-            content=args['content']
+            content=args['content'],
+            answer_key=args.get('answer_key') or None
         )
         
         db.session.add(task)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError:
+            """ Параллельный запрос успел занять этот номер (уникальный индекс) """
+            db.session.rollback()
+            return {'message': 'Task with this number already exists in this category'}, 400
         
-        return {
-            'id': task.id,
-            'category_id': task.category_id,
-            'task_number': task.task_number,
-            'content': task.content,
-            'created_at': task.created_at.isoformat(),
-            'full_id': task.get_full_id()
-        }, 201
+        return serialize_task(task), 201
 
     def put(self, task_id):
         task = db.session.get(Task, task_id)
@@ -170,29 +397,201 @@ class TaskResource(Resource):
         if existing and existing.id != task_id:
             return {'message': 'Task with this number already exists in this category'}, 400
         
+        """ Решения задания переходят в сводку успеваемости новой категории в той же транзакции """
+        move_task(task.id, task.category_id, args['category_id'])
         task.category_id = args['category_id']
         task.task_number = args['task_number']
         task.content = args['content']
+        if args.get('answer_key') is not None:
+            """ Ключ ответа меняется, только если передан; пустая строка его удаляет """
+            task.answer_key = args['answer_key'] or None
         
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            return {'message': 'Task with this number already exists in this category'}, 400
         
-        return {
-            'id': task.id,
-            'category_id': task.category_id,
-            'task_number': task.task_number,
-            'content': task.content,
-            'created_at': task.created_at.isoformat(),
-            'full_id': task.get_full_id()
-        }
+        return serialize_task(task)
 
     def delete(self, task_id):
         task = db.session.get(Task, task_id)
         if task is None:
             return {'message': 'Task not found'}, 404
             
+        forget_task(task.id, task.category_id)
         db.session.delete(task)
         db.session.commit()
         return '', 204
 
+def solution_filters(args):
+    """Условия выборки решений по параметрам запроса"""
+    conditions = []
+    for field in ('user_id', 'task_id'):
+        if args[field] is not None:
+            conditions.append(getattr(Solution, field) == args[field])
+    if args['category_id'] is not None:
+        conditions.append(Solution.task_id.in_(
+            select(Task.id).where(Task.category_id == args['category_id']).scalar_subquery()
+        ))
+    if args['is_reviewed'] is not None:
+        conditions.append(Solution.is_reviewed == args['is_reviewed'])
+    if args['submitted_from'] is not None:
+        conditions.append(Solution.submitted_at >= args['submitted_from'])
+    if args['submitted_to'] is not None:
+        conditions.append(Solution.submitted_at < args['submitted_to'])
+    return conditions
+
+
+class SolutionResource(Resource):
+    def get(self, solution_id=None):
+        """
+        Решения: преподаватели видят все, студенты — только свои.
+        Список — от новых к старым, keyset по (submitted_at, id); fields=summary без текстов.
+        """
+        if not current_user.is_authenticated:
+            return {'message': 'Authentication required'}, 401
+
+        if solution_id is not None:
+            """ Получение определенного решения """
+            full = solution_parser.parse_args()['fields'] == 'full'
+            solution = db.session.get(Solution, solution_id, options=[solution_columns(full)])
+            if solution is None or not (current_user.is_admin or solution.user_id == current_user.id):
+                return {'message': 'Solution not found'}, 404
+            return serialize_solution(solution, full)
+
+        args = solution_list_parser.parse_args()
+        if not current_user.is_admin:
+            if args['user_id'] not in (None, current_user.id):
+                return {'message': 'Solutions of other users are available to teachers only'}, 403
+            args['user_id'] = current_user.id
+        limit = page_limit(args['limit'])
+        full = args['fields'] == 'full'
+        statement = select(Solution).options(solution_columns(full)).where(*solution_filters(args))
+        if args['cursor']:
+            try:
+                after = decode_submission_cursor(args['cursor'])
+            except InvalidCursor:
+                return {'message': 'Invalid cursor'}, 400
+            statement = statement.where(rows_after([Solution.submitted_at, Solution.id], after, descending=True))
+        statement = statement.order_by(Solution.submitted_at.desc(), Solution.id.desc()).limit(limit + 1)
+        solutions, next_cursor = split_page(db.session.scalars(statement).all(), limit, submission_key)
+        headers = {'X-Next-Cursor': next_cursor} if next_cursor else {}
+        return [serialize_solution(solution, full) for solution in solutions], 200, headers
+
+
+class TaskBulkResource(Resource):
+    def post(self):
+        """
+        Пакетное создание заданий. С ?async=1 пакет выполняется фоновой задачей:
+        ответ 202 со ссылкой на ее статус, итог — в поле result задачи.
+        """
+        payload = request.get_json(silent=True)
+        if isinstance(payload, list):
+            payload = {'tasks': payload}
+        if not isinstance(payload, dict) or not isinstance(payload.get('tasks'), list):
+            return {'message': 'Request body must contain a list of tasks'}, 400
+
+        items = payload['tasks']
+        upsert = bool(payload.get('upsert', False))
+        max_items = current_app.config['API_BULK_MAX_ITEMS']
+        if len(items) > max_items:
+            return {'message': f'Too many tasks in one request (max {max_items})'}, 400
+        if wants_async():
+            return accepted(enqueue('tasks.import', {'items': items, 'upsert': upsert}, created_by=requester_id()))
+        return import_tasks(items, upsert)
+
+
+def serialize_hit(hit):
+    data = {
+        'id': hit.id,
+        'snippet': plain(hit.snippet),
+        'highlight': str(highlight(hit.snippet)),
+        'score': None if hit.rank is None else -hit.rank
+    }
+    if hit.category_id is not None:
+        data.update(category_id=hit.category_id, task_number=hit.task_number)
+    else:
+        data.update(user_id=hit.user_id, task_id=hit.task_id, is_reviewed=hit.is_reviewed,
+                    submitted_at=hit.submitted_at.isoformat() if hit.submitted_at else None)
+    return data
+
+
+class SearchResource(Resource):
+    def get(self):
+        """ Полнотекстовый поиск: задания доступны всем, решения — только преподавателям """
+        args = search_parser.parse_args()
+        if args['scope'] == 'solutions' and not (current_user.is_authenticated and current_user.is_admin):
+            return {'message': 'Solution search is available to teachers only'}, 403
+        limit = page_limit(args['limit'])
+        try:
+            after = decode_cursor(args['cursor'], 1)[0] if args['cursor'] else None
+            hits, position = search(args['scope'], args['q'], limit, after, args['sort'])
+        except InvalidCursor:
+            return {'message': 'Invalid cursor'}, 400
+        except InvalidQuery:
+            return {'message': 'Search query is empty'}, 400
+        headers = {'X-Next-Cursor': encode_cursor([position])} if position is not None else {}
+        return [serialize_hit(hit) for hit in hits], 200, headers
+
+
+def job_visible_to(job, user):
+    """Задачу видят ее автор и преподаватели; задачи анонимных запросов — все"""
+    if job.created_by is None:
+        return True
+    return user.is_authenticated and (user.is_admin or user.id == job.created_by)
+
+
+def wait_deadline(args):
+    """Момент, до которого запрос ждет завершения задачи (?wait=секунды, не дольше JOB_WAIT_MAX_SECONDS)"""
+    wait = min(max(args['wait'] or 0, 0), current_app.config['JOB_WAIT_MAX_SECONDS'])
+    return time.monotonic() + wait
+
+
+def job_pending(job, deadline):
+    return job.status in (QUEUED, RUNNING) and time.monotonic() < deadline
+
+
+def visible_job(job_id):
+    job = db.session.get(Job, job_id)
+    if job is None or job_visible_to(job, current_user):
+        return job
+    return None
+
+
+class JobResource(Resource):
+    def get(self, job_id):
+        """
+        Статус и прогресс фоновой задачи. Ожидание ?wait=N обслуживает только
+        асинхронный режим (asgi.py): здесь оно заняло бы поток воркера, поэтому
+        параметр игнорируется и статус возвращается сразу.
+        """
+        job = visible_job(job_id)
+        if job is None:
+            return {'message': 'Job not found'}, 404
+        return serialize_job(job)
+
+
+class JobResultResource(Resource):
+    def get(self, job_id):
+        """ Файл с результатом завершенной задачи (выгрузка) """
+        job = visible_job(job_id)
+        if job is None:
+            return {'message': 'Job not found'}, 404
+        result = json.loads(job.result) if job.result else {}
+        if job.status != SUCCEEDED or 'file' not in result:
+            return {'message': 'Job has no result file yet'}, 409
+        path = result_path(job.id, os.path.splitext(result['file'])[1])
+        if not os.path.exists(path):
+            return {'message': 'Result file has expired'}, 410
+        return send_file(path, mimetype='application/x-ndjson', as_attachment=True,
+                         download_name=f'tasks-{job.id}.ndjson')
+
+
 api.add_resource(CategoryResource, '/api/categories', '/api/categories/<int:category_id>')
-api.add_resource(TaskResource, '/api/tasks', '/api/tasks/<int:task_id>') 
\ No newline at end of file
+api.add_resource(TaskResource, '/api/tasks', '/api/tasks/<int:task_id>')
+api.add_resource(TaskBulkResource, '/api/tasks/bulk')
+api.add_resource(SolutionResource, '/api/solutions', '/api/solutions/<int:solution_id>')
+api.add_resource(SearchResource, '/api/search')
+api.add_resource(JobResource, '/api/jobs/<int:job_id>')
+api.add_resource(JobResultResource, '/api/jobs/<int:job_id>/result')
@@ -0,0 +1,357 @@
+"""
+Асинхронный режим API (ASGI) для клиентов, которые часто опрашивают сервер.
+
+    uvicorn asgi:app --workers 2
+
+Чтение каталога (GET /api/categories, /api/tasks и их записи) и статус фоновых
+задач (GET /api/jobs/<id>, в том числе ожидание ?wait=N, которого нет в синхронном
+API) обслуживаются корутинами: запросы к БД идут через асинхронный драйвер
+(aiosqlite, asyncpg), и ждущий клиент не занимает поток.
+Разбор параметров, сериализация, ETag и курсоры — те же, что в app/api.py, а ответ
+проходит обработчики after_request Flask-приложения (сжатие, cookie сессии),
+поэтому он совпадает с ответом синхронного API.
+
+Все остальные запросы (запись, выгрузка ndjson, ?async=1, страницы сайта, ошибки
+разбора параметров) передаются Flask-приложению в пуле из ASYNC_WSGI_THREADS потоков.
+"""
+import asyncio
+import io
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app, request, session
+from flask_login.config import COOKIE_NAME
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from werkzeug.exceptions import HTTPException
+
+from app import login_manager
+from app.api import (api, list_parser, task_list_parser, job_parser, category_page, task_page, item_response,
+                     serialize_category, serialize_task, serialize_job, job_visible_to, wait_deadline, job_pending)
+from app.catalog import get_catalog, version_statement
+from app.database import engine_profile, sqlite_pragmas
+from app.models import Job
+from app.user_cache import CachedUser, get_user_cache, user_statement
+
+# Асинхронные драйверы для схем SQLALCHEMY_DATABASE_URI
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+    'mysql': 'mysql+aiomysql',
+}
+
+# Сколько частей ответа Flask-приложения может ждать отправки клиенту
+WSGI_BUFFER_CHUNKS = 16
+
+
+class Fallback(Exception):
+    """Запрос нельзя обслужить асинхронно: его выполнит Flask-приложение"""
+
+
+class ClientGone(Exception):
+    """Клиент отключился, пока Flask-приложение формировало ответ"""
+
+
+def async_database_url(app):
+    """URI асинхронного драйвера: ASYNC_DATABASE_URL или SQLALCHEMY_DATABASE_URI с заменой драйвера"""
+    if app.config['ASYNC_DATABASE_URL']:
+        return app.config['ASYNC_DATABASE_URL']
+    url = make_url(app.config['SQLALCHEMY_DATABASE_URI'])
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise RuntimeError(f'No async driver for {backend!r} databases, set ASYNC_DATABASE_URL')
+    if backend == 'sqlite' and url.database in (None, '', ':memory:'):
+        raise RuntimeError('In-memory SQLite database cannot be shared with the async engine')
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+
+def create_engine(app):
+    """Асинхронный движок с тем же профилем соединений, что и у синхронного"""
+    options = {'pool_size': app.config['DB_POOL_SIZE'], 'max_overflow': app.config['DB_MAX_OVERFLOW']}
+    profile = engine_profile(app)
+    if profile == 'sqlite':
+        # aiosqlite по умолчанию открывает соединение (и поток) на каждый запрос
+        options['poolclass'] = AsyncAdaptedQueuePool
+    elif profile == 'server':
+        options.update(pool_pre_ping=app.config['DB_POOL_PRE_PING'], pool_recycle=app.config['DB_POOL_RECYCLE'])
+    engine = create_async_engine(async_database_url(app), **options)
+
+    if profile == 'sqlite':
+        pragmas = sqlite_pragmas(app)
+
+        @event.listens_for(engine.sync_engine, 'connect')
+        def on_connect(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            try:
+                for pragma in pragmas:
+                    cursor.execute(pragma)
+            finally:
+                cursor.close()
+
+    return engine
+
+
+def wsgi_environ(scope, body):
+    """WSGI-окружение для HTTP-запроса ASGI"""
+    server = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode().decode('latin-1'),
+        'PATH_INFO': scope['path'].encode().decode('latin-1'),
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': scope['client'][0] if scope.get('client') else '',
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope['headers']:
+        name, value = name.decode('latin-1'), value.decode('latin-1')
+        if name == 'content-type':
+            environ['CONTENT_TYPE'] = value
+        elif name != 'content-length':
+            key = 'HTTP_' + name.upper().replace('-', '_')
+            environ[key] = f'{environ[key]},{value}' if key in environ else value
+    return environ
+
+
+def asgi_headers(headers):
+    return [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+
+
+async def read_body(receive):
+    chunks = []
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            raise ClientGone()
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body'):
+            return b''.join(chunks)
+
+
+class AsyncAPI:
+    """ASGI-приложение: асинхронные маршруты чтения API, остальное — Flask-приложение в пуле потоков"""
+
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.engine = create_engine(flask_app)
+        self.executor = ThreadPoolExecutor(flask_app.config['ASYNC_WSGI_THREADS'], thread_name_prefix='wsgi')
+        self.routes = [
+            (re.compile(r'/api/categories'), self.category_list),
+            (re.compile(r'/api/categories/(\d+)'), self.category_item),
+            (re.compile(r'/api/tasks'), self.task_list),
+            (re.compile(r'/api/tasks/(\d+)'), self.task_item),
+            (re.compile(r'/api/jobs/(\d+)'), self.job_item),
+        ]
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            await send({'type': 'websocket.close'})
+            return
+        try:
+            environ = wsgi_environ(scope, await read_body(receive))
+        except ClientGone:
+            return
+        if scope['method'] in ('GET', 'HEAD'):
+            for pattern, view in self.routes:
+                match = pattern.fullmatch(scope['path'])
+                if match is not None:
+                    if await self.dispatch(view, [int(value) for value in match.groups()], environ, send):
+                        return
+                    break
+        await self.call_wsgi(environ, send)
+
+    async def dispatch(self, view, args, environ, send):
+        """Асинхронная обработка запроса; False — запрос нужно передать Flask-приложению"""
+        with self.flask_app.request_context(environ):
+            try:
+                result = await view(*args)
+            except (Fallback, HTTPException):
+                return False
+            except Exception:
+                current_app.logger.exception('Async API request failed: %s', request.path)
+                result = {'message': 'Internal Server Error'}, 500
+            response = result if not isinstance(result, tuple) else api.make_response(*result)
+            response = self.flask_app.process_response(response)
+            await send({'type': 'http.response.start', 'status': response.status_code,
+                        'headers': asgi_headers(response.headers.items())})
+            body = b'' if request.method == 'HEAD' else response.get_data()
+            await send({'type': 'http.response.body', 'body': body})
+        return True
+
+    async def in_thread(self, func, *args):
+        """Синхронный код с контекстом приложения в пуле потоков"""
+        def call():
+            with self.flask_app.app_context():
+                return func(*args)
+        return await asyncio.get_running_loop().run_in_executor(self.executor, call)
+
+    async def catalog(self):
+        """Снимок каталога: версия читается асинхронно, пересборка при смене версии — в потоке"""
+        async with self.engine.connect() as connection:
+            version = await connection.scalar(version_statement()) or 0
+        snapshot = current_app.extensions['catalog'].cached(version)
+        if snapshot is None:
+            snapshot = await self.in_thread(get_catalog)
+        return snapshot
+
+    async def session_user(self):
+        """Пользователь из cookie сессии Flask-Login: кэш пользователей или одно асинхронное чтение"""
+        mode = current_app.config.get('SESSION_PROTECTION', login_manager.session_protection)
+        if mode in ('basic', 'strong') and session and \
+                login_manager._session_identifier_generator() != session.get('_id'):
+            # Cookie пришла с другого адреса или браузера: защиту сессии выполняет Flask-Login
+            raise Fallback()
+        user_id = session.get('_user_id')
+        if user_id is None:
+            if COOKIE_NAME in request.cookies:
+                # Вход по cookie «запомнить меня» выполняет Flask-Login
+                raise Fallback()
+            return login_manager.anonymous_user()
+        try:
+            user_id = int(user_id)
+        except (TypeError, ValueError):
+            return login_manager.anonymous_user()
+        cache = get_user_cache()
+        user = cache.get(user_id)
+        if user is None:
+            async with self.engine.connect() as connection:
+                row = (await connection.execute(user_statement(user_id))).first()
+            if row is None:
+                return login_manager.anonymous_user()
+            user = CachedUser(*row)
+            cache.put(user)
+        return user
+
+    async def category_list(self):
+        args = list_parser.parse_args()
+        return category_page(await self.catalog(), args)
+
+    async def category_item(self, category_id):
+        category = (await self.catalog()).categories_by_id.get(category_id)
+        return item_response('category', category, serialize_category, 'Category not found')
+
+    async def task_list(self):
+        args = task_list_parser.parse_args()
+        catalog = await self.catalog()
+        if args['format'] != 'json' or not catalog.has_content:
+            # Тексты большого каталога читаются из БД синхронно — это делает Flask
+            raise Fallback()
+        return task_page(catalog, args)
+
+    async def task_item(self, task_id):
+        catalog = await self.catalog()
+        if not catalog.has_content:
+            raise Fallback()
+        task = catalog.tasks_by_id.get(task_id)
+        return item_response('task', task, serialize_task, 'Task not found')
+
+    async def load_job(self, job_id):
+        async with AsyncSession(self.engine) as db_session:
+            return await db_session.get(Job, job_id)
+
+    async def job_item(self, job_id):
+        """ Статус фоновой задачи; ожидание ?wait=N не занимает ни поток, ни соединение с БД """
+        deadline = wait_deadline(job_parser.parse_args())
+        user = await self.session_user()
+        job = await self.load_job(job_id)
+        if job is None or not job_visible_to(job, user):
+            return {'message': 'Job not found'}, 404
+        while job is not None and job_pending(job, deadline):
+            await asyncio.sleep(min(current_app.config['JOB_WAIT_POLL_SECONDS'], max(deadline - time.monotonic(), 0)))
+            job = await self.load_job(job_id)
+        if job is None:
+            return {'message': 'Job not found'}, 404
+        return serialize_job(job), 200
+
+    async def call_wsgi(self, environ, send):
+        """
+        Выполняет запрос Flask-приложением в пуле потоков. Части ответа передаются
+        клиенту по мере готовности через ограниченную очередь, так что потоковые
+        ответы не накапливаются в памяти целиком.
+        """
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(WSGI_BUFFER_CHUNKS)
+        gone = threading.Event()
+
+        def put(message):
+            future = asyncio.run_coroutine_threadsafe(queue.put(message), loop)
+            while True:
+                try:
+                    return future.result(timeout=1)
+                except TimeoutError:
+                    if gone.is_set():
+                        future.cancel()
+                        raise ClientGone()
+
+        def run():
+            try:
+                started = []
+                iterable = self.flask_app(environ, lambda status, headers, exc_info=None: started.extend((status, headers)))
+                try:
+                    put(('start', int(started[0].split(' ', 1)[0]), started[1]))
+                    for chunk in iterable:
+                        if chunk:
+                            put(('body', chunk))
+                finally:
+                    if hasattr(iterable, 'close'):
+                        iterable.close()
+            except ClientGone:
+                return
+            except Exception:
+                self.flask_app.logger.exception('WSGI request failed: %s', environ['PATH_INFO'])
+                put(('error',))
+                return
+            put(('end',))
+
+        task = loop.run_in_executor(self.executor, run)
+        started = False
+        try:
+            while True:
+                message = await queue.get()
+                if message[0] == 'start':
+                    started = True
+                    await send({'type': 'http.response.start', 'status': message[1],
+                                'headers': asgi_headers(message[2])})
+                elif message[0] == 'body':
+                    if environ['REQUEST_METHOD'] != 'HEAD':
+                        await send({'type': 'http.response.body', 'body': message[1], 'more_body': True})
+                else:
+                    if message[0] == 'error' and not started:
+                        await send({'type': 'http.response.start', 'status': 500,
+                                    'headers': [(b'content-type', b'text/plain')]})
+                    await send({'type': 'http.response.body', 'body': b''})
+                    break
+        finally:
+            gone.set()
+            await task
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.close()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def close(self):
+        await self.engine.dispose()
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,154 @@
+"""
+Сжатие ответов и статические файлы с отпечатком содержимого.
+
+Ответы текстовых типов больше COMPRESS_MIN_SIZE сжимаются gzip или brotli
+(если установлен пакет brotli) — по заголовку Accept-Encoding клиента.
+Потоковые ответы и файлы (send_file) не сжимаются на лету: для статики сжатые
+варианты создаются один раз и хранятся в STATIC_CACHE_DIR под хешем содержимого.
+
+url_for('static', ...) добавляет к адресу параметр v с хешем файла; ответ на адрес
+с актуальным хешем кэшируется браузером на год как неизменяемый, а новая версия
+файла получает новый адрес.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+import threading
+
+from flask import current_app, request, send_file, abort
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:  # brotli — необязательная зависимость, без нее используется только gzip
+    brotli = None
+
+EXTENSIONS = {'br': '.br', 'gzip': '.gz'}
+
+_hashes = {}
+_hashes_lock = threading.Lock()
+
+
+def available_encodings():
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def negotiate_encoding():
+    """Лучшее поддерживаемое сжатие из Accept-Encoding запроса или None"""
+    return request.accept_encodings.best_match(available_encodings())
+
+
+def compress(data, encoding):
+    level = current_app.config['COMPRESS_LEVEL']
+    if encoding == 'br':
+        return brotli.compress(data, quality=min(level + 3, 11))
+    # mtime=0: одинаковые данные дают одинаковый результат
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def compressible(mimetype):
+    return mimetype in current_app.config['COMPRESS_MIMETYPES']
+
+
+def compress_response(response):
+    """after_request: сжимает тело ответа, если клиент это поддерживает и оно того стоит"""
+    if (response.direct_passthrough or response.is_streamed
+            or response.status_code < 200 or response.status_code in (204, 206, 304)
+            or 'Content-Encoding' in response.headers or not compressible(response.mimetype)):
+        return response
+    # Клиент без поддержки сжатия: тело не читаем и Vary не добавляем
+    encoding = negotiate_encoding()
+    if encoding is None:
+        return response
+    response.vary.add('Accept-Encoding')
+    data = response.get_data()
+    if len(data) < current_app.config['COMPRESS_MIN_SIZE']:
+        return response
+    response.set_data(compress(data, encoding))
+    response.headers['Content-Encoding'] = encoding
+    # Сжатое представление не совпадает побайтно с исходным: строгий ETag становится слабым
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def file_hash(path):
+    """Хеш содержимого файла; пересчитывается только при изменении mtime или размера"""
+    stat = os.stat(path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = _hashes.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    with open(path, 'rb') as source:
+        digest = hashlib.sha1(source.read()).hexdigest()[:current_app.config['STATIC_HASH_LENGTH']]
+    with _hashes_lock:
+        _hashes[path] = (signature, digest)
+    return digest
+
+
+def static_path(filename):
+    path = safe_join(current_app.static_folder, filename)
+    return path if path is not None and os.path.isfile(path) else None
+
+
+def add_static_version(endpoint, values):
+    """url_defaults: к адресам статики добавляется отпечаток содержимого (?v=<хеш>)"""
+    if endpoint != 'static' or 'filename' not in values or 'v' in values:
+        return
+    path = static_path(values['filename'])
+    if path is not None:
+        values['v'] = file_hash(path)
+
+
+def compressed_variant(path, digest, encoding):
+    """Сжатый вариант файла в STATIC_CACHE_DIR; создается при первом запросе"""
+    directory = current_app.config['STATIC_CACHE_DIR']
+    variant = os.path.join(directory, digest + EXTENSIONS[encoding])
+    if not os.path.exists(variant):
+        os.makedirs(directory, exist_ok=True)
+        with open(path, 'rb') as source:
+            data = compress(source.read(), encoding)
+        partial = f'{variant}.{os.getpid()}.part'
+        with open(partial, 'wb') as output:
+            output.write(data)
+        os.replace(partial, variant)
+    return variant
+
+
+def static_file(filename):
+    """Отдача статики: сжатый вариант по Accept-Encoding, вечный кэш для адреса с актуальным хешем"""
+    path = static_path(filename)
+    if path is None:
+        abort(404)
+    digest = file_hash(path)
+    fingerprinted = request.args.get('v') == digest
+    mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    options = {
+        'mimetype': mimetype,
+        'conditional': True,
+        'max_age': current_app.config['STATIC_MAX_AGE'] if fingerprinted else None,
+        'last_modified': os.stat(path).st_mtime,
+    }
+
+    encoding = None
+    if compressible(mimetype) and os.path.getsize(path) >= current_app.config['COMPRESS_MIN_SIZE']:
+        encoding = negotiate_encoding()
+    if encoding is not None:
+        response = send_file(compressed_variant(path, digest, encoding), etag=f'{digest}-{encoding}', **options)
+        response.headers['Content-Encoding'] = encoding
+    else:
+        response = send_file(path, etag=digest, **options)
+    response.vary.add('Accept-Encoding')
+    if fingerprinted:
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+    return response
+
+
+def init_app(app):
+    app.after_request(compress_response)
+    app.url_defaults(add_static_version)
+    if app.static_folder:
+        app.view_functions['static'] = static_file
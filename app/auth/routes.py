@@ -3,15 +3,32 @@ from flask_login import login_user, logout_user
 from app.auth.forms import LoginForm, RegistrationForm
 from app.models import User
 from app.auth import bp
+from app.security import get_hasher, PasswordHashingBusy
 from app import db
 
+
+def busy_response(template, **context):
+    """Ответ при переполненном пуле хеширования: клиенту стоит повторить попытку позже"""
+    flash('Сервер перегружен, повторите попытку через несколько секунд', 'warning')
+    return render_template(template, **context), 503, {'Retry-After': '5'}
+
+
 @bp.route('/login', methods=['GET', 'POST'])
 def login():
     """Страница входа в систему"""
     form = LoginForm()
     if form.validate_on_submit():
         user = User.query.filter_by(username=form.username.data).first()
-        if user and user.check_password(form.password.data):
+        hasher = get_hasher()
+        try:
+            valid = user is not None and hasher.verify(user.password_hash, form.password.data)
+            if valid and user.password_needs_rehash():
+                # Параметры хеширования изменились: обновляем хеш, пока пароль известен
+                user.password_hash = hasher.hash(form.password.data)
+                db.session.commit()
+        except PasswordHashingBusy:
+            return busy_response('auth/login.html', form=form)
+        if valid:
             login_user(user, remember=form.remember_me.data)
             return redirect(url_for('main.index'))
         flash('Invalid username or password')
@@ -29,7 +46,10 @@ def register():
     form = RegistrationForm()
     if form.validate_on_submit():
         user = User(username=form.username.data)
-        user.set_password(form.password.data)  # Хеширование пароля
+        try:
+            user.password_hash = get_hasher().hash(form.password.data)  # Хеширование пароля
+        except PasswordHashingBusy:
+            return busy_response('auth/register.html', title='Register', form=form)
         db.session.add(user)  # Добавление пользователя в сессию
         db.session.commit()  # Сохранение изменений в базе данных
         flash('Registration successful!')
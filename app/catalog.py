@@ -0,0 +1,195 @@
+# Неизменяемый снимок каталога (категории и задания) в памяти процесса
+import threading
+from bisect import bisect_right
+from typing import NamedTuple, Optional
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import event, select, update, insert, func, null
+from sqlalchemy.orm import Session
+from app import db
+from app.models import TaskCategory, Task, CatalogVersion
+
+
+class CategoryRecord(NamedTuple):
+    """Категория в снимке каталога"""
+    id: int
+    name: str
+    description: Optional[str]
+    updated_at: Optional[datetime]
+
+
+class TaskRecord(NamedTuple):
+    """Задание в снимке каталога; content — None, если тексты не вошли в снимок (см. with_content)"""
+    id: int
+    category_id: int
+    task_number: int
+    content: str
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+    answer_key: Optional[str] = None
+
+    def get_full_id(self):
+        """Генерирует полный ID задачи в формате 'категория_номер'"""
+        return f"{self.category_id:02d}{self.task_number:02d}"
+
+    @property
+    def sort_key(self):
+        return self.category_id, self.task_number, self.id
+
+
+class CatalogSnapshot:
+    """
+    Версия каталога, собранная одним проходом по таблицам.
+    Задания упорядочены по (категория, номер, id) и проиндексированы по id и по категории.
+    """
+    __slots__ = ('version', 'has_content', 'categories', 'categories_by_id',
+                 'tasks', 'tasks_by_id', 'tasks_by_category', '_task_keys', '_category_task_keys',
+                 '_category_ids')
+
+    def __init__(self, version, categories, tasks, has_content=True):
+        self.version = version
+        self.has_content = has_content
+        self.categories = tuple(sorted(categories, key=lambda c: c.id))
+        self.categories_by_id = {c.id: c for c in self.categories}
+        self.tasks = tuple(sorted(tasks, key=lambda t: t.sort_key))
+        self.tasks_by_id = {t.id: t for t in self.tasks}
+        grouped = {}
+        for task in self.tasks:
+            grouped.setdefault(task.category_id, []).append(task)
+        self.tasks_by_category = {cid: tuple(items) for cid, items in grouped.items()}
+        self._task_keys = [t.sort_key for t in self.tasks]
+        self._category_task_keys = {cid: [t.sort_key for t in items]
+                                    for cid, items in self.tasks_by_category.items()}
+        self._category_ids = [c.id for c in self.categories]
+
+    def tasks_after(self, key, limit, category_id=None):
+        """
+        Keyset-выборка: до limit заданий строго после ключа (категория, номер, id).
+        Без ключа — с начала каталога или категории.
+        """
+        if category_id is None:
+            tasks, keys = self.tasks, self._task_keys
+        else:
+            tasks = self.tasks_by_category.get(category_id, ())
+            keys = self._category_task_keys.get(category_id, [])
+        start = bisect_right(keys, tuple(key)) if key else 0
+        return tasks[start:start + limit]
+
+    def categories_after(self, category_id, limit):
+        """До limit категорий с id строго больше заданного"""
+        start = bisect_right(self._category_ids, category_id) if category_id is not None else 0
+        return self.categories[start:start + limit]
+
+
+class CatalogCache:
+    """Хранит текущий снимок каталога приложения и пересобирает его при смене версии"""
+
+    def __init__(self):
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def cached(self, version):
+        """Текущий снимок, если он соответствует версии version, иначе None"""
+        snapshot = self._snapshot
+        return snapshot if snapshot is not None and snapshot.version == version else None
+
+    def get(self):
+        version = current_version()
+        snapshot = self.cached(version)
+        if snapshot is not None:
+            return snapshot
+        with self._lock:
+            if self._snapshot is None or self._snapshot.version != version:
+                self._snapshot = load_snapshot(version)
+            return self._snapshot
+
+
+def version_statement():
+    return select(CatalogVersion.version).where(CatalogVersion.id == 1)
+
+
+def current_version():
+    """Номер версии каталога из БД (одно чтение по первичному ключу)"""
+    return db.session.scalar(version_statement()) or 0
+
+
+def load_snapshot(version):
+    """
+    Читает категории и задания кортежами, минуя создание ORM-объектов.
+    Тексты заданий сверх CATALOG_CONTENT_MAX_CHARS в снимок не попадают.
+    """
+    categories = [CategoryRecord(*row) for row in db.session.execute(select(
+        TaskCategory.id, TaskCategory.name, TaskCategory.description, TaskCategory.updated_at
+    ))]
+    size = db.session.scalar(select(func.coalesce(func.sum(func.length(Task.content)), 0)))
+    has_content = size <= current_app.config['CATALOG_CONTENT_MAX_CHARS']
+    tasks = [TaskRecord(*row) for row in db.session.execute(select(
+        Task.id, Task.category_id, Task.task_number, Task.content if has_content else null(),
+        Task.created_at, Task.updated_at, Task.answer_key
+    ))]
+    return CatalogSnapshot(version, categories, tasks, has_content)
+
+
+def with_content(tasks):
+    """
+    Записи заданий с текстами: из снимка или, если тексты в него не вошли,
+    одним запросом по id (список заданий страницы, не весь каталог)
+    """
+    tasks = list(tasks)
+    missing = [task.id for task in tasks if task.content is None]
+    if not missing:
+        return tasks
+    contents = dict(db.session.execute(select(Task.id, Task.content).where(Task.id.in_(missing))).all())
+    return [task._replace(content=contents.get(task.id)) if task.content is None else task for task in tasks]
+
+
+def get_catalog():
+    """Актуальный снимок каталога для текущего приложения"""
+    return current_app.extensions['catalog'].get()
+
+
+@event.listens_for(CatalogVersion.__table__, 'after_create')
+def _seed_version(table, connection, **kw):
+    """Строка счетчика создается вместе с таблицей (db.create_all; миграция 0004 добавляет ее сама)"""
+    connection.execute(insert(table).values(id=1, version=1))
+
+
+def bump_version(connection):
+    """Увеличивает версию каталога в текущей транзакции (строку id=1 создает схема)"""
+    table = CatalogVersion.__table__
+    connection.execute(update(table).where(table.c.id == 1).values(version=table.c.version + 1))
+
+
+def _touches_catalog(objects):
+    return any(isinstance(obj, (Task, TaskCategory)) for obj in objects)
+
+
+@event.listens_for(Session, 'after_flush')
+def _bump_on_flush(session, flush_context):
+    """Любая запись категорий или заданий через ORM меняет версию каталога"""
+    if session.info.get('catalog_bumped'):
+        return
+    if _touches_catalog(session.new) or _touches_catalog(session.dirty) or _touches_catalog(session.deleted):
+        bump_version(session.connection())
+        session.info['catalog_bumped'] = True
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _bump_on_bulk_statement(orm_execute_state):
+    """Массовые UPDATE/DELETE/INSERT по моделям каталога тоже меняют его версию"""
+    if orm_execute_state.is_select or orm_execute_state.session.info.get('catalog_bumped'):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.class_ in (Task, TaskCategory):
+        bump_version(orm_execute_state.session.connection())
+        orm_execute_state.session.info['catalog_bumped'] = True
+
+
+@event.listens_for(Session, 'after_transaction_end')
+def _reset_bump_flag(session, transaction):
+    if transaction.parent is None:
+        session.info.pop('catalog_bumped', None)
+
+
+def init_app(app):
+    app.extensions['catalog'] = CatalogCache()
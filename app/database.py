@@ -0,0 +1,124 @@
+# Профили движка БД: настройки соединений SQLite и пула серверной СУБД
+import click
+from sqlalchemy import event, select, update
+
+# Диалекты с FOR UPDATE SKIP LOCKED: конкурирующие выборки очередей не ждут друг друга
+SKIP_LOCKED_DIALECTS = {'postgresql', 'mysql', 'mariadb', 'oracle'}
+# Диалекты, где очередь арендуется одним UPDATE ... WHERE id IN (подзапрос с LIMIT) RETURNING.
+# MySQL/MariaDB не поддерживают ни UPDATE ... RETURNING, ни LIMIT в подзапросе IN,
+# ни выборку из изменяемой таблицы в подзапросе: там строки сначала блокируются SELECT.
+RETURNING_CLAIM_DIALECTS = {'postgresql', 'sqlite'}
+
+
+def claim_rows(session, model, condition, order_by, limit, values):
+    """
+    Атомарно записывает values в первые limit строк model, подходящих под condition,
+    в порядке order_by (последний столбец — id). Возвращает id измененных строк в этом порядке.
+    Конкурирующие вызовы получают разные строки. Без commit.
+    """
+    dialect = session.get_bind().dialect.name
+    candidates = select(model.id).where(condition).order_by(*order_by).limit(limit)
+    if dialect in SKIP_LOCKED_DIALECTS:
+        candidates = candidates.with_for_update(skip_locked=True)
+    if dialect in RETURNING_CLAIM_DIALECTS:
+        claimed = session.execute(
+            update(model)
+            .where(model.id.in_(candidates.scalar_subquery()), condition)
+            .values(**values)
+            .returning(model.id, *order_by),
+            execution_options={'synchronize_session': False},
+        ).all()
+        return [row[0] for row in sorted(claimed, key=lambda row: tuple(row[1:]))]
+    if dialect in SKIP_LOCKED_DIALECTS:
+        # Выбранные строки заблокированы до конца транзакции, поэтому UPDATE изменит их все
+        ids = session.scalars(candidates).all()
+        if ids:
+            session.execute(update(model).where(model.id.in_(ids)).values(**values),
+                            execution_options={'synchronize_session': False})
+        return ids
+    raise NotImplementedError(f'Claiming queue rows is not supported for the {dialect} dialect')
+
+
+def engine_profile(app):
+    """Профиль из DB_ENGINE_PROFILE; по умолчанию выбирается по схеме URI базы"""
+    profile = app.config.get('DB_ENGINE_PROFILE')
+    if profile:
+        return profile
+    return 'sqlite' if app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite') else 'server'
+
+
+def configure_engine(app):
+    """
+    Дополняет SQLALCHEMY_ENGINE_OPTIONS настройками профиля.
+    Вызывается до db.init_app, явно заданные в конфиге опции имеют приоритет.
+    """
+    options = {}
+    if engine_profile(app) == 'server':
+        options.update(
+            pool_size=app.config['DB_POOL_SIZE'],
+            max_overflow=app.config['DB_MAX_OVERFLOW'],
+            pool_pre_ping=app.config['DB_POOL_PRE_PING'],
+            pool_recycle=app.config['DB_POOL_RECYCLE'],
+        )
+    options.update(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+
+def sqlite_pragmas(app):
+    """PRAGMA, выполняемые на каждом новом соединении SQLite"""
+    return [
+        f"PRAGMA journal_mode={app.config['SQLITE_JOURNAL_MODE']}",
+        f"PRAGMA synchronous={app.config['SQLITE_SYNCHRONOUS']}",
+        f"PRAGMA busy_timeout={int(app.config['SQLITE_BUSY_TIMEOUT_MS'])}",
+        f"PRAGMA mmap_size={int(app.config['SQLITE_MMAP_SIZE'])}",
+    ]
+
+
+def init_app(app, db):
+    """Подключает настройку соединений SQLite к движкам приложения (после db.init_app)"""
+    if engine_profile(app) != 'sqlite':
+        return
+    pragmas = sqlite_pragmas(app)
+
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+    with app.app_context():
+        for engine in db.engines.values():
+            if engine.dialect.name == 'sqlite':
+                event.listen(engine, 'connect', on_connect)
+
+
+def init_migrate(app, db, include_object):
+    """Подключает Flask-Migrate (импорт alembic занимает ~250 мс)"""
+    if 'migrate' in app.extensions:
+        return
+    from flask_migrate import Migrate
+    Migrate(app, db, render_as_batch=True, include_object=include_object)
+
+
+class MigrateCommands(click.Group):
+    """
+    Группа `flask db`, подключающая Flask-Migrate при первом обращении к ней:
+    веб-процессы, которые не выполняют миграции, не импортируют alembic.
+    """
+
+    def __init__(self, app, db, include_object):
+        super().__init__('db', help='Perform database migrations.')
+        self.app, self.db, self.include_object = app, db, include_object
+
+    def migrate_group(self):
+        init_migrate(self.app, self.db, self.include_object)
+        from flask_migrate.cli import db as db_cli_group
+        return db_cli_group
+
+    def list_commands(self, ctx):
+        return self.migrate_group().list_commands(ctx)
+
+    def get_command(self, ctx, name):
+        return self.migrate_group().get_command(ctx, name)
@@ -0,0 +1,174 @@
+"""
+Генератор синтетических данных в объеме продакшена: пользователи, категории,
+задания и решения. Строки пишутся пачками через Core `executemany` в одной
+транзакции, поэтому миллион решений вставляется за секунды.
+
+Распределения приближены к реальным:
+- активность студентов неравномерна (распределение Парето): немногие присылают большую часть решений;
+- первые задания категории решают чаще последних;
+- время отправки смещено к недавним дням, с вечерним пиком и спадом ночью;
+- старые решения почти все проверены, непроверенные сосредоточены в последних днях.
+"""
+import itertools
+import math
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, select, func
+
+from app import db
+from app.catalog import bump_version
+from app.models import User, TaskCategory, Task, Solution
+from app.progress import rebuild_progress
+from app.search import sync_suspended
+from app.security import make_password_hash
+
+ADMIN_PASSWORD = 'admin123'
+STUDENT_PASSWORD = 'student123'
+CHUNK_SIZE = 10000
+
+# Доля решений по часам суток: ночью почти нет, пик вечером
+HOURLY_WEIGHTS = [1, 1, 1, 1, 1, 2, 3, 5, 7, 8, 8, 8, 9, 9, 8, 8, 9, 11, 13, 14, 13, 10, 6, 3]
+HOURLY_CUMULATIVE = list(itertools.accumulate(HOURLY_WEIGHTS))
+SAMPLE_ANSWERS = [
+    'She works in a bank.',
+    'He is reading a book now.',
+    'They have lived here since 2010.',
+    'I went to the cinema yesterday.',
+    'We will travel to London next year.',
+    'If I were you, I would study harder.',
+    'The letter was written by my sister.',
+]
+SAMPLE_FEEDBACK = [
+    'Correct, well done!',
+    'Good, but check the verb tense.',
+    'Almost: mind the article.',
+    'Incorrect word order.',
+]
+
+
+class DatabaseNotEmpty(Exception):
+    """База уже содержит пользователей: генератор работает только с пустой схемой"""
+
+
+def insert_chunked(connection, table, rows, chunk_size=CHUNK_SIZE):
+    """Вставляет строки из итератора пачками по chunk_size (executemany)"""
+    total = 0
+    rows = iter(rows)
+    while True:
+        chunk = list(itertools.islice(rows, chunk_size))
+        if not chunk:
+            return total
+        connection.execute(insert(table), chunk)
+        total += len(chunk)
+
+
+def cumulative(weights):
+    return list(itertools.accumulate(weights))
+
+
+def user_weights(count, rnd, alpha=1.2):
+    """Веса активности студентов по распределению Парето"""
+    return [rnd.paretovariate(alpha) for _ in range(count)]
+
+
+def task_weights(categories, tasks_per_category):
+    """Популярность заданий: в каждой категории убывает с номером задания (закон Ципфа)"""
+    return [1 / n for _ in range(categories) for n in range(1, tasks_per_category + 1)]
+
+
+def submission_ages(rnd, count, days, half_life_days, seconds_today):
+    """
+    Возраст отправки в секундах: экспоненциально чаще в последние дни,
+    внутри суток — по профилю HOURLY_WEIGHTS
+    """
+    rate = math.log(2) / half_life_days
+    hours = rnd.choices(range(24), cum_weights=HOURLY_CUMULATIVE, k=count)
+    ages = []
+    for hour in hours:
+        age_days = min(int(rnd.expovariate(rate)), days - 1)
+        age = age_days * 86400 + seconds_today - hour * 3600 - rnd.randrange(3600)
+        ages.append(max(age, 0))
+    return ages
+
+
+def solution_chunks(count, students, tasks, rnd, now, days, half_life_days, review_days, chunk_size):
+    """Пачки строк решений; вероятность проверки растет с возрастом решения"""
+    student_ids, student_cum = students
+    task_ids, task_cum = tasks
+    seconds_today = now.hour * 3600 + now.minute * 60 + now.second
+    review_rate = 1 / (review_days * 86400)
+    for start in range(0, count, chunk_size):
+        size = min(chunk_size, count - start)
+        user_ids = rnd.choices(student_ids, cum_weights=student_cum, k=size)
+        picked_tasks = rnd.choices(task_ids, cum_weights=task_cum, k=size)
+        ages = submission_ages(rnd, size, days, half_life_days, seconds_today)
+        chunk = []
+        for user_id, task_id, age in zip(user_ids, picked_tasks, ages):
+            submitted_at = now - timedelta(seconds=age)
+            reviewed = rnd.random() < 1 - math.exp(-age * review_rate)
+            chunk.append({
+                'user_id': user_id,
+                'task_id': task_id,
+                'content': rnd.choice(SAMPLE_ANSWERS),
+                'submitted_at': submitted_at,
+                'is_reviewed': reviewed,
+                'reviewed_at': submitted_at + timedelta(seconds=rnd.randrange(age + 1)) if reviewed else None,
+                'feedback': rnd.choice(SAMPLE_FEEDBACK) if reviewed else None,
+            })
+        yield chunk
+
+
+def generate(users, categories, tasks_per_category, solutions, admins=1, days=365, half_life_days=30,
+             review_days=2, seed=0, chunk_size=CHUNK_SIZE):
+    """
+    Заполняет пустую базу одной транзакцией и возвращает число созданных строк.
+    Преподаватели — `admin`, `admin2`, ...; студенты — `student1..N`.
+    """
+    if db.session.scalar(select(func.count()).select_from(User)):
+        raise DatabaseNotEmpty('В базе уже есть пользователи')
+
+    rnd = random.Random(seed)
+    now = datetime.utcnow().replace(microsecond=0)
+    connection = db.session.connection()
+    # Хеш считается один раз: стоимость хеширования не должна зависеть от объема.
+    # Параметры — из настроек приложения, иначе первый вход каждого пользователя перехеширует пароль
+    admin_hash = make_password_hash(ADMIN_PASSWORD)
+    student_hash = make_password_hash(STUDENT_PASSWORD)
+
+    # Индексы поиска перестраиваются один раз после загрузки, а не триггерами на каждую строку
+    with sync_suspended(connection):
+        insert_chunked(connection, User.__table__, itertools.chain(
+            ({'id': i, 'username': 'admin' if i == 1 else f'admin{i}', 'password_hash': admin_hash, 'is_admin': True}
+             for i in range(1, admins + 1)),
+            ({'id': admins + i, 'username': f'student{i}', 'password_hash': student_hash, 'is_admin': False}
+             for i in range(1, users + 1)),
+        ), chunk_size)
+        insert_chunked(connection, TaskCategory.__table__, (
+            {'id': c, 'name': f'Category {c}', 'description': f'Generated category {c}', 'updated_at': now}
+            for c in range(1, categories + 1)
+        ), chunk_size)
+        task_count = insert_chunked(connection, Task.__table__, (
+            {'id': (c - 1) * tasks_per_category + n, 'category_id': c, 'task_number': n,
+             'content': f'Complete the sentence #{c}-{n}: She ___ (to work) in a bank.', 'answer_key': 'works',
+             'created_at': now - timedelta(days=days), 'updated_at': now}
+            for c in range(1, categories + 1) for n in range(1, tasks_per_category + 1)
+        ), chunk_size)
+
+        solution_count = 0
+        if users and task_count:
+            students = range(admins + 1, admins + users + 1)
+            chunks = solution_chunks(
+                solutions,
+                (students, cumulative(user_weights(users, rnd))),
+                (range(1, task_count + 1), cumulative(task_weights(categories, tasks_per_category))),
+                rnd, now, days, half_life_days, review_days, chunk_size,
+            )
+            for chunk in chunks:
+                connection.execute(insert(Solution.__table__), chunk)
+                solution_count += len(chunk)
+
+    rebuild_progress()
+    bump_version(connection)
+    db.session.commit()
+    return {'users': admins + users, 'categories': categories, 'tasks': task_count, 'solutions': solution_count}
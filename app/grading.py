@@ -0,0 +1,288 @@
+"""
+Автоматическая проверка заданий с закрытым ответом.
+
+Ключ ответа (Task.answer_key) — допустимые варианты через `|`, например
+`works` или `They don't play football every Sunday.|They do not play football on Sundays.`
+Ответ и ключ нормализуются (регистр, пробелы, пунктуация, сокращения), после чего
+сравниваются. Для заданий с пропуском `___` принимается и отдельное слово, и всё
+предложение с заполненным пропуском.
+
+Вердикт: True — верно, False — точно неверно (другое заполнение пропуска),
+None — неоднозначно, решение остается преподавателю.
+"""
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+from functools import lru_cache
+from itertools import product
+
+from flask import current_app
+from sqlalchemy import and_, select, update, tuple_
+
+from app import db
+from app.jobs import handler
+from app.models import Solution, Task
+from app.progress import record_review, record_reviews
+
+BLANK = '___'
+AUTO_MARK = '(проверено автоматически)'
+
+# Однозначные сокращения
+CONTRACTIONS = {
+    "won't": 'will not', "can't": 'cannot', "shan't": 'shall not', "ain't": 'is not',
+    "i'm": 'i am', "let's": 'let us',
+}
+# Окончания: у "'s" и "'d" несколько расшифровок, проверяются все
+SUFFIXES = [
+    ("n't", ['not']), ("'re", ['are']), ("'ve", ['have']), ("'ll", ['will']),
+    ("'d", ['would', 'had']), ("'s", ['is', 'has']),
+]
+# Сокращения, написанные без апострофа. Только формы, которые не совпадают с обычными
+# словами: "well" (we'll), "were" (we're), "its" (it's), "ill" (I'll) не расшифровываются
+BARE_CONTRACTIONS = {
+    bare: contraction
+    for contraction in (
+        "don't", "doesn't", "didn't", "isn't", "aren't", "wasn't", "weren't", "haven't", "hasn't",
+        "hadn't", "won't", "can't", "couldn't", "shouldn't", "wouldn't", "mustn't", "needn't",
+        "i'm", "i've", "you're", "you've", "you'll", "they're", "they've", "they'll", "we've",
+    )
+    for bare in [contraction.replace("'", '')]
+}
+# "'s" после этих слов — глагол, в остальных случаях притяжательный падеж
+S_VERB_HOSTS = {'he', 'she', 'it', 'that', 'there', 'here', 'what', 'who', 'where', 'how', 'when'}
+APOSTROPHES = str.maketrans({'’': "'", '‘': "'", '`': "'"})
+PUNCTUATION_RE = re.compile(r"[^\w\s']|(?<!\w)'|'(?!\w)")
+HINT_RE = re.compile(r'\([^)]*\)')
+
+
+def _expand_word(word):
+    """Варианты расшифровки одного слова"""
+    word = BARE_CONTRACTIONS.get(word, word)
+    if word in CONTRACTIONS:
+        return [CONTRACTIONS[word]]
+    for suffix, expansions in SUFFIXES:
+        if word.endswith(suffix) and len(word) > len(suffix):
+            stem = word[:-len(suffix)]
+            if suffix == "n't":
+                # don't -> do not, isn't -> is not
+                return [f'{stem} not']
+            if suffix == "'s" and stem not in S_VERB_HOSTS:
+                return [word]
+            return [f'{stem} {expansion}' for expansion in expansions]
+    return [word]
+
+
+def variants(text):
+    """Все нормализованные формы текста (с учетом неоднозначных сокращений)"""
+    text = PUNCTUATION_RE.sub(' ', (text or '').translate(APOSTROPHES).casefold())
+    options = [_expand_word(word) for word in text.split()]
+    # Ограничение перебора: у длинного ответа с множеством "'s" / "'d" берется первая расшифровка
+    if len([1 for option in options if len(option) > 1]) > 6:
+        options = [option[:1] for option in options]
+    return {' '.join(' '.join(choice).split()) for choice in product(*options)}
+
+
+def _template(task_content):
+    """Предложение задания с пропуском: без инструкции перед двоеточием и подсказок в скобках"""
+    if not task_content or BLANK not in task_content:
+        return None
+    before, _, after = task_content.partition(BLANK)
+    if ':' in before:
+        before = before.rsplit(':', 1)[1]
+    return HINT_RE.sub(' ', before), HINT_RE.sub(' ', after)
+
+
+class Matcher:
+    """Скомпилированный ключ ответа"""
+    __slots__ = ('accepted', 'prefix', 'suffix', 'blank_words', 'display')
+
+    def __init__(self, answer_key, task_content=None):
+        alternatives = [alt.strip() for alt in answer_key.split('|') if alt.strip()]
+        self.display = alternatives[0] if alternatives else ''
+        self.accepted = set()
+        for alternative in alternatives:
+            self.accepted |= variants(alternative)
+        self.prefix = self.suffix = None
+        template = _template(task_content)
+        if template is not None:
+            before, after = template
+            # Принимается любой фрагмент предложения, содержащий заполненный пропуск:
+            # "works", "she works", "she works in a bank"
+            for prefix in variants(before):
+                prefix = prefix.split()
+                for suffix in variants(after):
+                    suffix = suffix.split()
+                    for alternative in alternatives:
+                        for fill in variants(alternative):
+                            fill = fill.split()
+                            for start in range(len(prefix) + 1):
+                                for end in range(len(suffix) + 1):
+                                    self.accepted.add(' '.join(prefix[start:] + fill + suffix[:end]))
+            self.prefix = min(variants(before), key=len).split()
+            self.suffix = min(variants(after), key=len).split()
+            self.blank_words = max((len(form.split()) for form in variants(' '.join(alternatives))), default=0)
+
+    def grade(self, answer):
+        forms = variants(answer)
+        if not forms or forms == {''}:
+            return None
+        if forms & self.accepted:
+            return True
+        if self.prefix is None:
+            return None
+        for form in forms:
+            words = form.split()
+            # Короткий ответ на месте пропуска или то же предложение с другим заполнением
+            if len(words) <= self.blank_words + 2:
+                return False
+            if len(words) >= len(self.prefix) + len(self.suffix) and words[:len(self.prefix)] == self.prefix \
+                    and words[len(words) - len(self.suffix):] == self.suffix:
+                return False
+        return None
+
+
+@lru_cache(maxsize=4096)
+def compile_matcher(answer_key, task_content=None):
+    return Matcher(answer_key, task_content)
+
+
+def grade(answer_key, task_content, answer):
+    """Вердикт для ответа: True, False или None (нет ключа или ответ неоднозначен)"""
+    if not answer_key or not answer_key.strip():
+        return None
+    return compile_matcher(answer_key, task_content).grade(answer)
+
+
+def feedback_for(verdict, answer_key):
+    if verdict:
+        return f'Верно! {AUTO_MARK}'
+    correct = compile_matcher(answer_key).display
+    return f'Неверно. Правильный ответ: {correct} {AUTO_MARK}'
+
+
+def auto_review(solution, task, record=True):
+    """
+    Проверяет новое решение по ключу задания (запись каталога или модель).
+    Возвращает вердикт; при однозначном вердикте решение отмечается проверенным (без commit).
+    record=False — проверку учитывает в сводке вызывающий (record_submissions).
+    """
+    verdict = grade(getattr(task, 'answer_key', None), task.content, solution.content)
+    if verdict is not None:
+        if record:
+            record_review(solution)
+        solution.feedback = feedback_for(verdict, task.answer_key)
+        solution.is_reviewed = True
+        solution.reviewed_at = datetime.utcnow()
+    return verdict
+
+
+def grade_rows(rows):
+    """
+    Проверка пачки в процессе пула: (id, answer_key, task_content, answer) -> (id, feedback).
+    Неоднозначные ответы в результат не попадают.
+    """
+    graded = []
+    for solution_id, answer_key, task_content, answer in rows:
+        verdict = grade(answer_key, task_content, answer)
+        if verdict is not None:
+            graded.append((solution_id, feedback_for(verdict, answer_key)))
+    return graded
+
+
+def pending_batches(batch_size):
+    """
+    Непроверенные решения заданий с ключом, пачками в порядке (submitted_at, id).
+    Порядок совпадает с индексом (is_reviewed, submitted_at): каждая пачка читается
+    по индексу без сортировки всех непроверенных решений.
+    """
+    last = None
+    while True:
+        query = (
+            select(Solution.id, Task.answer_key, Task.content, Solution.content, Solution.submitted_at)
+            .join(Task, Task.id == Solution.task_id)
+            .where(Solution.is_reviewed == False, Task.answer_key.isnot(None))
+            .order_by(Solution.submitted_at, Solution.id)
+            .limit(batch_size)
+        )
+        if last is not None:
+            query = query.where(tuple_(Solution.submitted_at, Solution.id) > tuple_(*last))
+        rows = db.session.execute(query).all()
+        if not rows:
+            return
+        last = (rows[-1].submitted_at, rows[-1].id)
+        yield [tuple(row)[:4] for row in rows]
+
+
+def save_grades(graded):
+    """
+    Записывает вердикты пачки: один UPDATE на каждый текст отзыва. Строки, которые
+    уже проверил преподаватель, не меняются; сводка прогресса учитывает только
+    фактически обновленные решения. Возвращает их число.
+    """
+    by_feedback = {}
+    for solution_id, feedback in graded:
+        by_feedback.setdefault(feedback, []).append(solution_id)
+    now = datetime.utcnow()
+    returning = db.session.get_bind().dialect.update_returning
+    reviewed = {}
+    for feedback, ids in by_feedback.items():
+        pending = and_(Solution.id.in_(ids), Solution.is_reviewed == False)
+        statement = update(Solution).values(feedback=feedback, is_reviewed=True, reviewed_at=now,
+                                            claimed_by=None, claim_expires_at=None)
+        if returning:
+            rows = db.session.execute(statement.where(pending).returning(Solution.user_id, Solution.task_id),
+                                      execution_options={'synchronize_session': False}).all()
+        else:
+            # MySQL/MariaDB: без UPDATE ... RETURNING строки сначала блокируются SELECT ... FOR UPDATE
+            locked = db.session.execute(
+                select(Solution.id, Solution.user_id, Solution.task_id).where(pending).with_for_update()
+            ).all()
+            if locked:
+                db.session.execute(statement.where(Solution.id.in_([row.id for row in locked])),
+                                   execution_options={'synchronize_session': False})
+            rows = [(row.user_id, row.task_id) for row in locked]
+        for user_id, task_id in rows:
+            reviewed[(user_id, task_id)] = reviewed.get((user_id, task_id), 0) + 1
+    record_reviews(reviewed, now)
+    db.session.commit()
+    return sum(reviewed.values())
+
+
+def grade_pending(workers=None, batch_size=2000, progress=None):
+    """
+    Проверяет накопившиеся решения: чтение и запись — в текущем процессе,
+    сравнение с ключами — в пуле процессов. Возвращает число проверенных решений.
+    progress(n) вызывается после записи каждой пачки с числом проверенных на данный момент.
+    """
+    workers = workers or os.cpu_count() or 1
+    total = 0
+
+    def save(future):
+        nonlocal total
+        total += save_grades(future.result())
+        if progress is not None:
+            progress(total)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Не больше двух пачек на процесс: память не растет вместе с очередью
+        in_flight = set()
+        limit = workers * 2
+        for batch in pending_batches(batch_size):
+            in_flight.add(pool.submit(grade_rows, batch))
+            if len(in_flight) >= limit:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    save(future)
+        for future in in_flight:
+            save(future)
+    return total
+
+
+@handler('grading.grade_pending')
+def grade_pending_job(context, workers=None, batch_size=None):
+    """Пакетная проверка как фоновая задача (кнопка на панели преподавателя)"""
+    graded = grade_pending(workers or current_app.config['GRADING_WORKERS'],
+                           batch_size or current_app.config['GRADING_BATCH_SIZE'],
+                           progress=context.progress)
+    return {'graded': graded}
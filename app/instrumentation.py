@@ -0,0 +1,91 @@
+# Учет SQL-запросов в рамках одного HTTP-запроса
+import json
+import logging
+import time
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_listening = False
+
+
+class QueryStats:
+    """Число запросов, суммарное время в БД и самый медленный запрос"""
+    __slots__ = ('count', 'total', 'slowest', 'slowest_statement')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.slowest = 0.0
+        self.slowest_statement = None
+
+    def record(self, statement, duration):
+        self.count += 1
+        self.total += duration
+        if duration >= self.slowest:
+            self.slowest = duration
+            self.slowest_statement = statement
+
+
+def _current_stats():
+    if not has_request_context():
+        return None
+    return g.get('sql_stats')
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Время начала хранится в контексте выполнения: если запрос упадет и
+    # after_cursor_execute не вызовется, отметка исчезнет вместе с контекстом,
+    # а не останется в соединении пула
+    if _current_stats() is not None:
+        context._sql_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats()
+    started = getattr(context, '_sql_started', None)
+    if stats is None or started is None:
+        return
+    stats.record(statement, time.perf_counter() - started)
+
+
+def _start_request():
+    g.sql_stats = QueryStats()
+
+
+def _finish_request(response):
+    stats = g.pop('sql_stats', None)
+    if stats is None:
+        return response
+    total_ms = stats.total * 1000
+    if current_app.config['SQL_INSTRUMENTATION_HEADER']:
+        response.headers.add('Server-Timing', f'db;dur={total_ms:.2f};desc="{stats.count} queries"')
+    if total_ms >= current_app.config['SQL_INSTRUMENTATION_LOG_MS']:
+        current_app.logger.getChild('sql').info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'endpoint': request.endpoint,
+            'status': response.status_code,
+            'queries': stats.count,
+            'db_ms': round(total_ms, 2),
+            'slowest_ms': round(stats.slowest * 1000, 2),
+            'slowest_statement': (stats.slowest_statement or '')[:500],
+        }, ensure_ascii=False))
+    return response
+
+
+def init_app(app):
+    """
+    Включает учет SQL-запросов, если задан SQL_INSTRUMENTATION.
+    Итоги отдаются в заголовке Server-Timing и одной JSON-строкой лога на запрос.
+    """
+    global _listening
+    if not app.config['SQL_INSTRUMENTATION']:
+        return
+    if not _listening:
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        _listening = True
+    app.logger.getChild('sql').setLevel(logging.INFO)
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
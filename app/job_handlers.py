@@ -0,0 +1,186 @@
+"""
+Обработчики фоновых задач каталога (выгрузка, пакетная загрузка, удаление категории)
+и общий с API код, который им нужен. Модуль не зависит от веб-части: его загружает воркер.
+"""
+import json
+import os
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import select, tuple_, update, delete
+from sqlalchemy.exc import IntegrityError
+from pytz import UTC
+from app.models import TaskCategory, Task, Solution
+from app.catalog import get_catalog, with_content
+from app.jobs import handler, result_path
+from app.progress import forget_category
+from app import db
+
+
+def serialize_task(task):
+    return {
+        'id': task.id,
+        'category_id': task.category_id,
+        'task_number': task.task_number,
+        'content': task.content,
+        'created_at': task.created_at.isoformat(),
+        'full_id': task.get_full_id()
+    }
+
+
+def ndjson_line(task):
+    return json.dumps(serialize_task(task), ensure_ascii=False) + '\n'
+
+
+@handler('tasks.export')
+def export_tasks_job(context, category_id=None):
+    """
+    Выгрузка в файл из снимка каталога: пишется во временный файл и переименовывается,
+    повтор начинает заново
+    """
+    catalog = get_catalog()
+    tasks = catalog.tasks if category_id is None else catalog.tasks_by_category.get(category_id, ())
+    path = result_path(context.job_id, '.ndjson')
+    batch = current_app.config['API_EXPORT_BATCH_SIZE']
+    with open(path + '.part', 'w', encoding='utf-8') as output:
+        for start in range(0, len(tasks), batch):
+            output.writelines(ndjson_line(task) for task in with_content(tasks[start:start + batch]))
+            context.progress(min(start + batch, len(tasks)), len(tasks))
+    os.replace(path + '.part', path)
+    return {'tasks': len(tasks), 'file': os.path.basename(path)}
+
+
+@handler('categories.delete')
+def delete_category_job(context, category_id):
+    """
+    Удаление категории вместе с заданиями и решениями порциями заданий:
+    каждая порция — отдельная транзакция, повтор продолжает с оставшихся
+    """
+    task_ids = db.session.scalars(select(Task.id).where(Task.category_id == category_id)).all()
+    size = current_app.config['JOB_DELETE_BATCH_SIZE']
+    for start in range(0, len(task_ids), size):
+        chunk = task_ids[start:start + size]
+        db.session.execute(delete(Solution).where(Solution.task_id.in_(chunk)))
+        db.session.execute(delete(Task).where(Task.id.in_(chunk)))
+        context.progress(start + len(chunk), len(task_ids))
+    forget_category(category_id)
+    deleted = db.session.execute(delete(TaskCategory).where(TaskCategory.id == category_id)).rowcount
+    db.session.commit()
+    return {'category_id': category_id, 'deleted': bool(deleted), 'tasks': len(task_ids)}
+
+
+def chunked(items, size):
+    """Делит список на части, чтобы не превышать лимит параметров запроса"""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def validate_bulk_item(item):
+    """Проверяет одну запись пакета; возвращает текст ошибки или None"""
+    if not isinstance(item, dict):
+        return 'Task must be an object'
+    for field in ('category_id', 'task_number'):
+        value = item.get(field)
+        if not isinstance(value, int) or isinstance(value, bool):
+            return f'{field} must be an integer'
+    content = item.get('content')
+    if not isinstance(content, str) or not content.strip():
+        return 'Task content is required'
+    if item.get('answer_key') is not None and not isinstance(item['answer_key'], str):
+        return 'answer_key must be a string'
+    return None
+
+
+def import_tasks(items, upsert=False):
+    """
+    Пакетное создание (или обновление при upsert=true) заданий.
+    Категории и номера проверяются несколькими запросами на весь пакет,
+    все изменения записываются одной транзакцией. Возвращает (тело ответа, статус).
+    """
+    results = [None] * len(items)
+    valid = {}
+    for index, item in enumerate(items):
+        error = validate_bulk_item(item)
+        if error:
+            results[index] = {'index': index, 'status': 'error', 'message': error}
+            continue
+        key = (item['category_id'], item['task_number'])
+        if key in valid:
+            results[index] = {'index': index, 'status': 'error',
+                              'message': 'Duplicate task number in request'}
+            continue
+        valid[key] = index
+
+    """ Проверка существования всех категорий одним запросом """
+    category_ids = list({key[0] for key in valid})
+    known_categories = set()
+    for chunk in chunked(category_ids, 500):
+        known_categories.update(db.session.scalars(
+            select(TaskCategory.id).where(TaskCategory.id.in_(chunk))
+        ))
+    for key, index in list(valid.items()):
+        if key[0] not in known_categories:
+            results[index] = {'index': index, 'status': 'error', 'message': 'Category not found'}
+            del valid[key]
+
+    """ Поиск уже существующих заданий по парам (категория, номер) """
+    existing = {}
+    for chunk in chunked(list(valid), 400):
+        rows = db.session.execute(
+            select(Task.id, Task.category_id, Task.task_number)
+            .where(tuple_(Task.category_id, Task.task_number).in_(chunk))
+        )
+        existing.update({(row.category_id, row.task_number): row.id for row in rows})
+
+    created = []
+    updates = []
+    now = datetime.now(UTC)
+    for key, index in valid.items():
+        content = items[index]['content']
+        answer_key = items[index].get('answer_key')
+        if key in existing:
+            if not upsert:
+                results[index] = {'index': index, 'status': 'error',
+                                  'message': 'Task with this number already exists in this category'}
+                continue
+            changes = {'id': existing[key], 'content': content, 'updated_at': now}
+            if answer_key is not None:
+                changes['answer_key'] = answer_key or None
+            updates.append(changes)
+            results[index] = {'index': index, 'status': 'updated', 'id': existing[key]}
+        else:
+            task = Task(category_id=key[0], task_number=key[1], content=content, answer_key=answer_key or None)
+            created.append((index, task))
+
+    if created or updates:
+        db.session.add_all(task for _, task in created)
+        if updates:
+            db.session.execute(update(Task), updates)
+        try:
+            db.session.flush()
+        except IntegrityError:
+            db.session.rollback()
+            return {'message': 'Tasks were modified concurrently, retry the request'}, 409
+        """ Идентификаторы собираются до commit, иначе каждый объект перечитывался бы из БД """
+        for index, task in created:
+            results[index] = {'index': index, 'status': 'created', 'id': task.id,
+                              'full_id': task.get_full_id()}
+        db.session.commit()
+
+    errors = sum(1 for result in results if result['status'] == 'error')
+    summary = {
+        'created': len(created),
+        'updated': len(updates),
+        'errors': errors,
+        'results': results
+    }
+    return summary, 207 if errors else 201
+
+
+@handler('tasks.import')
+def import_tasks_job(context, items, upsert=False):
+    summary, status = import_tasks(items, upsert)
+    if status == 409:
+        # Конкурентное изменение: задача будет повторена с задержкой
+        raise RuntimeError(summary['message'])
+    context.progress(len(items), len(items))
+    return summary
@@ -0,0 +1,184 @@
+"""
+Фоновые задачи в таблице jobs. Обработчик регистрируется декоратором `handler`,
+HTTP-запрос только ставит задачу в очередь (`enqueue`) и сразу отвечает 202.
+Задачи выполняет отдельный процесс worker.py: воркер атомарно арендует следующую
+задачу, при ошибке она возвращается в очередь с экспоненциальной задержкой.
+Если воркер упал, аренда истекает и задачу берет другой воркер.
+"""
+import importlib
+import json
+import os
+import socket
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app
+from pytz import UTC
+from sqlalchemy import update, or_, and_
+
+from app import db
+from app.database import claim_rows
+from app.models import Job
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = 'queued', 'running', 'succeeded', 'failed'
+STATUSES = (QUEUED, RUNNING, SUCCEEDED, FAILED)
+
+# Обработчики по виду задачи: kind -> функция(context, **payload)
+HANDLERS = {}
+# Модули с обработчиками: воркер загружает их сам, без веб-части приложения
+HANDLER_MODULES = ('app.grading', 'app.job_handlers')
+
+
+class JobFailed(Exception):
+    """Ошибка, которую повтор не исправит: задача сразу завершается неудачей"""
+
+
+def handler(kind):
+    """Регистрирует обработчик фоновых задач вида kind"""
+    def register(func):
+        HANDLERS[kind] = func
+        return func
+    return register
+
+
+def load_handlers():
+    for module in HANDLER_MODULES:
+        importlib.import_module(module)
+
+
+def enqueue(kind, payload=None, created_by=None, max_attempts=None):
+    """Ставит задачу в очередь (без commit) и возвращает ее"""
+    if kind not in HANDLERS:
+        raise ValueError(f'Unknown job kind: {kind}')
+    job = Job(kind=kind, payload=json.dumps(payload or {}), status=QUEUED, created_by=created_by,
+              max_attempts=max_attempts or current_app.config['JOB_MAX_ATTEMPTS'],
+              run_after=datetime.now(UTC))
+    db.session.add(job)
+    db.session.flush()
+    return job
+
+
+def retry_delay(attempt):
+    """Задержка перед повтором после неудачной попытки attempt: 1x, 2x, 4x ... базовой"""
+    base = current_app.config['JOB_RETRY_BASE_SECONDS']
+    return min(base * 2 ** (attempt - 1), current_app.config['JOB_RETRY_MAX_SECONDS'])
+
+
+def default_worker_id():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def runnable(now):
+    """Условие: задача ждет в очереди и срок задержки прошел, либо аренда воркера истекла"""
+    return or_(and_(Job.status == QUEUED, Job.run_after <= now),
+               and_(Job.status == RUNNING, Job.locked_until <= now))
+
+
+def claim_job(worker_id, lease_seconds=None):
+    """
+    Атомарно арендует следующую задачу и возвращает ее id (None, если выполнять нечего).
+    Задачу получает один воркер (database.claim_rows, как и очередь проверки).
+    """
+    now = datetime.now(UTC)
+    lease = lease_seconds or current_app.config['JOB_LEASE_SECONDS']
+    claimed = claim_rows(db.session, Job, runnable(now), [Job.run_after, Job.id], 1, {
+        'status': RUNNING, 'locked_by': worker_id, 'locked_until': now + timedelta(seconds=lease),
+        'attempts': Job.attempts + 1, 'started_at': now,
+    })
+    db.session.commit()
+    return claimed[0] if claimed else None
+
+
+class JobContext:
+    """То, что обработчик знает о своей задаче: id, номер попытки и отчет о прогрессе"""
+
+    def __init__(self, job, worker_id, lease_seconds):
+        self.job_id = job.id
+        self.attempt = job.attempts
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+
+    def progress(self, done, total=None):
+        """
+        Сохраняет прогресс и продлевает аренду. Фиксирует текущую транзакцию:
+        обработчик вызывает его между завершенными порциями работы. Отметка пишется
+        в новой транзакции: в SQLite запись после чтения в той же транзакции
+        не ждет busy_timeout, а сразу падает, если базу успел изменить другой процесс.
+        """
+        db.session.commit()
+        values = {'progress_done': done,
+                  'locked_until': datetime.now(UTC) + timedelta(seconds=self.lease_seconds)}
+        if total is not None:
+            values['progress_total'] = total
+        db.session.execute(
+            update(Job).where(Job.id == self.job_id, Job.locked_by == self.worker_id).values(**values),
+            execution_options={'synchronize_session': False},
+        )
+        db.session.commit()
+
+
+def run_job(job_id, worker_id, lease_seconds=None):
+    """Выполняет арендованную задачу и записывает результат или ошибку; возвращает итоговый статус"""
+    lease = lease_seconds or current_app.config['JOB_LEASE_SECONDS']
+    job = db.session.get(Job, job_id)
+    func = HANDLERS.get(job.kind)
+    try:
+        if func is None:
+            raise JobFailed(f'Unknown job kind: {job.kind}')
+        if job.attempts > job.max_attempts:
+            raise JobFailed('Worker lease expired on the last attempt')
+        result = func(JobContext(job, worker_id, lease), **json.loads(job.payload))
+    except Exception as exc:
+        db.session.rollback()
+        current_app.logger.exception('Job %s (%s) failed on attempt %s', job_id, job.kind, job.attempts)
+        job = db.session.get(Job, job_id)
+        job.error = f'{type(exc).__name__}: {exc}'
+        if isinstance(exc, JobFailed) or job.attempts >= job.max_attempts:
+            job.status = FAILED
+            job.finished_at = datetime.now(UTC)
+        else:
+            job.status = QUEUED
+            job.run_after = datetime.now(UTC) + timedelta(seconds=retry_delay(job.attempts))
+    else:
+        job = db.session.get(Job, job_id)
+        job.status = SUCCEEDED
+        job.result = json.dumps(result)
+        job.error = None
+        job.finished_at = datetime.now(UTC)
+    job.locked_by = job.locked_until = None
+    db.session.commit()
+    return job.status
+
+
+def work(worker_id=None, stop_when_idle=False, stop=None):
+    """
+    Цикл воркера: арендует и выполняет задачи, пока не выставлен stop (threading/multiprocessing Event).
+    При stop_when_idle возвращается, как только готовых к запуску задач не осталось.
+    Возвращает число выполненных попыток.
+    """
+    load_handlers()
+    worker_id = worker_id or default_worker_id()
+    poll = current_app.config['JOB_POLL_SECONDS']
+    processed = 0
+    while stop is None or not stop.is_set():
+        job_id = claim_job(worker_id)
+        if job_id is None:
+            if stop_when_idle:
+                break
+            if stop is not None:
+                stop.wait(poll)
+            else:
+                time.sleep(poll)
+            continue
+        run_job(job_id, worker_id)
+        processed += 1
+        # Объекты выполненной задачи не копятся в сессии долгоживущего процесса
+        db.session.remove()
+    return processed
+
+
+def result_path(job_id, suffix):
+    """Файл с результатом задачи (например, выгрузки) в каталоге JOB_RESULTS_DIR"""
+    directory = current_app.config['JOB_RESULTS_DIR']
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, f'job-{job_id}{suffix}')
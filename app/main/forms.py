@@ -17,6 +17,11 @@ class SolutionForm(FlaskForm):
     submit = SubmitField('Отправить решение')
 
 
+class WorksheetForm(FlaskForm):
+    """Лист заданий категории: поля ответов answer-<id задания> добавляет шаблон"""
+    submit = SubmitField('Отправить все ответы')
+
+
 class FeedbackForm(FlaskForm):
     feedback = TextAreaField('Your comment', validators=[DataRequired()])
     submit = SubmitField('Send feedback')
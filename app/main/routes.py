@@ -1,45 +1,85 @@
-from flask import render_template, flash, redirect, url_for, request
+from flask import render_template, flash, redirect, url_for, request, abort, current_app, jsonify
 from flask_login import login_required, current_user
 from app.main import bp
 from app import db
-from app.models import Task, TaskCategory, Solution, User
-from app.main.forms import SolutionForm
+from app.catalog import get_catalog, with_content
+from app.models import Solution, UserProgress
+from app.main.forms import SolutionForm, WorksheetForm
+from app.pagination import InvalidCursor, split_page, rows_after, decode_submission_cursor, submission_key
+from app.progress import record_submission
+from app.grading import auto_review
+from app.templating import cached_fragment, cached_for_anonymous, viewer_kind
+from app.worksheets import WorksheetError, parse_answers, submit_worksheet
 from datetime import datetime
 
 
 @bp.route('/')
 @bp.route('/index')
+@cached_for_anonymous
 def index():
     """Главная страница приложения"""
-    categories = TaskCategory.query.all()
-    return render_template('main/index.html', title='Home', categories=categories)
+    categories = get_catalog().categories
+    categories_html = cached_fragment('main/_categories.html', ['categories'], categories=categories)
+    return render_template('main/index.html', title='Home', categories_html=categories_html)
 
 
 @bp.route('/category/<int:category_id>')
+@cached_for_anonymous
 def category(category_id):
-    """Страница категории заданий"""
-    category = TaskCategory.query.get_or_404(category_id)
-    tasks = Task.query.filter_by(category_id=category.id).order_by(Task.task_number).all()
+    """Страница категории заданий; карточки заданий берутся из кэша фрагментов"""
+    catalog = get_catalog()
+    category = catalog.categories_by_id.get(category_id)
+    if category is None:
+        abort(404)
+    tasks = with_content(catalog.tasks_by_category.get(category.id, ()))
     form = SolutionForm() if current_user.is_authenticated and not current_user.is_admin else None
+    tasks_html = cached_fragment('main/_category_tasks.html', [category.id, viewer_kind()], tasks=tasks, form=form)
     return render_template('main/category.html',
                            title=category.name,
                            category=category,
-                           tasks=tasks,
-                           form=form)
+                           tasks_html=tasks_html)
 
 
 @bp.route('/dashboard')
 @login_required
 def dashboard():
-    """Страница личного кабинета пользователя"""
+    """
+    Страница личного кабинета пользователя: сводка по категориям из user_progress
+    и последние решения порциями по DASHBOARD_PAGE_SIZE
+    """
     if current_user.is_admin:
         return redirect(url_for('admin.dashboard'))
-        
-    solutions = Solution.query.filter_by(user_id=current_user.id).order_by(Solution.submitted_at.desc()).all()
+
+    catalog = get_catalog()
+    progress = UserProgress.query.filter_by(user_id=current_user.id).all()
+    progress.sort(key=lambda row: row.category_id)
+
+    limit = current_app.config['DASHBOARD_PAGE_SIZE']
+    query = Solution.query.filter_by(user_id=current_user.id)
+    if 'cursor' in request.args:
+        try:
+            after = decode_submission_cursor(request.args['cursor'])
+        except InvalidCursor:
+            abort(400)
+        query = query.filter(rows_after([Solution.submitted_at, Solution.id], after, descending=True))
+    solutions = query.order_by(Solution.submitted_at.desc(), Solution.id.desc()).limit(limit + 1).all()
+    solutions, next_cursor = split_page(solutions, limit, submission_key)
+
     form = SolutionForm()
     return render_template('main/dashboard.html',
                            title='Личный кабинет',
+                           progress=progress,
+                           totals={
+                               'submitted': sum(row.submitted_count for row in progress),
+                               'reviewed': sum(row.reviewed_count for row in progress),
+                               'pending': sum(row.pending_count for row in progress),
+                           },
+                           categories=catalog.categories_by_id,
+                           tasks={task.id: task for task in with_content(
+                               catalog.tasks_by_id[solution.task_id] for solution in solutions
+                               if solution.task_id in catalog.tasks_by_id)},
                            solutions=solutions,
+                           next_cursor=next_cursor,
                            form=form)
 
 
@@ -52,6 +92,11 @@ def submit_solution():
         
     form = SolutionForm()
     if form.validate_on_submit():
+        task = get_catalog().tasks_by_id.get(form.task_id.data)
+        if task is None:
+            flash('Задание не найдено.', 'danger')
+            return redirect(url_for('main.dashboard'))
+        task = with_content([task])[0]
         solution = Solution(
             user_id=current_user.id,
             task_id=form.task_id.data,
@@ -59,7 +104,64 @@ def submit_solution():
             submitted_at=datetime.utcnow()
         )
         db.session.add(solution)
+        record_submission(solution)
+        verdict = auto_review(solution, task)
         db.session.commit()
-        flash('Решение успешно отправлено на проверку!', 'success')
+        if verdict is None:
+            flash('Решение успешно отправлено на проверку!', 'success')
+        elif verdict:
+            flash('Решение проверено автоматически: верно!', 'success')
+        else:
+            flash('Решение проверено автоматически: есть ошибка, см. отзыв.', 'warning')
         return redirect(url_for('main.dashboard'))
     return render_template('main/submit_solution.html', form=form)
+
+
+@bp.route('/category/<int:category_id>/worksheet', methods=['GET', 'POST'])
+@login_required
+def worksheet(category_id):
+    """
+    Лист заданий: ответы на все задания категории одной формой или одним JSON-запросом
+    ({"answers": [{"task_id": ..., "content": ...}]}). Все решения сохраняются одной транзакцией.
+    """
+    if current_user.is_admin:
+        if request.is_json:
+            return jsonify(message='Worksheets are available to students only'), 403
+        flash('Эта страница доступна только для студентов.', 'warning')
+        return redirect(url_for('admin.dashboard'))
+
+    catalog = get_catalog()
+    category = catalog.categories_by_id.get(category_id)
+    if category is None:
+        abort(404)
+
+    if request.method == 'POST' and request.is_json:
+        # JSON-запрос без токена CSRF: браузер не отправит application/json на чужой сайт без CORS
+        try:
+            answers = parse_answers(request.get_json(silent=True))
+        except WorksheetError as error:
+            return jsonify(message=str(error)), 400
+        if not answers:
+            return jsonify(message='At least one answer is required'), 400
+        results = submit_worksheet(catalog, current_user.id, category.id, answers)
+        submitted = sum(1 for result in results if result['status'] == 'submitted')
+        return jsonify(submitted=submitted, errors=len(results) - submitted,
+                       results=results), 207 if submitted < len(results) else 201
+
+    tasks = with_content(catalog.tasks_by_category.get(category.id, ()))
+    form = WorksheetForm()
+    if form.validate_on_submit():
+        answers = [(task.id, request.form.get(f'answer-{task.id}', '')) for task in tasks]
+        answers = [(task_id, content) for task_id, content in answers if content.strip()]
+        if not answers:
+            flash('Заполните ответ хотя бы на одно задание.', 'warning')
+            return redirect(url_for('main.worksheet', category_id=category.id))
+        results = submit_worksheet(catalog, current_user.id, category.id, answers)
+        submitted = [result for result in results if result['status'] == 'submitted']
+        graded = [result for result in submitted if result['verdict'] is not None]
+        flash(f'Отправлено решений: {len(submitted)}, проверено автоматически: {len(graded)} '
+              f'(верно: {sum(1 for result in graded if result["verdict"])}).', 'success')
+        if len(submitted) < len(results):
+            flash(f'Не приняты ответы: {len(results) - len(submitted)} (слишком длинные).', 'warning')
+        return redirect(url_for('main.dashboard'))
+    return render_template('main/worksheet.html', title=category.name, category=category, tasks=tasks, form=form)
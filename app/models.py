@@ -1,14 +1,10 @@
 # Модели базы данных для приложения изучения английского языка
 from datetime import datetime
 from pytz import UTC
-from app import db, login_manager
+from app import db
 from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
-
-
-@login_manager.user_loader
-def load_user(id):
-    return User.query.get(int(id))
+from werkzeug.security import check_password_hash
+from app.security import make_password_hash, needs_rehash
 
 
 class User(UserMixin, db.Model):
@@ -17,19 +13,18 @@ class User(UserMixin, db.Model):
 
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(64), unique=True, nullable=False)
-    password_hash = db.Column(db.String(128), nullable=False)
+    password_hash = db.Column(db.String(256), nullable=False)
     is_admin = db.Column(db.Boolean, default=False, nullable=False)
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = make_password_hash(password)
 
     def check_password(self, password):
         return check_password_hash(self.password_hash, password)
 
-@login_manager.user_loader
-def load_user(user_id):
-    return db.session.get(User, int(user_id))
-
+    def password_needs_rehash(self):
+        """Хеш создан с устаревшими параметрами (PASSWORD_HASH_METHOD / PASSWORD_SALT_LENGTH)"""
+        return needs_rehash(self.password_hash)
 
 class TaskCategory(db.Model):
     """Модель для организации заданий по категориям"""
@@ -38,18 +33,30 @@ class TaskCategory(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), unique=True, nullable=False)
     description = db.Column(db.String(300))
+    # Время последнего изменения; служит валидатором для условных GET в API
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(UTC),
+                           onupdate=lambda: datetime.now(UTC))
     tasks = db.relationship('Task', backref='category', lazy=True)
 
 
 class Task(db.Model):
     """Модель для хранения заданий по английскому языку"""
     __tablename__ = 'tasks'
+    __table_args__ = (
+        # Номер задания уникален в рамках категории; индекс обслуживает
+        # выборку заданий категории по порядку номеров
+        db.Index('ix_tasks_category_id_task_number', 'category_id', 'task_number', unique=True),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     category_id = db.Column(db.Integer, db.ForeignKey('task_categories.id'), nullable=False)
     task_number = db.Column(db.Integer, nullable=False)
     content = db.Column(db.Text, nullable=False)
+    # Ключ ответа для автоматической проверки: допустимые варианты через '|'
+    answer_key = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(UTC))
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(UTC),
+                           onupdate=lambda: datetime.now(UTC))
 
     def get_full_id(self):
         """Генерирует полный ID задачи в формате 'категория_номер'"""
@@ -59,6 +66,14 @@ class Task(db.Model):
 class Solution(db.Model):
     """Модель для хранения решений пользователей"""
     __tablename__ = 'solutions'
+    __table_args__ = (
+        # История решений студента (личный кабинет)
+        db.Index('ix_solutions_user_id_submitted_at', 'user_id', 'submitted_at'),
+        # Очередь непроверенных решений (панель преподавателя)
+        db.Index('ix_solutions_is_reviewed_submitted_at', 'is_reviewed', 'submitted_at'),
+        # Решения, взятые преподавателем в работу (очередь проверки)
+        db.Index('ix_solutions_claimed_by_claim_expires_at', 'claimed_by', 'claim_expires_at'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'))
@@ -68,6 +83,61 @@ class Solution(db.Model):
     submitted_at = db.Column(db.DateTime, default=lambda: datetime.now(UTC))
     reviewed_at = db.Column(db.DateTime)
     is_reviewed = db.Column(db.Boolean, default=False)
+    # Аренда решения преподавателем: до claim_expires_at его не выдают другим
+    claimed_by = db.Column(db.Integer, db.ForeignKey('users.id', name='fk_solutions_claimed_by_users'))
+    claim_expires_at = db.Column(db.DateTime)
 
     task = db.relationship('Task', backref='solutions')
-    user = db.relationship('User', backref='solutions')
\ No newline at end of file
+    user = db.relationship('User', backref='solutions', foreign_keys=[user_id])
+
+
+class UserProgress(db.Model):
+    """Сводка успеваемости студента по категории, обновляется при отправке и проверке решений"""
+    __tablename__ = 'user_progress'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    category_id = db.Column(db.Integer, db.ForeignKey('task_categories.id'), primary_key=True)
+    submitted_count = db.Column(db.Integer, nullable=False, default=0)
+    reviewed_count = db.Column(db.Integer, nullable=False, default=0)
+    last_activity_at = db.Column(db.DateTime)
+
+    @property
+    def pending_count(self):
+        return self.submitted_count - self.reviewed_count
+
+
+class CatalogVersion(db.Model):
+    """Счетчик версий каталога (категории и задания) для инвалидации его кэша"""
+    __tablename__ = 'catalog_version'
+
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+
+class Job(db.Model):
+    """Фоновая задача: выполняется процессом worker.py вне HTTP-запроса"""
+    __tablename__ = 'jobs'
+    __table_args__ = (
+        # Выборка следующей задачи воркером: статус и время, с которого ее можно запускать
+        db.Index('ix_jobs_status_run_after', 'status', 'run_after'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(64), nullable=False)
+    # Аргументы и результат обработчика в JSON
+    payload = db.Column(db.Text, nullable=False, default='{}')
+    result = db.Column(db.Text)
+    status = db.Column(db.String(16), nullable=False, default='queued')
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=3)
+    run_after = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    # Аренда воркером: после locked_until зависшая задача снова выдается
+    locked_by = db.Column(db.String(64))
+    locked_until = db.Column(db.DateTime)
+    progress_done = db.Column(db.Integer, nullable=False, default=0)
+    progress_total = db.Column(db.Integer)
+    error = db.Column(db.Text)
+    created_by = db.Column(db.Integer, db.ForeignKey('users.id', name='fk_jobs_created_by_users'))
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
@@ -0,0 +1,74 @@
+# Курсоры keyset-пагинации, общие для API и страниц приложения
+import base64
+import binascii
+import json
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import literal, tuple_
+
+# Начало отсчета для времени в курсорах (даты в БД хранятся в UTC без пояса)
+EPOCH = datetime(1970, 1, 1)
+
+
+class InvalidCursor(ValueError):
+    """Курсор пагинации не удалось разобрать"""
+
+
+def encode_cursor(values):
+    """Упаковывает ключ последней строки страницы в непрозрачный курсор"""
+    raw = json.dumps(list(values), separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode()
+
+
+def decode_cursor(cursor, size):
+    """Распаковывает курсор обратно в ключ из `size` целых чисел"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, ValueError):
+        raise InvalidCursor(cursor)
+    if (not isinstance(values, list) or len(values) != size
+            or not all(isinstance(v, int) and not isinstance(v, bool) for v in values)):
+        raise InvalidCursor(cursor)
+    return values
+
+
+def split_page(rows, limit, key):
+    """
+    Страница выбирается с одной лишней строкой: если она есть, значит есть и следующая
+    страница, курсор которой строится по ключу последней строки текущей.
+    """
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(key(rows[-1]))
+
+
+def rows_after(columns, key, descending=False):
+    """
+    Условие keyset-выборки: строки, идущие после ключа key в порядке columns.
+    Ключ хранится в самом курсоре, поэтому выборка продолжается,
+    даже если последняя строка прошлой страницы уже удалена.
+    """
+    anchor = tuple_(*(literal(value, column.type) for column, value in zip(columns, key)))
+    return tuple_(*columns) < anchor if descending else tuple_(*columns) > anchor
+
+
+def datetime_key(moment):
+    """Момент времени (UTC) как целое число микросекунд для курсора"""
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return (moment - EPOCH) // timedelta(microseconds=1)
+
+
+def submission_key(solution):
+    """Ключ курсора решения: (submitted_at, id)"""
+    return [datetime_key(solution.submitted_at), solution.id]
+
+
+def decode_submission_cursor(cursor):
+    """Курсор решений обратно в ключ (submitted_at, id)"""
+    microseconds, solution_id = decode_cursor(cursor, 2)
+    try:
+        return EPOCH + timedelta(microseconds=microseconds), solution_id
+    except OverflowError:
+        raise InvalidCursor(cursor)
@@ -0,0 +1,181 @@
+"""
+Сводка успеваемости студентов (таблица user_progress). Счетчики меняются
+инкрементально в той же транзакции, что и решение: атомарный upsert не
+требует предварительного чтения строки и безопасен при параллельных запросах.
+"""
+from datetime import datetime
+
+from sqlalchemy import bindparam, delete, insert, select, update, func, case
+from werkzeug.utils import import_string
+
+from app import db
+from app.catalog import get_catalog
+from app.models import UserProgress, Solution, Task
+
+# Диалекты с INSERT ... ON CONFLICT DO UPDATE. Модуль диалекта импортируется при первом
+# upsert: к этому моменту он уже загружен движком, а postgresql при запуске стоит ~60 мс
+UPSERT_DIALECTS = {'sqlite': 'sqlalchemy.dialects.sqlite:insert',
+                   'postgresql': 'sqlalchemy.dialects.postgresql:insert'}
+
+
+def _increment(user_id, category_id, submitted, reviewed, at):
+    _increment_many([{'user_id': user_id, 'category_id': category_id, 'submitted_count': submitted,
+                      'reviewed_count': reviewed, 'last_activity_at': at}])
+
+
+def _increment_many(rows):
+    """Прибавляет счетчики строк сводки; с upsert — одним executemany на все строки"""
+    table = UserProgress.__table__
+    upsert = UPSERT_DIALECTS.get(db.session.get_bind().dialect.name)
+    if upsert is not None:
+        statement = import_string(upsert)(table)
+        db.session.execute(statement.on_conflict_do_update(
+            index_elements=[table.c.user_id, table.c.category_id],
+            set_={
+                'submitted_count': table.c.submitted_count + statement.excluded.submitted_count,
+                'reviewed_count': table.c.reviewed_count + statement.excluded.reviewed_count,
+                'last_activity_at': statement.excluded.last_activity_at,
+            },
+        ), rows)
+        return
+    for row in rows:
+        result = db.session.execute(
+            update(table)
+            .where(table.c.user_id == row['user_id'], table.c.category_id == row['category_id'])
+            .values(submitted_count=table.c.submitted_count + row['submitted_count'],
+                    reviewed_count=table.c.reviewed_count + row['reviewed_count'],
+                    last_activity_at=row['last_activity_at'])
+        )
+        if result.rowcount == 0:
+            db.session.execute(insert(table).values(**row))
+
+
+def _category_of(task_id):
+    task = get_catalog().tasks_by_id.get(task_id)
+    return task.category_id if task else None
+
+
+def record_submission(solution):
+    """Учитывает новое решение (без commit)"""
+    category_id = _category_of(solution.task_id)
+    if category_id is not None:
+        _increment(solution.user_id, category_id, 1, 0, solution.submitted_at or datetime.utcnow())
+
+
+def record_submissions(solutions, tasks=None):
+    """
+    Учитывает пачку новых решений одним upsert (без commit). Решения, уже отмеченные
+    проверенными (автоматическая проверка с record=False), учитываются и как проверенные.
+    tasks — задания снимка каталога по id, если он уже получен.
+    """
+    tasks = tasks if tasks is not None else get_catalog().tasks_by_id
+    rows = {}
+    for solution in solutions:
+        task = tasks.get(solution.task_id)
+        if solution.user_id is None or task is None:
+            continue
+        at = solution.reviewed_at or solution.submitted_at or datetime.utcnow()
+        row = rows.setdefault((solution.user_id, task.category_id), {
+            'user_id': solution.user_id, 'category_id': task.category_id,
+            'submitted_count': 0, 'reviewed_count': 0, 'last_activity_at': at,
+        })
+        row['submitted_count'] += 1
+        row['reviewed_count'] += 1 if solution.is_reviewed else 0
+        row['last_activity_at'] = max(row['last_activity_at'], at)
+    if rows:
+        _increment_many(list(rows.values()))
+
+
+def record_review(solution):
+    """Учитывает первую проверку решения (без commit); повторный отзыв счетчики не меняет"""
+    if solution.is_reviewed:
+        return
+    category_id = _category_of(solution.task_id)
+    if category_id is not None:
+        _increment(solution.user_id, category_id, 0, 1, datetime.utcnow())
+
+
+def record_reviews(counts, at):
+    """Учитывает пачку проверок: {(user_id, task_id): число решений} (без commit)"""
+    tasks = get_catalog().tasks_by_id
+    by_category = {}
+    for (user_id, task_id), count in counts.items():
+        task = tasks.get(task_id)
+        category_id = task.category_id if task else None
+        if user_id is not None and category_id is not None:
+            key = (user_id, category_id)
+            by_category[key] = by_category.get(key, 0) + count
+    if by_category:
+        _increment_many([{'user_id': user_id, 'category_id': category_id, 'submitted_count': 0,
+                          'reviewed_count': count, 'last_activity_at': at}
+                         for (user_id, category_id), count in by_category.items()])
+
+
+def _task_counts(task_id):
+    """Решения задания по студентам: (user_id, отправлено, проверено, последняя активность)"""
+    return db.session.execute(
+        select(Solution.user_id, func.count(), func.sum(case((Solution.is_reviewed == True, 1), else_=0)),
+               func.max(func.coalesce(Solution.reviewed_at, Solution.submitted_at)))
+        .where(Solution.task_id == task_id, Solution.user_id.isnot(None))
+        .group_by(Solution.user_id)
+    ).all()
+
+
+def _decrement_many(category_id, counts):
+    """Вычитает счетчики из сводки категории; строки без решений удаляются"""
+    table = UserProgress.__table__
+    db.session.execute(
+        update(table)
+        .where(table.c.user_id == bindparam('b_user_id'), table.c.category_id == category_id)
+        .values(submitted_count=table.c.submitted_count - bindparam('b_submitted'),
+                reviewed_count=table.c.reviewed_count - bindparam('b_reviewed')),
+        [{'b_user_id': user_id, 'b_submitted': submitted, 'b_reviewed': reviewed}
+         for user_id, submitted, reviewed, _ in counts],
+    )
+    db.session.execute(delete(table).where(
+        table.c.category_id == category_id,
+        table.c.user_id.in_([user_id for user_id, *_ in counts]),
+        table.c.submitted_count <= 0,
+    ))
+
+
+def move_task(task_id, from_category_id, to_category_id):
+    """
+    Переносит решения задания в сводку другой категории (без commit).
+    Время последней активности в прежней категории не уменьшается.
+    """
+    counts = _task_counts(task_id)
+    if not counts or from_category_id == to_category_id:
+        return
+    _decrement_many(from_category_id, counts)
+    _increment_many([{'user_id': user_id, 'category_id': to_category_id, 'submitted_count': submitted,
+                      'reviewed_count': reviewed, 'last_activity_at': at}
+                     for user_id, submitted, reviewed, at in counts])
+
+
+def forget_task(task_id, category_id):
+    """Вычитает решения задания из сводки; вызывается до удаления задания (без commit)"""
+    counts = _task_counts(task_id)
+    if counts:
+        _decrement_many(category_id, counts)
+
+
+def forget_category(category_id):
+    """Удаляет сводку по категории (без commit)"""
+    db.session.execute(delete(UserProgress).where(UserProgress.category_id == category_id))
+
+
+def rebuild_progress():
+    """Пересчитывает всю сводку по таблице solutions (после массовой загрузки; без commit)"""
+    last_activity = func.max(func.coalesce(Solution.reviewed_at, Solution.submitted_at))
+    aggregates = (
+        select(Solution.user_id, Task.category_id, func.count(),
+               func.sum(case((Solution.is_reviewed == True, 1), else_=0)), last_activity)
+        .join(Task, Task.id == Solution.task_id)
+        .where(Solution.user_id.isnot(None))
+        .group_by(Solution.user_id, Task.category_id)
+    )
+    db.session.execute(delete(UserProgress))
+    db.session.execute(insert(UserProgress).from_select(
+        ['user_id', 'category_id', 'submitted_count', 'reviewed_count', 'last_activity_at'], aggregates
+    ))
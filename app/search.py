@@ -0,0 +1,224 @@
+"""
+Полнотекстовый поиск по заданиям и решениям.
+
+В SQLite используются внешние (external content) таблицы FTS5: индекс хранит
+только токены, а текст читается из tasks/solutions. Синхронизацию выполняют
+триггеры, поэтому индекс обновляется при любой записи — через ORM, Core или SQL.
+В других СУБД поиск выполняется через LIKE (без ранжирования).
+"""
+import re
+from contextlib import contextmanager
+from typing import NamedTuple, Optional
+from datetime import datetime
+
+from flask import current_app
+from markupsafe import Markup, escape
+from sqlalchemy import event, text, and_, or_, select
+
+from app import db
+from app.models import Task, Solution
+
+SCOPES = ('tasks', 'solutions')
+SORTS = ('rank', 'recent')
+
+# Маркеры подсветки в snippet(): управляющие символы не встречаются в тексте
+MARK_START, MARK_END = '\x02', '\x03'
+
+FTS_TABLES = ('tasks_fts', 'solutions_fts')
+FTS_TRIGGERS = ('tasks_fts_ai', 'tasks_fts_ad', 'tasks_fts_au',
+                'solutions_fts_ai', 'solutions_fts_ad', 'solutions_fts_au')
+
+# Миграции 0008/0009 хранят собственные копии этих выражений; изменение DDL
+# требует новой ревизии (схемы сверяет tests/test_search.py)
+FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5("
+    "content, content='tasks', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_ai AFTER INSERT ON tasks BEGIN "
+    "INSERT INTO tasks_fts(rowid, content) VALUES (new.id, new.content); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_ad AFTER DELETE ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, content) VALUES ('delete', old.id, old.content); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_au AFTER UPDATE OF content ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, content) VALUES ('delete', old.id, old.content); "
+    "INSERT INTO tasks_fts(rowid, content) VALUES (new.id, new.content); END",
+
+    "CREATE VIRTUAL TABLE IF NOT EXISTS solutions_fts USING fts5("
+    "content, feedback, content='solutions', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS solutions_fts_ai AFTER INSERT ON solutions BEGIN "
+    "INSERT INTO solutions_fts(rowid, content, feedback) VALUES (new.id, new.content, new.feedback); END",
+    "CREATE TRIGGER IF NOT EXISTS solutions_fts_ad AFTER DELETE ON solutions BEGIN "
+    "INSERT INTO solutions_fts(solutions_fts, rowid, content, feedback) "
+    "VALUES ('delete', old.id, old.content, old.feedback); END",
+    "CREATE TRIGGER IF NOT EXISTS solutions_fts_au AFTER UPDATE OF content, feedback ON solutions BEGIN "
+    "INSERT INTO solutions_fts(solutions_fts, rowid, content, feedback) "
+    "VALUES ('delete', old.id, old.content, old.feedback); "
+    "INSERT INTO solutions_fts(rowid, content, feedback) VALUES (new.id, new.content, new.feedback); END",
+]
+
+
+class InvalidQuery(Exception):
+    """Поисковый запрос не содержит ни одного слова"""
+
+
+class SearchHit(NamedTuple):
+    """Найденное задание или решение с фрагментом текста вокруг совпадения"""
+    id: int
+    snippet: str
+    rank: Optional[float]
+    # Задания
+    category_id: Optional[int] = None
+    task_number: Optional[int] = None
+    # Решения
+    user_id: Optional[int] = None
+    task_id: Optional[int] = None
+    submitted_at: Optional[datetime] = None
+    is_reviewed: Optional[bool] = None
+
+
+@event.listens_for(db.metadata, 'after_create')
+def create_fts(target, connection, **kw):
+    """Индексы FTS5 создаются вместе со схемой (create_all); в миграциях — отдельной ревизией"""
+    if connection.dialect.name == 'sqlite':
+        for statement in FTS_DDL:
+            connection.exec_driver_sql(statement)
+
+
+@event.listens_for(db.metadata, 'before_drop')
+def drop_fts(target, connection, **kw):
+    if connection.dialect.name == 'sqlite':
+        for table in FTS_TABLES:
+            connection.exec_driver_sql(f'DROP TABLE IF EXISTS {table}')
+
+
+@contextmanager
+def sync_suspended(connection):
+    """
+    Отключает триггеры синхронизации на время массовой загрузки и затем
+    перестраивает индексы целиком: это в разы быстрее построчного обновления
+    """
+    if connection.dialect.name != 'sqlite':
+        yield
+        return
+    for trigger in FTS_TRIGGERS:
+        connection.exec_driver_sql(f'DROP TRIGGER IF EXISTS {trigger}')
+    yield
+    for statement in FTS_DDL:
+        connection.exec_driver_sql(statement)
+    for table in FTS_TABLES:
+        connection.exec_driver_sql(f"INSERT INTO {table}({table}) VALUES ('rebuild')")
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Фильтр автогенерации миграций: таблицы FTS5 и их служебные таблицы не описаны в моделях"""
+    return not (type_ == 'table' and reflected and compare_to is None and name.startswith(FTS_TABLES))
+
+
+TERM_RE = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def parse_terms(query):
+    """
+    Разбирает запрос на фразы в кавычках и отдельные слова.
+    Синтаксис FTS5 (OR, NEAR, *, :) пользователю не доступен: все термы ищутся буквально.
+    """
+    terms = []
+    for phrase, word in TERM_RE.findall(query or ''):
+        term = ' '.join((phrase or word).replace('"', ' ').split())
+        if term:
+            terms.append(term)
+    if not terms:
+        raise InvalidQuery('Empty search query')
+    return terms
+
+
+def match_expression(terms):
+    """Все термы обязательны; каждый экранируется как фраза FTS5"""
+    return ' AND '.join(f'"{term}"' for term in terms)
+
+
+def highlight(snippet):
+    """Фрагмент для HTML: текст экранируется, совпадения выделяются <mark>"""
+    return Markup(str(escape(snippet)).replace(MARK_START, '<mark>').replace(MARK_END, '</mark>'))
+
+
+def search(scope, query, limit, after=None, sort='rank'):
+    """
+    Страница результатов и позиция продолжения (None на последней странице).
+    Позиция — смещение для sort='rank' и id последней строки для sort='recent'
+    и поиска через LIKE.
+
+    Ранжирование bm25 оценивает каждое совпадение, поэтому для частых слов оно
+    ограничено SEARCH_RANK_WINDOW самыми новыми совпадениями: время ответа
+    не зависит от размера таблицы.
+    """
+    terms = parse_terms(query)
+    if db.session.get_bind().dialect.name != 'sqlite':
+        hits = _search_like(scope, terms, limit, after)
+        return _page(hits, limit, lambda: hits[limit - 1].id)
+
+    fts = f'{scope}_fts'
+    if scope == 'tasks':
+        columns = 'tasks.id, tasks.category_id, tasks.task_number'
+        join = 'tasks ON tasks.id = tasks_fts.rowid'
+        snippet_column = 0
+    else:
+        columns = 'solutions.id, solutions.user_id, solutions.task_id, solutions.submitted_at, solutions.is_reviewed'
+        join = 'solutions ON solutions.id = solutions_fts.rowid'
+        snippet_column = -1  # столбец с лучшим совпадением: решение или отзыв
+    params = {'match': match_expression(terms), 'limit': limit + 1,
+              'start': MARK_START, 'end': MARK_END}
+
+    if sort == 'recent':
+        # Обход индекса в порядке rowid без оценки всех совпадений
+        where = f'{fts}.rowid < :after' if after is not None else '1'
+        order, params['after'] = f'{fts}.rowid DESC', after
+        offset = ''
+    else:
+        floor = db.session.scalar(
+            text(f'SELECT rowid FROM {fts} WHERE {fts} MATCH :match ORDER BY rowid DESC LIMIT 1 OFFSET :window'),
+            {'match': params['match'], 'window': current_app.config['SEARCH_RANK_WINDOW'] - 1},
+        )
+        where, params['floor'] = (f'{fts}.rowid >= :floor', floor) if floor is not None else ('1', None)
+        order = f'{fts}.rank, {fts}.rowid'
+        offset, params['offset'] = 'OFFSET :offset', after or 0
+
+    statement = text(
+        f"SELECT {columns}, snippet({fts}, {snippet_column}, :start, :end, '…', 16) AS snippet, "
+        f"{fts}.rank AS rank FROM {fts} JOIN {join} "
+        f"WHERE {fts} MATCH :match AND {where} ORDER BY {order} LIMIT :limit {offset}"
+    )
+    if scope == 'solutions':
+        statement = statement.columns(submitted_at=db.DateTime, is_reviewed=db.Boolean)
+    hits = [SearchHit(**row._mapping) for row in db.session.execute(statement, params)]
+    if sort == 'recent':
+        return _page(hits, limit, lambda: hits[limit - 1].id)
+    return _page(hits, limit, lambda: (after or 0) + limit)
+
+
+def _page(hits, limit, position):
+    if len(hits) <= limit:
+        return hits, None
+    return hits[:limit], position()
+
+
+def _search_like(scope, terms, limit, after):
+    """Запасной вариант для СУБД без FTS5: подстроки, новые записи первыми"""
+    model = Task if scope == 'tasks' else Solution
+    fields = [Task.content] if scope == 'tasks' else [Solution.content, Solution.feedback]
+    conditions = [or_(*(field.icontains(term, autoescape=True) for field in fields)) for term in terms]
+    if after is not None:
+        conditions.append(model.id < after)
+    rows = db.session.scalars(select(model).where(and_(*conditions)).order_by(model.id.desc()).limit(limit + 1))
+    if scope == 'tasks':
+        return [SearchHit(id=row.id, snippet=row.content, rank=None,
+                          category_id=row.category_id, task_number=row.task_number) for row in rows]
+    return [SearchHit(id=row.id, snippet=row.content, rank=None, user_id=row.user_id, task_id=row.task_id,
+                      submitted_at=row.submitted_at, is_reviewed=row.is_reviewed) for row in rows]
+
+
+def plain(snippet):
+    """Фрагмент без маркеров подсветки"""
+    return snippet.replace(MARK_START, '').replace(MARK_END, '')
+
+
+def init_app(app):
+    app.add_template_filter(highlight)
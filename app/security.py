@@ -0,0 +1,84 @@
+# Хеширование паролей: настраиваемые параметры и ограниченный пул вычислений
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from flask import current_app, has_app_context
+from werkzeug.security import generate_password_hash, check_password_hash
+
+DEFAULT_METHOD = 'pbkdf2:sha256:600000'
+DEFAULT_SALT_LENGTH = 16
+
+
+class PasswordHashingBusy(RuntimeError):
+    """Все слоты пула хеширования заняты дольше допустимого"""
+
+
+def hash_settings():
+    """Метод и длина соли из конфигурации приложения (или значения по умолчанию)"""
+    if has_app_context():
+        config = current_app.config
+        return config['PASSWORD_HASH_METHOD'], config['PASSWORD_SALT_LENGTH']
+    return DEFAULT_METHOD, DEFAULT_SALT_LENGTH
+
+
+@lru_cache(maxsize=None)
+def normalized_method(method):
+    """Метод в том виде, в каком werkzeug записывает его в хеш (с параметрами по умолчанию)"""
+    return generate_password_hash('', method, salt_length=1).split('$', 1)[0]
+
+
+def make_password_hash(password):
+    method, salt_length = hash_settings()
+    return generate_password_hash(password, method, salt_length=salt_length)
+
+
+def needs_rehash(password_hash):
+    """Хеш создан с параметрами, отличными от текущих настроек"""
+    method, salt_length = hash_settings()
+    parts = password_hash.split('$')
+    if len(parts) != 3:
+        return True
+    return parts[0] != normalized_method(method) or len(parts[1]) != salt_length
+
+
+class PasswordHasher:
+    """
+    Выполняет хеширование вне потока запроса в пуле из `workers` потоков.
+    Одновременно в работе и в очереди не больше workers + queue вычислений:
+    остальные запросы ждут слот не дольше `timeout` и получают PasswordHashingBusy.
+    hashlib отпускает GIL на время вычисления, поэтому пул ограничивает
+    нагрузку на CPU, не останавливая обработку остальных запросов.
+    """
+
+    def __init__(self, workers, queue, timeout):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+        self._slots = threading.BoundedSemaphore(workers + queue)
+        self._timeout = timeout
+
+    def run(self, func, *args):
+        if not self._slots.acquire(timeout=self._timeout):
+            raise PasswordHashingBusy()
+        try:
+            return self._executor.submit(func, *args).result()
+        finally:
+            self._slots.release()
+
+    def verify(self, password_hash, password):
+        return self.run(check_password_hash, password_hash, password)
+
+    def hash(self, password):
+        # Настройки читаются в потоке запроса: в потоках пула нет контекста приложения
+        method, salt_length = hash_settings()
+        return self.run(generate_password_hash, password, method, salt_length)
+
+
+def get_hasher():
+    return current_app.extensions['password_hasher']
+
+
+def init_app(app):
+    app.extensions['password_hasher'] = PasswordHasher(
+        app.config['PASSWORD_HASH_WORKERS'],
+        app.config['PASSWORD_HASH_QUEUE'],
+        app.config['PASSWORD_HASH_TIMEOUT'],
+    )
@@ -0,0 +1,111 @@
+"""
+Кэширование шаблонов. Байткод скомпилированных шаблонов Jinja хранится на диске
+(instance/jinja_cache), поэтому новый воркер не компилирует их заново. Готовые
+фрагменты каталога (список категорий, карточки заданий) хранятся в памяти процесса
+и сбрасываются при смене версии каталога: пользовательские части (токен CSRF)
+подставляются в фрагмент при каждом запросе. Страницы каталога для анонимных
+посетителей кэшируются целиком.
+"""
+import os
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, render_template, request, session
+from flask_login import current_user
+from jinja2 import FileSystemBytecodeCache
+from markupsafe import Markup
+
+from app.catalog import get_catalog
+
+# Метка на месте поля CSRF в кэшированном фрагменте; заменяется токеном текущей сессии
+CSRF_PLACEHOLDER = '\x00csrf\x00'
+
+
+class FragmentCache:
+    """LRU готовых HTML-фрагментов одной версии каталога"""
+
+    def __init__(self, size):
+        self.size = size
+        self.version = None
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, version, key):
+        with self._lock:
+            if version != self.version:
+                return None
+            html = self._items.get(key)
+            if html is not None:
+                self._items.move_to_end(key)
+            return html
+
+    def put(self, version, key, html):
+        with self._lock:
+            if self.version is not None and version < self.version:
+                return  # Запрос, начатый до изменения каталога, не затирает новые фрагменты
+            if version != self.version:
+                # Каталог изменился: фрагменты прежней версии больше не нужны
+                self._items.clear()
+                self.version = version
+            self._items[key] = html
+            self._items.move_to_end(key)
+            while len(self._items) > self.size:
+                self._items.popitem(last=False)
+
+
+def _cache():
+    return current_app.extensions['fragment_cache']
+
+
+def viewer_kind():
+    """От вида посетителя зависит разметка каталога: форма решения или приглашение войти"""
+    if not current_user.is_authenticated:
+        return 'anonymous'
+    return 'admin' if current_user.is_admin else 'student'
+
+
+def cached_fragment(template, key, **context):
+    """
+    Фрагмент шаблона template из кэша (ключ — key и версия каталога) или свежеотрисованный.
+    Вместо поля CSRF в шаблоне выводится csrf_field; здесь он заменяется на поле текущей сессии.
+    """
+    catalog = get_catalog()
+    cache_key = (template, request.script_root) + tuple(key)
+    html = _cache().get(catalog.version, cache_key)
+    if html is None:
+        html = render_template(template, csrf_field=Markup(CSRF_PLACEHOLDER), **context)
+        _cache().put(catalog.version, cache_key, html)
+    if CSRF_PLACEHOLDER in html:
+        form = context.get('form')
+        field = str(form.csrf_token) if form is not None and form.meta.csrf else ''
+        html = html.replace(CSRF_PLACEHOLDER, field)
+    return Markup(html)
+
+
+def cached_for_anonymous(view):
+    """
+    Страница целиком из кэша для анонимного посетителя без ожидающих flash-сообщений:
+    ответ стоит одного чтения версии каталога
+    """
+    @wraps(view)
+    def wrapper(**kwargs):
+        if current_user.is_authenticated or session.get('_flashes'):
+            return view(**kwargs)
+        version = get_catalog().version
+        key = ('page', request.script_root, request.endpoint) + tuple(sorted(kwargs.items()))
+        html = _cache().get(version, key)
+        if html is None:
+            html = view(**kwargs)
+            if isinstance(html, str):
+                _cache().put(version, key, html)
+        return html
+    return wrapper
+
+
+def init_app(app):
+    directory = app.config.get('JINJA_BYTECODE_CACHE_DIR')
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(directory)
+    app.extensions['fragment_cache'] = FragmentCache(app.config['FRAGMENT_CACHE_SIZE'])
@@ -0,0 +1,162 @@
+"""
+Кэш пользователей для Flask-Login. Загрузчик сессии возвращает легкую запись
+CachedUser (id, имя, признак преподавателя) вместо ORM-объекта, поэтому
+аутентифицированный запрос не обращается к БД, пока запись не устарела (USER_CACHE_TTL)
+или не вытеснена (USER_CACHE_SIZE). Изменение имени, пароля или прав пользователя
+через ORM сбрасывает его запись после commit; другие процессы увидят изменение
+не позже чем через USER_CACHE_TTL секунд.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app, has_app_context
+from flask_login import UserMixin
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from app import db, login_manager
+from app.models import User
+
+# Поля, изменение которых делает кэшированную запись недействительной
+TRACKED_FIELDS = ('username', 'password_hash', 'is_admin')
+
+
+class CachedUser(UserMixin):
+    """Пользователь сессии без привязки к сессии SQLAlchemy"""
+    __slots__ = ('id', 'username', 'is_admin')
+
+    def __init__(self, id, username, is_admin):
+        self.id = id
+        self.username = username
+        self.is_admin = is_admin
+
+    def __repr__(self):
+        return f'<CachedUser {self.id} {self.username}>'
+
+
+class UserCache:
+    """LRU с ограничением времени жизни записей и счетчиками попаданий"""
+
+    def __init__(self, size, ttl):
+        self.size = size
+        self.ttl = ttl
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def get(self, user_id):
+        with self._lock:
+            item = self._items.get(user_id)
+            if item is not None and item[0] > time.monotonic():
+                self._items.move_to_end(user_id)
+                self.hits += 1
+                return item[1]
+            self.misses += 1
+            return None
+
+    def put(self, user):
+        with self._lock:
+            self._items[user.id] = (time.monotonic() + self.ttl, user)
+            self._items.move_to_end(user.id)
+            while len(self._items) > self.size:
+                self._items.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, user_ids=None):
+        """Сбрасывает записи пользователей (все при user_ids=None)"""
+        with self._lock:
+            if user_ids is None:
+                self.invalidations += len(self._items)
+                self._items.clear()
+                return
+            for user_id in user_ids:
+                if self._items.pop(user_id, None) is not None:
+                    self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._items),
+                'max_size': self.size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else None,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
+
+
+def get_user_cache():
+    return current_app.extensions['user_cache']
+
+
+def user_statement(user_id):
+    return select(User.id, User.username, User.is_admin).where(User.id == user_id)
+
+
+@login_manager.user_loader
+def load_user(user_id):
+    """Пользователь сессии: из кэша, при промахе — одним чтением столбцов по первичному ключу"""
+    try:
+        user_id = int(user_id)
+    except (TypeError, ValueError):
+        return None
+    cache = get_user_cache()
+    user = cache.get(user_id)
+    if user is not None:
+        return user
+    row = db.session.execute(user_statement(user_id)).first()
+    if row is None:
+        return None
+    user = CachedUser(*row)
+    cache.put(user)
+    return user
+
+
+def _changed_users(session):
+    changed = {obj.id for obj in session.deleted if isinstance(obj, User)}
+    for obj in session.dirty:
+        if isinstance(obj, User):
+            attrs = inspect(obj).attrs
+            if any(getattr(attrs, field).history.has_changes() for field in TRACKED_FIELDS):
+                changed.add(obj.id)
+    return changed
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_changes(session, flush_context):
+    """Измененные пользователи запоминаются до commit: сбрасывать запись раньше нельзя"""
+    changed = _changed_users(session)
+    if changed:
+        session.info.setdefault('users_changed', set()).update(changed)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _collect_bulk_changes(orm_execute_state):
+    """Массовые UPDATE/DELETE по пользователям сбрасывают весь кэш"""
+    if orm_execute_state.is_select:
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.class_ is User:
+        orm_execute_state.session.info['users_changed_all'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_on_commit(session):
+    changed = session.info.pop('users_changed', None)
+    everyone = session.info.pop('users_changed_all', False)
+    if (changed or everyone) and has_app_context() and 'user_cache' in current_app.extensions:
+        get_user_cache().invalidate(None if everyone else changed)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_changes(session):
+    session.info.pop('users_changed', None)
+    session.info.pop('users_changed_all', None)
+
+
+def init_app(app):
+    app.extensions['user_cache'] = UserCache(app.config['USER_CACHE_SIZE'], app.config['USER_CACHE_TTL'])
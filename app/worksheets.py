@@ -0,0 +1,99 @@
+"""
+Лист заданий категории: ответы студента на все задания одним запросом (форма или JSON).
+Задания проверяются по снимку каталога (одно чтение версии), все решения
+записываются одним многострочным INSERT, сводка прогресса — одним upsert,
+в одной транзакции.
+"""
+from datetime import datetime
+
+from sqlalchemy import func, insert, select
+
+from app import db
+from app.catalog import with_content
+from app.grading import auto_review
+from app.models import Solution
+from app.progress import record_submissions
+
+# Как в SolutionForm
+MAX_ANSWER_LENGTH = 1000
+
+INSERT_COLUMNS = ('user_id', 'task_id', 'content', 'submitted_at', 'is_reviewed', 'feedback', 'reviewed_at')
+
+
+class WorksheetError(ValueError):
+    """Тело запроса не является списком ответов"""
+
+
+def parse_answers(payload):
+    """
+    Ответы из JSON: {"answers": [{"task_id": 1, "content": "..."}, ...]} или сам список.
+    Возвращает список пар (task_id, content) без проверки значений.
+    """
+    if isinstance(payload, dict):
+        payload = payload.get('answers')
+    if not isinstance(payload, list):
+        raise WorksheetError('Request body must contain a list of answers')
+    return [(item.get('task_id'), item.get('content')) if isinstance(item, dict) else (None, None)
+            for item in payload]
+
+
+def validate_answer(task_id, content, tasks, seen):
+    """Текст ошибки для одного ответа или None"""
+    if not isinstance(task_id, int) or isinstance(task_id, bool):
+        return 'task_id must be an integer'
+    if task_id not in tasks:
+        return 'Task not found in this category'
+    if task_id in seen:
+        return 'Duplicate answer for task'
+    if not isinstance(content, str) or not content.strip():
+        return 'Answer content is required'
+    if len(content) > MAX_ANSWER_LENGTH:
+        return f'Answer must be at most {MAX_ANSWER_LENGTH} characters'
+    return None
+
+
+def submit_worksheet(catalog, user_id, category_id, answers):
+    """
+    Сохраняет ответы [(task_id, content)] на задания категории из снимка каталога
+    и проверяет их по ключам. Ошибочные ответы пропускаются; остальные записываются
+    одной транзакцией. Возвращает результаты в порядке ответов.
+    """
+    tasks = {task.id: task for task in with_content(catalog.tasks_by_category.get(category_id, ()))}
+    now = datetime.utcnow()
+    results = []
+    accepted = {}
+    for index, (task_id, content) in enumerate(answers):
+        error = validate_answer(task_id, content, tasks, accepted)
+        if error:
+            results.append({'index': index, 'task_id': task_id, 'status': 'error', 'message': error})
+            continue
+        solution = Solution(user_id=user_id, task_id=task_id, content=content, submitted_at=now,
+                            is_reviewed=False, feedback=None, reviewed_at=None)
+        verdict = auto_review(solution, tasks[task_id], record=False)
+        result = {'index': index, 'task_id': task_id, 'status': 'submitted', 'verdict': verdict}
+        results.append(result)
+        accepted[task_id] = (result, solution)
+
+    if accepted:
+        # Один INSERT на все строки (через таблицу: ORM-вставка разбила бы строки
+        # по набору непустых колонок). Задание в листе не повторяется, поэтому
+        # идентификаторы сопоставляются по task_id без упорядоченного RETURNING
+        rows = [{column: getattr(solution, column) for column in INSERT_COLUMNS}
+                for _, solution in accepted.values()]
+        table = Solution.__table__
+        if db.session.get_bind().dialect.insert_executemany_returning:
+            inserted = db.session.execute(insert(table).returning(table.c.id, table.c.task_id), rows)
+        else:
+            # MySQL/MariaDB: строки вставляются без RETURNING, затем читаются их id —
+            # последнее решение студента по каждому заданию листа
+            db.session.execute(insert(table), rows)
+            inserted = db.session.execute(
+                select(func.max(table.c.id), table.c.task_id)
+                .where(table.c.user_id == user_id, table.c.task_id.in_(list(accepted)))
+                .group_by(table.c.task_id)
+            )
+        for solution_id, task_id in inserted:
+            accepted[task_id][0]['solution_id'] = solution_id
+        record_submissions([solution for _, solution in accepted.values()], catalog.tasks_by_id)
+        db.session.commit()
+    return results
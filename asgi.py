@@ -0,0 +1,5 @@
+# Точка входа асинхронного режима API: uvicorn asgi:app
+from app import create_app
+from app.api_async import AsyncAPI
+
+app = AsyncAPI(create_app())
@@ -0,0 +1,194 @@
+"""
+Емкость API по одновременным соединениям: синхронные потоки против асинхронного режима.
+
+    python -m benchmarks.bench_async_api --connections 64 --connections 256 --threads 16
+    python -m benchmarks.bench_async_api --wait 5 --rounds 1
+
+Клиенты ждут завершения фоновой задачи --wait секунд; задача стоит в очереди.
+Асинхронный режим (asgi.py под uvicorn) ждет в корутинах одним запросом
+GET /api/jobs/<id>?wait=N. Синхронный сервер (werkzeug с пулом из --threads потоков,
+как у sync/gthread-воркеров) ожидание не поддерживает, чтобы не занимать поток,
+поэтому его клиенты опрашивают статус каждые --poll секунд до истечения --wait.
+
+Для каждого режима выводятся p50/p95 времени ожидания клиента (с очередью сервера),
+число ожиданий в секунду и число выполненных запросов. Асинхронный режим требует
+пакетов uvicorn и aiosqlite.
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+from app import create_app, db
+from app.jobs import enqueue
+from app.models import TaskCategory, Task
+from config import TestConfig
+
+HOST = '127.0.0.1'
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log(self, type, message, *args):
+        pass
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    """WSGI-сервер с фиксированным пулом потоков: соединение занимает поток до конца ответа"""
+    request_queue_size = 2048
+
+    def __init__(self, app, threads):
+        super().__init__(HOST, 0, app, handler=QuietHandler)
+        self.pool = ThreadPoolExecutor(threads)
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self.handle_in_pool, request, client_address)
+
+    def handle_in_pool(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+
+def start_sync(app, threads):
+    server = PooledWSGIServer(app, threads)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def stop():
+        server.shutdown()
+        server.pool.shutdown()
+    return server.server_port, stop
+
+
+def start_async(app):
+    import uvicorn
+    from app.api_async import AsyncAPI
+
+    sock = socket.socket()
+    sock.bind((HOST, 0))
+    sock.listen(2048)
+    server = uvicorn.Server(uvicorn.Config(AsyncAPI(app), log_level='warning', lifespan='on'))
+    thread = threading.Thread(target=server.run, kwargs={'sockets': [sock]}, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+
+    def stop():
+        server.should_exit = True
+        thread.join()
+        sock.close()
+    return sock.getsockname()[1], stop
+
+
+async def fetch(port, path):
+    """Один запрос в отдельном соединении; возвращает код ответа"""
+    reader, writer = await asyncio.open_connection(HOST, port)
+    try:
+        writer.write(f'GET {path} HTTP/1.1\r\nHost: {HOST}\r\nConnection: close\r\n\r\n'.encode())
+        await writer.drain()
+        response = await reader.read()
+    finally:
+        writer.close()
+    return int(response.split(b' ', 2)[1])
+
+
+async def run_clients(port, path, connections, rounds, poll=None, wait=0):
+    """Каждый клиент rounds раз ждет задачу: одним запросом или опросом каждые poll секунд"""
+    latencies = []
+    errors = requests = 0
+
+    async def client():
+        nonlocal errors, requests
+        for _ in range(rounds):
+            started = time.perf_counter()
+            while True:
+                requests += 1
+                try:
+                    status = await fetch(port, path)
+                except (OSError, ValueError, IndexError):
+                    status = None
+                if status != 200 or poll is None or time.perf_counter() - started >= wait:
+                    break
+                await asyncio.sleep(poll)
+            if status == 200:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(connections)))
+    return latencies, errors, requests, time.perf_counter() - started
+
+
+def report(mode, connections, latencies, errors, requests, elapsed):
+    if latencies:
+        ordered = sorted(latencies)
+        p50 = statistics.median(ordered) * 1000
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000
+    else:
+        p50 = p95 = float('nan')
+    print(f'{mode:<6} {connections:>11} {p50:>9.0f} {p95:>9.0f} {len(latencies) / elapsed:>9.1f} '
+          f'{requests:>9} {errors:>7}')
+
+
+def prepare(app):
+    with app.app_context():
+        db.create_all()
+        category = TaskCategory(name='Grammar')
+        db.session.add(category)
+        db.session.flush()
+        db.session.add_all([Task(category_id=category.id, task_number=n, content=f'Task {n}')
+                            for n in range(1, 51)])
+        job = enqueue('tasks.export', {})
+        db.session.commit()
+        return job.id
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Ожидающие клиенты: синхронный и асинхронный API')
+    parser.add_argument('--connections', type=int, action='append', help='число одновременных клиентов')
+    parser.add_argument('--threads', type=int, default=16, help='потоков синхронного сервера')
+    parser.add_argument('--rounds', type=int, default=2, help='запросов на клиента')
+    parser.add_argument('--wait', type=float, default=1.0, help='ожидание завершения задачи клиентом, с')
+    parser.add_argument('--poll', type=float, default=0.5, help='период опроса статуса синхронного сервера, с')
+    parser.add_argument('--path', help='адрес запроса без ожидания (по умолчанию статус задачи)')
+    parser.add_argument('--mode', choices=('sync', 'async'), action='append')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config = type('BenchConfig', (TestConfig,), {
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(tmp, 'bench.db'),
+            'ASYNC_WSGI_THREADS': args.threads,
+        })
+        app = create_app(config)
+        job_id = prepare(app)
+        status = f'/api/jobs/{job_id}'
+        paths = {'sync': args.path or status, 'async': args.path or f'{status}?wait={args.wait:g}'}
+        # Без --path синхронные клиенты ждут опросом; заданный адрес запрашивается один раз
+        poll = None if args.path else args.poll
+
+        print(f'{status}: ожидание {args.wait:g} с, потоков синхронного сервера {args.threads}')
+        print(f"{'режим':<6} {'соединений':>11} {'p50, мс':>9} {'p95, мс':>9} {'ожид./с':>9} "
+              f"{'запросов':>9} {'ошибок':>7}")
+        for mode in args.mode or ('sync', 'async'):
+            port, stop = start_sync(app, args.threads) if mode == 'sync' else start_async(app)
+            try:
+                for connections in args.connections or (16, 64, 256):
+                    report(mode, connections, *asyncio.run(run_clients(
+                        port, paths[mode], connections, args.rounds,
+                        poll=poll if mode == 'sync' else None, wait=args.wait)))
+            finally:
+                stop()
+
+
+if __name__ == '__main__':
+    main()
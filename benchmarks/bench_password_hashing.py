@@ -0,0 +1,71 @@
+"""
+Пропускная способность входа (auth.login) при разных параметрах хеширования паролей.
+
+    python -m benchmarks.bench_password_hashing --logins 200 --clients 16 \
+        --method pbkdf2:sha256:600000 --method scrypt
+
+Для каждого метода создается временная база с одним студентом, после чего
+`clients` потоков выполняют `logins` входов через тестовый клиент Flask.
+"""
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app import create_app, db
+from app.models import User
+from config import TestConfig
+
+DEFAULT_METHODS = ['pbkdf2:sha256:600000', 'pbkdf2:sha256:260000', 'scrypt']
+
+
+def bench_method(method, logins, clients, workers):
+    with tempfile.TemporaryDirectory() as tmp:
+        config = type('BenchConfig', (TestConfig,), {
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(tmp, 'bench.db'),
+            'PASSWORD_HASH_METHOD': method,
+            'PASSWORD_HASH_WORKERS': workers,
+            'PASSWORD_HASH_QUEUE': logins,
+        })
+        app = create_app(config)
+        with app.app_context():
+            db.create_all()
+            user = User(username='student')
+            user.set_password('student123')
+            db.session.add(user)
+            db.session.commit()
+
+        def login(_):
+            client = app.test_client()
+            response = client.post('/auth/login', data={'username': 'student', 'password': 'student123'})
+            return response.status_code
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=clients) as pool:
+            statuses = list(pool.map(login, range(logins)))
+        elapsed = time.perf_counter() - started
+        with app.app_context():
+            db.engine.dispose()
+
+    failed = sum(1 for status in statuses if status != 302)
+    return logins / elapsed, elapsed, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--method', action='append', dest='methods', help='метод хеширования werkzeug')
+    parser.add_argument('--logins', type=int, default=100)
+    parser.add_argument('--clients', type=int, default=16, help='параллельных клиентов')
+    parser.add_argument('--workers', type=int, default=TestConfig.PASSWORD_HASH_WORKERS,
+                        help='размер пула хеширования (PASSWORD_HASH_WORKERS)')
+    args = parser.parse_args()
+
+    print(f'{"method":<28}{"logins/s":>10}{"seconds":>10}{"failed":>8}')
+    for method in args.methods or DEFAULT_METHODS:
+        rate, elapsed, failed = bench_method(method, args.logins, args.clients, args.workers)
+        print(f'{method:<28}{rate:>10.1f}{elapsed:>10.2f}{failed:>8}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""
+Время запуска процессов приложения: импорт пакета и создание приложения с нуля.
+
+    python -m benchmarks.bench_startup --runs 10
+    python -m benchmarks.bench_startup --importtime 15       # самые дорогие импорты
+    python -m benchmarks.bench_startup --budget worker=120 --budget web=220
+
+Каждый сценарий выполняется в новом интерпретаторе, поэтому кэш модулей не
+влияет на результат (байткод .pyc при этом используется, как при обычном запуске).
+Большую часть старта занимает импорт зависимостей (Flask, SQLAlchemy), на который
+приложение не влияет, поэтому он измеряется отдельно (строка deps), а для сценариев
+выводится собственное время приложения после импорта зависимостей.
+Бюджет сценария — его базовое время, пересчитанное на скорость текущей машины
+по отношению deps к базовому, с запасом TOLERANCE; если медиана превышает бюджет,
+прогон завершается с кодом 1.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Зависимости, которые импортирует любой процесс приложения
+DEPENDENCIES = 'import flask, flask_sqlalchemy, flask_login'
+
+# Сценарий -> код, выполняемый в новом процессе после импорта зависимостей
+SCENARIOS = {
+    'import': 'import app',
+    'worker': 'from app import create_app; from app.jobs import load_handlers; '
+              'create_app(web=False); load_handlers()',
+    'cli': 'from app import create_app; create_app(web=False)',
+    'web': 'from app import create_app; create_app()',
+}
+
+# Базовая линия, медианы в мс (Python 3.11, 9 прогонов): deps — импорт зависимостей,
+# остальное — собственное время сценария. До разделения на веб-часть и скрипты
+# (fb5b7bf) было import 24, web 66; web вырос вместе с числом разделов и маршрутов API.
+BASELINE = {'deps': 480, 'import': 30, 'worker': 76, 'cli': 58, 'web': 148}
+TOLERANCE = 1.5
+
+MEASURE = ('import time\nstarted = time.perf_counter()\n{code}\n'
+           'print((time.perf_counter() - started) * 1000)')
+
+
+def run_once(code, *options):
+    result = subprocess.run([sys.executable, *options, '-c', code], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    return result.stdout, result.stderr
+
+
+def measure(code, runs):
+    """Время выполнения code в новых процессах, мс"""
+    run_once(code)  # прогрев: создание .pyc
+    return [float(run_once(code)[0]) for _ in range(runs)]
+
+
+def scenario_code(name):
+    """Код процесса, печатающий собственное время сценария в мс"""
+    if name == 'deps':
+        return MEASURE.format(code=DEPENDENCIES)
+    return f'{DEPENDENCIES}\n' + MEASURE.format(code=SCENARIOS[name])
+
+
+def budgets_for(deps_median, values):
+    """Бюджеты сценариев для машины, на которой импорт зависимостей занял deps_median мс"""
+    speed = deps_median / BASELINE['deps']
+    budgets = {name: BASELINE[name] * speed * TOLERANCE for name in SCENARIOS}
+    for value in values:
+        name, _, limit = value.partition('=')
+        if name not in SCENARIOS:
+            raise SystemExit(f'Неизвестный сценарий: {name}')
+        budgets[name] = float(limit)
+    return budgets
+
+
+def slowest_imports(code, limit):
+    """Модули с наибольшим временем импорта (вместе с вложенными) по `python -X importtime`"""
+    _, stderr = run_once(code, '-X', 'importtime')
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        own, cumulative, module = line[len('import time:'):].split('|')
+        rows.append((int(cumulative), int(own), module.rstrip()))
+    rows.sort(reverse=True)
+    return rows[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Время импорта и холодного старта приложения')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS),
+                        help='сценарий (по умолчанию все)')
+    parser.add_argument('--budget', action='append', default=[], metavar='SCENARIO=MS',
+                        help='бюджет медианы в миллисекундах')
+    parser.add_argument('--importtime', type=int, default=0, metavar='N',
+                        help='показать N модулей с наибольшим временем импорта для сценария web')
+    args = parser.parse_args()
+
+    deps = statistics.median(measure(scenario_code('deps'), args.runs))
+    budgets = budgets_for(deps, args.budget)
+    failed = []
+    print(f"{'сценарий':<8} {'медиана':>9} {'макс':>9} {'бюджет':>9}")
+    print(f"{'deps':<8} {deps:>7.0f}мс {'':>9} {'':>9}")
+    for name in args.scenario or SCENARIOS:
+        timings = measure(scenario_code(name), args.runs)
+        median = statistics.median(timings)
+        print(f'{name:<8} {median:>7.0f}мс {max(timings):>7.0f}мс {budgets[name]:>7.0f}мс')
+        if median > budgets[name]:
+            failed.append(name)
+
+    if args.importtime:
+        print(f"\n{'всего, мс':>10} {'свое, мс':>9}  модуль")
+        for cumulative, own, module in slowest_imports(SCENARIOS['web'], args.importtime):
+            print(f'{cumulative / 1000:>10.1f} {own / 1000:>9.1f}  {module}')
+
+    if failed:
+        print(f"\nПревышен бюджет: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,263 @@
+"""
+Нагрузочный прогон всех разделов приложения: API, main, admin и auth.
+
+    python -m benchmarks.run --users 500 --solutions 50000 --requests 200 --concurrency 8
+    python -m benchmarks.run --server                      # через локальный WSGI-сервер
+    python -m benchmarks.run --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json --tolerance 0.25
+
+Для каждого маршрута выводятся p50/p95/p99 задержки, пропускная способность и
+среднее число SQL-запросов (из заголовка Server-Timing). При сравнении с базовой
+линией прогон завершается с кодом 1, если p95 или число запросов выросли сверх допуска.
+
+benchmarks/baseline.json снят с параметрами по умолчанию (seed 0); машина и набор
+данных записаны в самом файле. Задержки зависят от машины: на другой машине сначала
+сохраните свою базовую линию, число SQL-запросов от машины не зависит.
+"""
+import argparse
+import http.cookiejar
+import json
+import os
+import platform
+import random
+import sqlite3
+import re
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from app import create_app, db
+from config import Config, TestConfig
+from app.datagen import generate, STUDENT_PASSWORD, ADMIN_PASSWORD
+
+QUERIES_RE = re.compile(r'desc="(\d+) queries"')
+
+
+class Scenario:
+    """Маршрут для прогона: роль клиента и генератор запросов"""
+
+    def __init__(self, name, role, request):
+        self.name = name
+        self.role = role
+        self.request = request  # rnd -> (method, path, form)
+
+
+def scenarios(counts):
+    tasks, solutions, categories = counts['tasks'], max(counts['solutions'], 1), counts['categories']
+    get = lambda path: lambda rnd: ('GET', path(rnd), None)
+    return [
+        Scenario('api.categories', None, get(lambda rnd: '/api/categories')),
+        Scenario('api.tasks.page', None, get(lambda rnd: '/api/tasks?limit=100')),
+        Scenario('api.tasks.category', None, get(lambda rnd: f'/api/tasks?category_id={rnd.randint(1, categories)}')),
+        Scenario('api.task', None, get(lambda rnd: f'/api/tasks/{rnd.randint(1, tasks)}')),
+        Scenario('main.index', None, get(lambda rnd: '/')),
+        Scenario('main.category', None, get(lambda rnd: f'/category/{rnd.randint(1, categories)}')),
+        Scenario('main.dashboard', 'student', get(lambda rnd: '/dashboard')),
+        Scenario('admin.dashboard', 'admin', get(lambda rnd: '/admin/dashboard')),
+        Scenario('admin.dashboard_solutions', 'admin', get(lambda rnd: '/admin/dashboard/solutions/pending')),
+        Scenario('admin.dashboard_tasks', 'admin', get(lambda rnd: '/admin/dashboard/tasks')),
+        Scenario('admin.solutions', 'admin', get(lambda rnd: '/admin/solutions')),
+        Scenario('admin.solution', 'admin', get(lambda rnd: f'/admin/solution/{rnd.randint(1, solutions)}')),
+        Scenario('auth.login', None, lambda rnd: ('POST', '/auth/login', {
+            'username': f'student{rnd.randint(1, counts["users"] - 1)}', 'password': STUDENT_PASSWORD
+        })),
+    ]
+
+
+class TestClientDriver:
+    """Запросы через тестовый клиент Flask (в том же процессе)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    def session(self):
+        return self.app.test_client()
+
+    def send(self, client, method, path, form):
+        response = client.open(path, method=method, data=form)
+        response.get_data()
+        return response.status_code, response.headers.get('Server-Timing', '')
+
+
+class HTTPDriver:
+    """Запросы по HTTP к локальному многопоточному WSGI-серверу"""
+
+    def __init__(self, app):
+        from werkzeug.serving import make_server, WSGIRequestHandler
+
+        class QuietHandler(WSGIRequestHandler):
+            def log_request(self, *args, **kwargs):
+                pass
+
+        self.server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=QuietHandler)
+        self.base = f'http://127.0.0.1:{self.server.port}'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def session(self):
+        return urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+
+    def send(self, opener, method, path, form):
+        data = urllib.parse.urlencode(form).encode() if form is not None else None
+        request = urllib.request.Request(self.base + path, data=data, method=method)
+        try:
+            with opener.open(request) as response:
+                response.read()
+                return response.status, response.headers.get('Server-Timing', '')
+        except urllib.error.HTTPError as error:
+            return error.code, error.headers.get('Server-Timing', '')
+
+    def close(self):
+        self.server.shutdown()
+
+
+def login(driver, session, role):
+    username, password = ('admin', ADMIN_PASSWORD) if role == 'admin' else ('student1', STUDENT_PASSWORD)
+    driver.send(session, 'POST', '/auth/login', {'username': username, 'password': password})
+
+
+def percentile(values, fraction):
+    """Перцентиль по методу ближайшего ранга"""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def run_scenario(driver, scenario, requests, concurrency, warmup, seed):
+    sessions = []
+    for _ in range(concurrency):
+        session = driver.session()
+        if scenario.role:
+            login(driver, session, scenario.role)
+        sessions.append(session)
+
+    def worker(index, count):
+        rnd = random.Random(seed * 1000 + index)
+        session = sessions[index]
+        samples = []
+        for _ in range(count):
+            method, path, form = scenario.request(rnd)
+            started = time.perf_counter()
+            status, timing = driver.send(session, method, path, form)
+            elapsed = time.perf_counter() - started
+            match = QUERIES_RE.search(timing)
+            samples.append((elapsed, int(match.group(1)) if match else None, status))
+        return samples
+
+    worker(0, warmup)
+    share = [requests // concurrency + (1 if i < requests % concurrency else 0) for i in range(concurrency)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(worker, range(concurrency), share))
+    wall = time.perf_counter() - started
+
+    samples = [sample for chunk in results for sample in chunk]
+    latencies = [sample[0] * 1000 for sample in samples]
+    queries = [sample[1] for sample in samples if sample[1] is not None]
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for sample in samples if sample[2] >= 400),
+        'p50_ms': round(percentile(latencies, 0.50), 3),
+        'p95_ms': round(percentile(latencies, 0.95), 3),
+        'p99_ms': round(percentile(latencies, 0.99), 3),
+        'rps': round(len(samples) / wall, 1),
+        'queries': round(sum(queries) / len(queries), 2) if queries else None,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Список регрессий относительно базовой линии"""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get('results', {}).get(name)
+        if previous is None:
+            continue
+        if current['p95_ms'] > previous['p95_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {previous['p95_ms']} -> {current['p95_ms']} ms")
+        if current['queries'] is not None and previous['queries'] is not None \
+                and current['queries'] > previous['queries']:
+            regressions.append(f"{name}: queries {previous['queries']} -> {current['queries']}")
+    return regressions
+
+
+def machine_info():
+    """Где снята базовая линия: сравнивать имеет смысл прогоны на похожей машине"""
+    return {'platform': platform.platform(), 'machine': platform.machine(), 'cpus': os.cpu_count(),
+            'python': platform.python_version(), 'sqlite': sqlite3.sqlite_version}
+
+
+def print_report(results):
+    print(f'{"endpoint":<28}{"req":>6}{"err":>5}{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}{"req/s":>9}{"queries":>9}')
+    for name, row in results.items():
+        queries = '-' if row['queries'] is None else row['queries']
+        print(f'{name:<28}{row["requests"]:>6}{row["errors"]:>5}{row["p50_ms"]:>9}{row["p95_ms"]:>9}'
+              f'{row["p99_ms"]:>9}{row["rps"]:>9}{queries:>9}')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--categories', type=int, default=12)
+    parser.add_argument('--tasks-per-category', type=int, default=200)
+    parser.add_argument('--solutions', type=int, default=20000)
+    parser.add_argument('--requests', type=int, default=200, help='запросов на маршрут')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--only', action='append', help='прогнать только маршруты с этим префиксом')
+    parser.add_argument('--server', action='store_true', help='через локальный WSGI-сервер, а не тестовый клиент')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--baseline', help='JSON базовой линии для сравнения')
+    parser.add_argument('--save-baseline', help='сохранить результаты как базовую линию')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='допустимый рост p95 (доля)')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config = type('BenchConfig', (TestConfig,), {
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(tmp, 'bench.db'),
+            'PASSWORD_HASH_METHOD': Config.PASSWORD_HASH_METHOD,
+            'SQL_INSTRUMENTATION': True,
+            'SQL_INSTRUMENTATION_LOG_MS': float('inf'),
+        })
+        app = create_app(config)
+        with app.app_context():
+            db.create_all()
+            started = time.perf_counter()
+            counts = generate(args.users, args.categories, args.tasks_per_category, args.solutions, seed=args.seed)
+            print(f'seeded {counts} in {time.perf_counter() - started:.1f}s', file=sys.stderr)
+
+        driver = HTTPDriver(app) if args.server else TestClientDriver(app)
+        results = {}
+        try:
+            for scenario in scenarios(counts):
+                if args.only and not any(scenario.name.startswith(prefix) for prefix in args.only):
+                    continue
+                results[scenario.name] = run_scenario(driver, scenario, args.requests, args.concurrency,
+                                                      args.warmup, args.seed)
+        finally:
+            if args.server:
+                driver.close()
+            with app.app_context():
+                db.engine.dispose()
+
+    print_report(results)
+    report = {'machine': machine_info(), 'dataset': counts, 'seed': args.seed,
+              'mode': 'server' if args.server else 'test-client', 'concurrency': args.concurrency,
+              'requests': args.requests, 'results': results}
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f'REGRESSION {line}')
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
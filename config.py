@@ -9,26 +9,111 @@ load_dotenv()
 # Настройка базовых директорий
 basedir = os.path.abspath(os.path.dirname(__file__))
 instance_dir = os.path.join(basedir, 'instance')
-os.makedirs(instance_dir, exist_ok=True)
 
 
 class Config:
     """Базовый класс конфигурации с общими настройками"""
     DEBUG = False
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-key-123'
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(instance_dir, 'app.db')
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///' + os.path.join(instance_dir, 'app.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_ECHO = False  # Логирование SQL запросов (False в продакшене)
 
+    # Профиль движка БД: 'sqlite', 'server' или 'none'; по умолчанию — по схеме URI
+    DB_ENGINE_PROFILE = os.environ.get('DB_ENGINE_PROFILE')
+    # Профиль sqlite: WAL не дает писателям блокировать читателей
+    SQLITE_JOURNAL_MODE = 'WAL'
+    SQLITE_SYNCHRONOUS = 'NORMAL'
+    SQLITE_BUSY_TIMEOUT_MS = 5000
+    SQLITE_MMAP_SIZE = 256 * 1024 * 1024
+    # Профиль server: пул соединений серверной СУБД
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 20))
+    DB_POOL_PRE_PING = True
+    DB_POOL_RECYCLE = 1800
+
+    # Учет SQL по каждому HTTP-запросу: число запросов, время в БД, самый медленный запрос
+    SQL_INSTRUMENTATION = os.environ.get('SQL_INSTRUMENTATION', '').lower() in ('1', 'true', 'yes')
+    SQL_INSTRUMENTATION_HEADER = True  # Заголовок Server-Timing в ответе
+    SQL_INSTRUMENTATION_LOG_MS = 0  # Писать строку лога, если время в БД не меньше порога
+
+    # Хеширование паролей (формат werkzeug). При смене параметров хеш пользователя
+    # пересчитывается при его следующем успешном входе
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:600000')
+    PASSWORD_SALT_LENGTH = 16
+    # Пул проверки паролей: потоков, мест в очереди и секунд ожидания свободного места
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 4))
+    PASSWORD_HASH_QUEUE = 64
+    PASSWORD_HASH_TIMEOUT = 10
+
     # Настройки Flask-Login
     REMEMBER_COOKIE_DURATION = 3600
     SESSION_PROTECTION = 'strong'
+    # Кэш пользователей сессии: записей в процессе и секунд жизни записи
+    USER_CACHE_SIZE = 10000
+    USER_CACHE_TTL = 60
+
+    # Тексты заданий хранятся в снимке каталога каждого процесса, пока их общий размер
+    # (в символах) не превышает лимит; у большего каталога они читаются из БД по id
+    CATALOG_CONTENT_MAX_CHARS = int(os.environ.get('CATALOG_CONTENT_MAX_CHARS', 8 * 1024 * 1024))
+
+    # Кэш скомпилированных шаблонов Jinja (None — без кэша) и число фрагментов каталога в памяти
+    JINJA_BYTECODE_CACHE_DIR = os.path.join(instance_dir, 'jinja_cache')
+    FRAGMENT_CACHE_SIZE = 512
+
+    # Сжатие ответов (gzip, brotli при установленном пакете brotli): уровень, минимальный размер, типы
+    COMPRESS_LEVEL = 6
+    COMPRESS_MIN_SIZE = 1024
+    COMPRESS_MIMETYPES = {'text/html', 'text/css', 'text/plain', 'text/javascript', 'application/javascript',
+                          'application/json', 'application/x-ndjson', 'image/svg+xml'}
+    # Статика: длина отпечатка в адресе, срок кэширования адреса с отпечатком, каталог сжатых вариантов
+    STATIC_HASH_LENGTH = 12
+    STATIC_MAX_AGE = 365 * 24 * 60 * 60
+    STATIC_CACHE_DIR = os.path.join(instance_dir, 'static_cache')
+
+    # Размер порции списков, подгружаемых на панели преподавателя
+    ADMIN_PAGE_SIZE = 20
+    # Размер порции истории решений в личном кабинете студента
+    DASHBOARD_PAGE_SIZE = 20
+    # Пакетная автоматическая проверка (grade_pending.py): процессов и решений в пачке
+    GRADING_WORKERS = int(os.environ.get('GRADING_WORKERS', os.cpu_count() or 1))
+    GRADING_BATCH_SIZE = 2000
+    # Полнотекстовый поиск: сколько самых новых совпадений ранжируется по релевантности
+    SEARCH_RANK_WINDOW = 5000
+    # Очередь проверки: сколько решений преподаватель держит одновременно и срок аренды
+    REVIEW_CLAIM_BATCH = 10
+    REVIEW_LEASE_SECONDS = 15 * 60
+
+    # Фоновые задачи (worker.py): процессов, аренда задачи воркером, повторы с задержкой
+    JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 2))
+    JOB_LEASE_SECONDS = 5 * 60
+    JOB_MAX_ATTEMPTS = 3
+    JOB_RETRY_BASE_SECONDS = 30  # Задержка перед повтором удваивается с каждой попыткой
+    JOB_RETRY_MAX_SECONDS = 60 * 60
+    JOB_POLL_SECONDS = 1.0  # Пауза воркера при пустой очереди
+    # GET /api/jobs/<id>?wait=N: ожидание завершения задачи в запросе (long polling)
+    JOB_WAIT_MAX_SECONDS = 30
+    JOB_WAIT_POLL_SECONDS = 0.5  # Период перечитывания статуса во время ожидания
+    JOB_DELETE_BATCH_SIZE = 500  # Заданий за транзакцию при фоновом удалении категории
+    JOB_RESULTS_DIR = os.environ.get('JOB_RESULTS_DIR') or os.path.join(instance_dir, 'job_results')
+
+    # Размер страницы для списков REST API (keyset-пагинация)
+    API_PAGE_SIZE = 100
+    API_MAX_PAGE_SIZE = 1000
+    # Размер пачки строк при потоковой выгрузке заданий (format=ndjson)
+    API_EXPORT_BATCH_SIZE = 1000
+    # Максимальное число заданий в одном запросе POST /api/tasks/bulk
+    API_BULK_MAX_ITEMS = 10000
+    # Асинхронный режим API (asgi.py): URI для асинхронного драйвера, по умолчанию
+    # выводится из SQLALCHEMY_DATABASE_URI (sqlite -> aiosqlite, postgresql -> asyncpg)
+    ASYNC_DATABASE_URL = os.environ.get('ASYNC_DATABASE_URL')
+    # Потоки для запросов, которые асинхронный режим передает Flask-приложению
+    ASYNC_WSGI_THREADS = int(os.environ.get('ASYNC_WSGI_THREADS', 16))
 
     @staticmethod
     def init_app(app):
-        """Инициализация конфига для приложения"""
-        if not os.path.exists(instance_dir):
-            os.makedirs(instance_dir, exist_ok=True)
+        """Инициализация конфига для приложения (вызывается из create_app, а не при импорте)"""
+        os.makedirs(instance_dir, exist_ok=True)
 
 
 class DevelopmentConfig(Config):
@@ -40,8 +125,10 @@ class DevelopmentConfig(Config):
 class TestingConfig(Config):
     """Конфигурация для тестовой среды"""
     TESTING = True
+    PASSWORD_HASH_METHOD = 'pbkdf2:sha256:1000'  # Быстрое хеширование в тестах
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     WTF_CSRF_ENABLED = False
+    JINJA_BYTECODE_CACHE_DIR = None
 
 
 class ProductionConfig(Config):
@@ -55,8 +142,10 @@ class ProductionConfig(Config):
 
 class TestConfig(Config):
     TESTING = True
+    PASSWORD_HASH_METHOD = 'pbkdf2:sha256:1000'  # Быстрое хеширование в тестах
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     WTF_CSRF_ENABLED = False
+    JINJA_BYTECODE_CACHE_DIR = None
 
 
 # Словарь конфигураций для разных окружений
@@ -1,21 +1,23 @@
 # Скрипт инициализации базы данных для приложения изучения английского языка
 import os
 from werkzeug.security import generate_password_hash
+from flask_migrate import stamp
 from app import create_app, db
 from app.models import User, TaskCategory, Task, Solution
 
 
 def init_database():
     """Инициализация базы данных с начальными данными"""
-    app = create_app()
+    app = create_app(web=False, migrations=True)
     with app.app_context():
         # Удаляем существующую базу данных
         db_path = os.path.join(app.instance_path, 'app.db')
         if os.path.exists(db_path):
             os.remove(db_path)
 
-        # Создаем все таблицы
+        # Создаем все таблицы и отмечаем схему как актуальную для миграций
         db.create_all()
+        stamp()
 
         # Добавляем начальные данные
         init_sample_data()
@@ -50,22 +52,38 @@ def init_sample_data():
     # Задания
     if not Task.query.first():
         tasks = [
-            Task(category_id=1, task_number=1, content="Complete the sentence: She ___ (to work) in a bank."),
-            Task(category_id=1, task_number=2, content="Make the sentence negative: They play football every Sunday."),
-            Task(category_id=2, task_number=1, content="Complete the sentence: Look! It ___ (to rain)."),
-            Task(category_id=2, task_number=2, content="Make the sentence negative: They are watching TV now."),
-            Task(category_id=3, task_number=1, content="Complete the sentence: Yesterday I ___ (to go) to the cinema."),
-            Task(category_id=3, task_number=2, content="Make the sentence negative: She visited her grandmother last week."),
-            Task(category_id=4, task_number=1, content="Complete the sentence: While I ___ (to cook) dinner, the phone rang."),
-            Task(category_id=4, task_number=2, content="Make the sentence negative: They were playing chess at 5 PM yesterday."),
-            Task(category_id=5, task_number=1, content="Complete the sentence: I ___ (to help) you tomorrow."),
-            Task(category_id=5, task_number=2, content="Make the sentence negative: They will come to the party."),
-            Task(category_id=6, task_number=1, content="Complete the sentence: I ___ (to finish) my homework."),
-            Task(category_id=6, task_number=2, content="Make the sentence negative: She has been to Paris."),
-            Task(category_id=7, task_number=1, content="Complete the sentence: When I arrived, they ___ (to leave)."),
-            Task(category_id=7, task_number=2, content="Make the sentence negative: He had finished the book before dinner."),
-            Task(category_id=8, task_number=1, content="Complete the sentence: By next year, I ___ (to graduate)."),
-            Task(category_id=8, task_number=2, content="Make the sentence negative: They will have finished the project by Friday.")
+            Task(category_id=1, task_number=1, content="Complete the sentence: She ___ (to work) in a bank.",
+                 answer_key='works'),
+            Task(category_id=1, task_number=2, content="Make the sentence negative: They play football every Sunday.",
+                 answer_key="They don't play football every Sunday."),
+            Task(category_id=2, task_number=1, content="Complete the sentence: Look! It ___ (to rain).",
+                 answer_key='is raining'),
+            Task(category_id=2, task_number=2, content="Make the sentence negative: They are watching TV now.",
+                 answer_key="They aren't watching TV now."),
+            Task(category_id=3, task_number=1, content="Complete the sentence: Yesterday I ___ (to go) to the cinema.",
+                 answer_key='went'),
+            Task(category_id=3, task_number=2, content="Make the sentence negative: She visited her grandmother last week.",
+                 answer_key="She didn't visit her grandmother last week."),
+            Task(category_id=4, task_number=1, content="Complete the sentence: While I ___ (to cook) dinner, the phone rang.",
+                 answer_key='was cooking'),
+            Task(category_id=4, task_number=2, content="Make the sentence negative: They were playing chess at 5 PM yesterday.",
+                 answer_key="They weren't playing chess at 5 PM yesterday."),
+            Task(category_id=5, task_number=1, content="Complete the sentence: I ___ (to help) you tomorrow.",
+                 answer_key='will help'),
+            Task(category_id=5, task_number=2, content="Make the sentence negative: They will come to the party.",
+                 answer_key="They won't come to the party."),
+            Task(category_id=6, task_number=1, content="Complete the sentence: I ___ (to finish) my homework.",
+                 answer_key='have finished'),
+            Task(category_id=6, task_number=2, content="Make the sentence negative: She has been to Paris.",
+                 answer_key="She hasn't been to Paris.|She has never been to Paris."),
+            Task(category_id=7, task_number=1, content="Complete the sentence: When I arrived, they ___ (to leave).",
+                 answer_key='had left'),
+            Task(category_id=7, task_number=2, content="Make the sentence negative: He had finished the book before dinner.",
+                 answer_key="He hadn't finished the book before dinner."),
+            Task(category_id=8, task_number=1, content="Complete the sentence: By next year, I ___ (to graduate).",
+                 answer_key='will have graduated'),
+            Task(category_id=8, task_number=2, content="Make the sentence negative: They will have finished the project by Friday.",
+                 answer_key="They won't have finished the project by Friday.")
         ]
         db.session.add_all(tasks)
 
@@ -1,4 +1,5 @@
 # Скрипт создания примеров заданий для приложения изучения английского языка
+from flask_migrate import stamp
 from app import create_app, db
 from app.models import User, TaskCategory, Task
 from werkzeug.security import generate_password_hash
@@ -9,7 +10,7 @@ from sqlalchemy.exc import IntegrityError
 
 def init_db():
     """Инициализация базы данных с примерами заданий и категорий"""
-    app = create_app()
+    app = create_app(web=False, migrations=True)
     with app.app_context():
         print("Начинаем инициализацию базы данных...")
 
@@ -31,6 +32,7 @@ def init_db():
         print("Создаем структуру базы данных...")
         try:
             db.create_all()
+            stamp()
             print("Таблицы созданы")
 
             # Добавление пользователей (в users.db)
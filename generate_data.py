@@ -0,0 +1,39 @@
+# Скрипт генерации синтетических данных в объеме продакшена
+import argparse
+import time
+
+from flask_migrate import stamp
+from app import create_app, db
+from app.datagen import generate, DatabaseNotEmpty, CHUNK_SIZE
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Заполнение базы синтетическими пользователями, заданиями и решениями')
+    parser.add_argument('--users', type=int, default=10000, help='число студентов')
+    parser.add_argument('--admins', type=int, default=1, help='число преподавателей')
+    parser.add_argument('--categories', type=int, default=20)
+    parser.add_argument('--tasks-per-category', type=int, default=500)
+    parser.add_argument('--solutions', type=int, default=1000000)
+    parser.add_argument('--days', type=int, default=365, help='за сколько дней распределены решения')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--reset', action='store_true', help='удалить все таблицы и создать схему заново')
+    args = parser.parse_args()
+
+    app = create_app(web=False, migrations=True)
+    with app.app_context():
+        if args.reset:
+            db.drop_all()
+            db.create_all()
+            stamp()
+        started = time.perf_counter()
+        try:
+            counts = generate(args.users, args.categories, args.tasks_per_category, args.solutions,
+                              admins=args.admins, days=args.days, seed=args.seed, chunk_size=args.chunk_size)
+        except DatabaseNotEmpty:
+            parser.error('база уже содержит данные; используйте --reset')
+        print(f"Создано: {counts} за {time.perf_counter() - started:.1f} с")
+
+
+if __name__ == '__main__':
+    main()
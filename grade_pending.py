@@ -0,0 +1,24 @@
+# Скрипт автоматической проверки накопившихся решений по ключам ответов
+import argparse
+import time
+
+from app import create_app
+from app.grading import grade_pending
+
+
+def main():
+    app = create_app(web=False)
+    parser = argparse.ArgumentParser(description='Проверка непроверенных решений заданий с ключом ответа')
+    parser.add_argument('--workers', type=int, default=app.config['GRADING_WORKERS'], help='число процессов')
+    parser.add_argument('--batch-size', type=int, default=app.config['GRADING_BATCH_SIZE'])
+    args = parser.parse_args()
+
+    with app.app_context():
+        started = time.perf_counter()
+        graded = grade_pending(args.workers, args.batch_size)
+        print(f"Проверено решений: {graded} за {time.perf_counter() - started:.1f} с; "
+              f"неоднозначные оставлены преподавателям")
+
+
+if __name__ == '__main__':
+    main()
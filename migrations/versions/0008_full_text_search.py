@@ -0,0 +1,64 @@
+"""full text search
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 02:24:51.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+# FTS5 external-content indexes kept in sync by triggers.
+# Frozen copy of app/search.py FTS_DDL as of this revision: migrations must not
+# import app code, and later DDL changes go into a new revision.
+# Note: batch migrations that recreate tasks/solutions drop these triggers and must re-create them.
+FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5("
+    "content, content='tasks', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_ai AFTER INSERT ON tasks BEGIN "
+    "INSERT INTO tasks_fts(rowid, content) VALUES (new.id, new.content); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_ad AFTER DELETE ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, content) VALUES ('delete', old.id, old.content); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_au AFTER UPDATE OF content ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, content) VALUES ('delete', old.id, old.content); "
+    "INSERT INTO tasks_fts(rowid, content) VALUES (new.id, new.content); END",
+
+    "CREATE VIRTUAL TABLE IF NOT EXISTS solutions_fts USING fts5("
+    "content, feedback, content='solutions', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS solutions_fts_ai AFTER INSERT ON solutions BEGIN "
+    "INSERT INTO solutions_fts(rowid, content, feedback) VALUES (new.id, new.content, new.feedback); END",
+    "CREATE TRIGGER IF NOT EXISTS solutions_fts_ad AFTER DELETE ON solutions BEGIN "
+    "INSERT INTO solutions_fts(solutions_fts, rowid, content, feedback) "
+    "VALUES ('delete', old.id, old.content, old.feedback); END",
+    "CREATE TRIGGER IF NOT EXISTS solutions_fts_au AFTER UPDATE OF content, feedback ON solutions BEGIN "
+    "INSERT INTO solutions_fts(solutions_fts, rowid, content, feedback) "
+    "VALUES ('delete', old.id, old.content, old.feedback); "
+    "INSERT INTO solutions_fts(rowid, content, feedback) VALUES (new.id, new.content, new.feedback); END",
+]
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for statement in FTS_DDL:
+        op.execute(statement)
+    # Index rows that existed before the migration
+    op.execute("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')")
+    op.execute("INSERT INTO solutions_fts(solutions_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for trigger in ('tasks_fts_ai', 'tasks_fts_ad', 'tasks_fts_au',
+                    'solutions_fts_ai', 'solutions_fts_ad', 'solutions_fts_au'):
+        op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+    op.execute('DROP TABLE IF EXISTS tasks_fts')
+    op.execute('DROP TABLE IF EXISTS solutions_fts')
@@ -0,0 +1,95 @@
+from contextlib import contextmanager
+import pytest
+from sqlalchemy import event
+from app import create_app, db
+from app.models import User, TaskCategory, Task, Solution
+
+
+@pytest.fixture
+def app():
+    app = create_app('config.TestConfig')
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def admin_client(app, client):
+    """Клиент, вошедший как преподаватель"""
+    admin = User(username='teacher', is_admin=True)
+    admin.set_password('secret')
+    db.session.add(admin)
+    db.session.commit()
+    client.post('/auth/login', data={'username': 'teacher', 'password': 'secret'})
+    return client
+
+
+@pytest.fixture
+def grammar(app):
+    """Категория Grammar с двумя заданиями; возвращает ее id"""
+    category = TaskCategory(name='Grammar', description='Grammar exercises')
+    db.session.add(category)
+    db.session.flush()
+    db.session.add_all([
+        Task(category_id=category.id, task_number=2, content='Second task'),
+        Task(category_id=category.id, task_number=1, content='First task'),
+    ])
+    db.session.commit()
+    return category.id
+
+
+def _login(client, username):
+    client.post('/auth/login', data={'username': username, 'password': 'secret'})
+
+
+@pytest.fixture
+def login():
+    """Вход клиента пользователем с паролем 'secret': login(client, username)"""
+    return _login
+
+
+def _seed_solutions(count):
+    """Создает count студентов, по заданию и решению на каждого"""
+    category = TaskCategory(name=f'Category {count}')
+    db.session.add(category)
+    db.session.flush()
+    solutions = []
+    for number in range(1, count + 1):
+        student = User(username=f'student{count}-{number}', password_hash='x')
+        task = Task(category_id=category.id, task_number=number, content=f'Task {number}')
+        solution = Solution(user=student, task=task, content=f'Answer {number}',
+                            is_reviewed=number % 2 == 0, feedback='Good job, well done')
+        solutions.append(solution)
+    db.session.add_all(solutions)
+    db.session.commit()
+    return [solution.id for solution in solutions]
+
+
+@pytest.fixture
+def seed_solutions():
+    """seed_solutions(count): студенты с решениями; возвращает id решений"""
+    return _seed_solutions
+
+
+@contextmanager
+def _record_queries():
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', listener)
+
+
+@pytest.fixture
+def record_queries(app):
+    """Контекстный менеджер, собирающий SQL-запросы, выполненные внутри блока"""
+    return _record_queries
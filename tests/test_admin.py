@@ -0,0 +1,71 @@
+import re
+
+# Запросов на страницу независимо от объема данных
+DASHBOARD_QUERY_BUDGET = 3  # пользователь сессии, версия каталога, счетчики решений
+SOLUTIONS_FRAGMENT_QUERY_BUDGET = 2  # пользователь сессии, страница решений
+SOLUTION_QUERY_BUDGET = 2
+
+
+def page_queries(client, record_queries, url):
+    """Запросы повторного открытия страницы (снимок каталога уже прогрет)"""
+    client.get(url)
+    with record_queries() as statements:
+        response = client.get(url)
+    assert response.status_code == 200
+    return response, len(statements)
+
+
+def test_dashboard_query_count_is_constant(admin_client, record_queries, seed_solutions):
+    """Число запросов панели и ее разделов не растет вместе с числом решений"""
+    seed_solutions(2)
+    _, small = page_queries(admin_client, record_queries, '/admin/dashboard')
+    _, small_fragment = page_queries(admin_client, record_queries, '/admin/dashboard/solutions/pending')
+    seed_solutions(20)
+    response, large = page_queries(admin_client, record_queries, '/admin/dashboard')
+    _, large_fragment = page_queries(admin_client, record_queries, '/admin/dashboard/solutions/pending')
+
+    assert 'Решения на проверку (11)' in response.get_data(as_text=True)
+    assert small == large <= DASHBOARD_QUERY_BUDGET
+    assert small_fragment == large_fragment <= SOLUTIONS_FRAGMENT_QUERY_BUDGET
+
+
+def test_dashboard_solutions_paging(app, admin_client, seed_solutions):
+    """Решения подгружаются порциями; курсор ведет к следующей порции без повторов"""
+    app.config['ADMIN_PAGE_SIZE'] = 4
+    seed_solutions(20)
+
+    seen = []
+    url = '/admin/dashboard/solutions/reviewed'
+    while url:
+        html = admin_client.get(url).get_data(as_text=True)
+        seen.extend(re.findall(r'student20-(\d+)', html))
+        more = re.search(r'data-more="([^"]+)"', html)
+        url = more.group(1).replace('&amp;', '&') if more else None
+
+    assert sorted(map(int, seen)) == list(range(2, 21, 2))
+
+
+def test_dashboard_tasks_fragment(app, admin_client, seed_solutions):
+    """Раздел заданий отдается страницами из снимка каталога"""
+    app.config['ADMIN_PAGE_SIZE'] = 3
+    seed_solutions(5)
+    html = admin_client.get('/admin/dashboard/tasks').get_data(as_text=True)
+    assert html.count('<tr>') == 3
+    cursor = re.search(r'cursor=([^"&]+)', html).group(1)
+    html = admin_client.get(f'/admin/dashboard/tasks?cursor={cursor}').get_data(as_text=True)
+    assert html.count('<tr>') == 2
+    assert 'data-more' not in html
+
+
+def test_solution_page_query_count(admin_client, record_queries, seed_solutions):
+    """Страница решения загружает задание и студента тем же запросом"""
+    solution_id = seed_solutions(3)[0]
+    response, queries = page_queries(admin_client, record_queries, f'/admin/solution/{solution_id}')
+
+    assert b'student3-1' in response.data
+    assert b'Task 1' in response.data
+    assert queries <= SOLUTION_QUERY_BUDGET
+
+
+def test_solution_page_not_found(admin_client):
+    assert admin_client.get('/admin/solution/999').status_code == 404
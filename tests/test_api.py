@@ -285,4 +285,215 @@ def test_delete_task(client):
     assert response.status_code == 204
 
     get_response = client.get(f'/api/tasks/{task_id}')
-    assert get_response.status_code == 404 
\ No newline at end of file
+    assert get_response.status_code == 404 
+
+def _create_category(client, name):
+    response = client.post('/api/categories',
+                           data=json.dumps({'name': name}),
+                           content_type='application/json')
+    return json.loads(response.data)['id']
+
+
+def _create_task(client, category_id, task_number):
+    response = client.post('/api/tasks',
+                           data=json.dumps({
+                               'category_id': category_id,
+                               'task_number': task_number,
+                               'content': f'Task {task_number}'
+                           }),
+                           content_type='application/json')
+    return json.loads(response.data)['id']
+
+
+def test_tasks_keyset_pagination(client):
+    """Проверка обхода заданий по курсору в порядке (категория, номер)"""
+    first = _create_category(client, 'Grammar')
+    second = _create_category(client, 'Vocabulary')
+    for number in (3, 1, 2):
+        _create_task(client, second, number)
+        _create_task(client, first, number)
+
+    seen = []
+    cursor = None
+    while True:
+        url = '/api/tasks?limit=4' + (f'&cursor={cursor}' if cursor else '')
+        response = client.get(url)
+        assert response.status_code == 200
+        page = json.loads(response.data)
+        assert len(page) <= 4
+        seen.extend((task['category_id'], task['task_number']) for task in page)
+        cursor = response.headers.get('X-Next-Cursor')
+        if cursor is None:
+            break
+
+    assert seen == [(first, 1), (first, 2), (first, 3), (second, 1), (second, 2), (second, 3)]
+
+
+def test_tasks_pagination_category_filter(client):
+    """Проверка фильтра category_id при постраничной выдаче"""
+    first = _create_category(client, 'Grammar')
+    second = _create_category(client, 'Vocabulary')
+    _create_task(client, first, 1)
+    _create_task(client, second, 1)
+    _create_task(client, second, 2)
+
+    response = client.get(f'/api/tasks?category_id={second}&limit=1')
+    data = json.loads(response.data)
+    assert [task['task_number'] for task in data] == [1]
+    cursor = response.headers['X-Next-Cursor']
+
+    response = client.get(f'/api/tasks?category_id={second}&limit=1&cursor={cursor}')
+    data = json.loads(response.data)
+    assert [task['task_number'] for task in data] == [2]
+    assert 'X-Next-Cursor' not in response.headers
+
+
+def test_categories_pagination(client):
+    """Проверка постраничной выдачи категорий по id"""
+    ids = [_create_category(client, name) for name in ('A', 'B', 'C')]
+
+    response = client.get('/api/categories?limit=2')
+    assert [cat['id'] for cat in json.loads(response.data)] == ids[:2]
+    cursor = response.headers['X-Next-Cursor']
+
+    response = client.get(f'/api/categories?limit=2&cursor={cursor}')
+    assert [cat['id'] for cat in json.loads(response.data)] == ids[2:]
+    assert 'X-Next-Cursor' not in response.headers
+
+
+def test_invalid_cursor(client):
+    """Проверка ответа на поврежденный курсор"""
+    response = client.get('/api/tasks?cursor=not-a-cursor')
+    assert response.status_code == 400
+    assert 'cursor' in json.loads(response.data)['message']
+
+
+def test_tasks_ndjson_export(client):
+    """Проверка потоковой выгрузки всех заданий в формате NDJSON"""
+    first = _create_category(client, 'Grammar')
+    second = _create_category(client, 'Vocabulary')
+    _create_task(client, second, 1)
+    _create_task(client, first, 2)
+    _create_task(client, first, 1)
+
+    response = client.get('/api/tasks?format=ndjson')
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    assert response.is_streamed
+    lines = response.get_data(as_text=True).splitlines()
+    tasks = [json.loads(line) for line in lines]
+    assert [(t['category_id'], t['task_number']) for t in tasks] == [(first, 1), (first, 2), (second, 1)]
+
+    response = client.get(f'/api/tasks?format=ndjson&category_id={second}')
+    assert len(response.get_data(as_text=True).splitlines()) == 1
+
+
+def test_bulk_create_tasks(client):
+    """Проверка пакетного создания заданий с результатами по каждой записи"""
+    category_id = _create_category(client, 'Grammar')
+    _create_task(client, category_id, 1)
+
+    tasks = [
+        {'category_id': category_id, 'task_number': 2, 'content': 'Second'},
+        {'category_id': category_id, 'task_number': 1, 'content': 'Duplicate'},
+        {'category_id': 999, 'task_number': 1, 'content': 'Unknown category'},
+        {'category_id': category_id, 'task_number': 2, 'content': 'Repeated in request'},
+        {'category_id': category_id, 'task_number': 3},
+    ]
+    response = client.post('/api/tasks/bulk',
+                           data=json.dumps({'tasks': tasks}),
+                           content_type='application/json')
+    assert response.status_code == 207
+    data = json.loads(response.data)
+    assert data['created'] == 1
+    assert data['errors'] == 4
+    statuses = [result['status'] for result in data['results']]
+    assert statuses == ['created', 'error', 'error', 'error', 'error']
+    assert data['results'][0]['full_id'] == f'{category_id:02d}02'
+
+    response = client.get(f'/api/tasks?category_id={category_id}')
+    assert [task['task_number'] for task in json.loads(response.data)] == [1, 2]
+
+
+def test_bulk_upsert_tasks(client):
+    """Проверка пакетного обновления существующих заданий (upsert)"""
+    category_id = _create_category(client, 'Grammar')
+    task_id = _create_task(client, category_id, 1)
+
+    tasks = [
+        {'category_id': category_id, 'task_number': 1, 'content': 'Updated'},
+        {'category_id': category_id, 'task_number': 2, 'content': 'New'},
+    ]
+    response = client.post('/api/tasks/bulk',
+                           data=json.dumps({'tasks': tasks, 'upsert': True}),
+                           content_type='application/json')
+    assert response.status_code == 201
+    data = json.loads(response.data)
+    assert (data['created'], data['updated'], data['errors']) == (1, 1, 0)
+    assert data['results'][0] == {'index': 0, 'status': 'updated', 'id': task_id}
+
+    response = client.get(f'/api/tasks/{task_id}')
+    assert json.loads(response.data)['content'] == 'Updated'
+
+
+def test_bulk_invalid_body(client):
+    """Проверка ответа на тело запроса без списка заданий"""
+    response = client.post('/api/tasks/bulk',
+                           data=json.dumps({'tasks': 'nope'}),
+                           content_type='application/json')
+    assert response.status_code == 400
+
+
+def test_task_conditional_get(client):
+    """Проверка 304 для задания по If-None-Match и If-Modified-Since"""
+    category_id = _create_category(client, 'Grammar')
+    task_id = _create_task(client, category_id, 1)
+
+    response = client.get(f'/api/tasks/{task_id}')
+    assert response.status_code == 200
+    etag = response.headers['ETag']
+    last_modified = response.headers['Last-Modified']
+
+    response = client.get(f'/api/tasks/{task_id}', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+    assert response.headers['ETag'] == etag
+
+    response = client.get(f'/api/tasks/{task_id}', headers={'If-Modified-Since': last_modified})
+    assert response.status_code == 304
+
+    client.put(f'/api/tasks/{task_id}',
+               data=json.dumps({'category_id': category_id, 'task_number': 1, 'content': 'Changed'}),
+               content_type='application/json')
+    response = client.get(f'/api/tasks/{task_id}', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert json.loads(response.data)['content'] == 'Changed'
+
+
+def test_conditional_get_skips_row_load(client, record_queries):
+    """На 304 запись не читается из БД: проверяется только версия каталога"""
+    category_id = _create_category(client, 'Grammar')
+    task_id = _create_task(client, category_id, 1)
+    etag = client.get(f'/api/tasks/{task_id}').headers['ETag']
+
+    with record_queries() as statements:
+        response = client.get(f'/api/tasks/{task_id}', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert len(statements) == 1
+    assert 'content' not in statements[0]
+
+
+def test_categories_list_conditional_get(client):
+    """Проверка ETag списка категорий"""
+    _create_category(client, 'Grammar')
+    response = client.get('/api/categories')
+    etag = response.headers['ETag']
+
+    response = client.get('/api/categories', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+
+    _create_category(client, 'Vocabulary')
+    response = client.get('/api/categories', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert len(json.loads(response.data)) == 2
@@ -0,0 +1,172 @@
+import asyncio
+import json
+import pytest
+from sqlalchemy import update
+from app import create_app, db
+from app.jobs import enqueue, SUCCEEDED
+from app.models import Job, User
+from config import TestConfig
+
+pytest.importorskip('aiosqlite')
+from app.api_async import AsyncAPI
+
+
+@pytest.fixture
+def app(tmp_path):
+    """Файловая база: асинхронный движок открывает к ней собственные соединения"""
+    config = type('AsyncConfig', (TestConfig,), {'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'app.db'}"})
+    app = create_app(config)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+async def call(asgi, method, path, query='', headers=None, body=b''):
+    """Один HTTP-запрос к ASGI-приложению: (статус, заголовки, тело)"""
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': body, 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        'type': 'http', 'method': method, 'path': path, 'query_string': query.encode(),
+        'headers': [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()],
+        'http_version': '1.1', 'scheme': 'http', 'server': ('localhost', 80), 'client': ('127.0.0.1', 5000),
+    }
+    await asgi(scope, receive, send)
+    headers = {name.decode(): value.decode() for name, value in messages[0]['headers']}
+    return messages[0]['status'], headers, b''.join(message.get('body', b'') for message in messages[1:])
+
+
+def serve(app, scenario):
+    """Выполняет сценарий с ASGI-приложением в одном цикле событий"""
+    asgi = AsyncAPI(app)
+
+    async def main():
+        try:
+            return await scenario(lambda *args, **kwargs: call(asgi, *args, **kwargs))
+        finally:
+            await asgi.close()
+
+    return asyncio.run(main())
+
+
+def test_catalog_reads_match_sync_api(app, client, grammar):
+    requests = [('/api/tasks', 'limit=1'), ('/api/tasks', f'category_id={grammar}'),
+                (f'/api/categories/{grammar}', ''), ('/api/tasks/999', ''), ('/api/tasks', 'cursor=bad')]
+    expected = [client.get(path, query_string=query) for path, query in requests]
+
+    async def scenario(request):
+        responses = [await request('GET', path, query) for path, query in requests]
+        etag = responses[0][1]['etag']
+        responses.append(await request('GET', '/api/tasks', 'limit=1', {'If-None-Match': etag}))
+        return responses
+
+    responses = serve(app, scenario)
+    for sync, (status, headers, body) in zip(expected, responses):
+        assert (status, body) == (sync.status_code, sync.data)
+        assert headers.get('etag') == sync.headers.get('ETag')
+        assert headers.get('x-next-cursor') == sync.headers.get('X-Next-Cursor')
+    assert responses[-1][0] == 304
+
+
+def test_large_catalog_served_by_flask(app, client, grammar):
+    """Тексты, не вошедшие в снимок, читает Flask-приложение"""
+    app.config['CATALOG_CONTENT_MAX_CHARS'] = 10
+    expected = client.get('/api/tasks')
+
+    async def scenario(request):
+        return await request('GET', '/api/tasks')
+
+    status, _, body = serve(app, scenario)
+    assert (status, body) == (200, expected.data)
+    assert [task['content'] for task in json.loads(body)] == ['First task', 'Second task']
+
+
+def test_job_status_uses_flask_session(app, client, login):
+    student = User(username='student')
+    student.set_password('secret')
+    db.session.add(student)
+    db.session.flush()
+    job = enqueue('tasks.export', {}, created_by=student.id)
+    db.session.commit()
+    login(client, 'student')
+    expected = client.get(f'/api/jobs/{job.id}')
+    cookie = {'Cookie': f"session={client.get_cookie('session').value}",
+              'User-Agent': expected.request.headers['User-Agent']}
+
+    async def scenario(request):
+        return (await request('GET', f'/api/jobs/{job.id}'),
+                await request('GET', f'/api/jobs/{job.id}', headers=cookie),
+                await request('GET', f'/api/jobs/{job.id}', headers=cookie))
+
+    anonymous, first, cached = serve(app, scenario)
+    assert anonymous[0] == 404
+    assert first[0] == 200 and first[2] == cached[2] == expected.data
+    assert json.loads(first[2])['status'] == 'queued'
+
+
+def test_job_wait_does_not_block_other_requests(app, grammar):
+    app.config['JOB_WAIT_POLL_SECONDS'] = 0.01
+    job_id = enqueue('tasks.export', {}).id
+    db.session.commit()
+
+    def finish_job():
+        with app.app_context():
+            db.session.execute(update(Job).where(Job.id == job_id).values(status=SUCCEEDED))
+            db.session.commit()
+
+    async def scenario(request):
+        waiting = asyncio.ensure_future(request('GET', f'/api/jobs/{job_id}', 'wait=5'))
+        await asyncio.sleep(0.05)
+        tasks = await request('GET', '/api/tasks')
+        assert not waiting.done()
+        await asyncio.to_thread(finish_job)
+        return tasks, await waiting
+
+    tasks, finished = serve(app, scenario)
+    assert tasks[0] == 200
+    assert json.loads(finished[2])['status'] == SUCCEEDED
+
+
+def test_other_requests_served_by_flask(app, grammar):
+    async def scenario(request):
+        created = await request('POST', '/api/categories', headers={'Content-Type': 'application/json'},
+                                body=json.dumps({'name': 'Vocabulary'}).encode())
+        listed = await request('GET', '/api/categories')
+        exported = await request('GET', '/api/tasks', 'format=ndjson')
+        return created, listed, exported
+
+    created, listed, exported = serve(app, scenario)
+    assert created[0] == 201
+    # Новая категория меняет версию каталога: асинхронное чтение видит ее сразу
+    assert [category['name'] for category in json.loads(listed[2])] == ['Grammar', 'Vocabulary']
+    assert exported[1]['content-type'] == 'application/x-ndjson'
+    assert [json.loads(line)['task_number'] for line in exported[2].splitlines()] == [1, 2]
+
+
+def test_session_from_other_client_handled_by_flask(app, client, login):
+    app.config['SESSION_PROTECTION'] = 'strong'
+    student = User(username='student')
+    student.set_password('secret')
+    db.session.add(student)
+    db.session.flush()
+    job = enqueue('tasks.export', {}, created_by=student.id)
+    db.session.commit()
+    login(client, 'student')
+    user_agent = client.get(f'/api/jobs/{job.id}').request.headers['User-Agent']
+    cookie = f"session={client.get_cookie('session').value}"
+
+    async def scenario(request):
+        return (await request('GET', f'/api/jobs/{job.id}', headers={'Cookie': cookie, 'User-Agent': user_agent}),
+                await request('GET', f'/api/jobs/{job.id}', headers={'Cookie': cookie, 'User-Agent': 'curl/8.0'}))
+
+    same_client, replayed = serve(app, scenario)
+    assert same_client[0] == 200
+    # Строгая защита сессии: Flask-Login очищает сессию, запрос выполняется анонимно
+    assert replayed[0] == 404
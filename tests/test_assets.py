@@ -0,0 +1,66 @@
+import gzip
+import pytest
+from flask import url_for
+from app import db
+from app.models import TaskCategory, Task
+
+GZIP = {'Accept-Encoding': 'gzip'}
+
+
+@pytest.fixture
+def tasks(app):
+    category = TaskCategory(name='Grammar')
+    db.session.add(category)
+    db.session.flush()
+    db.session.add_all([Task(category_id=category.id, task_number=n, content=f'Task number {n} ' * 5)
+                        for n in range(1, 31)])
+    db.session.commit()
+    return category.id
+
+
+def test_html_and_json_compressed_when_accepted(client, tasks):
+    plain = client.get(f'/category/{tasks}')
+    assert 'Content-Encoding' not in plain.headers and 'Accept-Encoding' not in plain.headers.get('Vary', '')
+
+    page = client.get(f'/category/{tasks}', headers=GZIP)
+    assert page.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in page.headers['Vary']
+    assert gzip.decompress(page.data) == plain.data
+
+    api = client.get('/api/tasks', headers=GZIP)
+    assert api.headers['Content-Encoding'] == 'gzip'
+    # Сжатый ответ несет слабый ETag, повторный запрос с ним получает 304
+    etag = api.headers['ETag']
+    assert etag.startswith('W/')
+    assert client.get('/api/tasks', headers={**GZIP, 'If-None-Match': etag}).status_code == 304
+
+
+def test_small_and_streamed_responses_not_compressed(client, tasks):
+    assert 'Content-Encoding' not in client.get(f'/api/tasks/{tasks}', headers=GZIP).headers
+    assert 'Content-Encoding' not in client.get('/api/tasks?format=ndjson', headers=GZIP).headers
+
+
+def test_static_fingerprint_and_immutable_caching(app, client, tmp_path):
+    app.config['STATIC_CACHE_DIR'] = str(tmp_path)
+    with app.test_request_context():
+        url = url_for('static', filename='style.css')
+    assert '?v=' in url
+    assert url in client.get('/').get_data(as_text=True)
+
+    response = client.get(url, headers=GZIP)
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.cache_control.immutable and response.cache_control.max_age == app.config['STATIC_MAX_AGE']
+    with open(app.static_folder + '/style.css', 'rb') as source:
+        assert gzip.decompress(response.data) == source.read()
+    assert list(tmp_path.iterdir())  # сжатый вариант сохранен для следующих запросов
+
+    stale = client.get('/static/style.css?v=outdated')
+    assert not stale.cache_control.immutable and 'Content-Encoding' not in stale.headers
+    stale.close()
+    response.close()
+
+
+def test_brotli_preferred_when_installed(client, tasks):
+    pytest.importorskip('brotli')
+    page = client.get(f'/category/{tasks}', headers={'Accept-Encoding': 'gzip, br'})
+    assert page.headers['Content-Encoding'] == 'br'
@@ -0,0 +1,66 @@
+import threading
+from werkzeug.security import generate_password_hash
+from app import db
+from app.models import User
+from app.security import PasswordHasher
+
+
+def add_user(username, password, method):
+    user = User(username=username, password_hash=generate_password_hash(password, method))
+    db.session.add(user)
+    db.session.commit()
+    return user.id
+
+
+def test_login_rehashes_outdated_hash(app, client):
+    """При входе хеш со старыми параметрами пересчитывается по текущим настройкам"""
+    user_id = add_user('student', 'secret123', 'pbkdf2:sha256:500')
+    response = client.post('/auth/login', data={'username': 'student', 'password': 'secret123'})
+    assert response.status_code == 302
+
+    user = db.session.get(User, user_id)
+    assert user.password_hash.startswith(app.config['PASSWORD_HASH_METHOD'] + '$')
+    assert not user.password_needs_rehash()
+    assert user.check_password('secret123')
+
+
+def test_failed_login_keeps_hash(client):
+    """Неверный пароль не меняет сохраненный хеш"""
+    user_id = add_user('student', 'secret123', 'pbkdf2:sha256:500')
+    old_hash = db.session.get(User, user_id).password_hash
+    response = client.post('/auth/login', data={'username': 'student', 'password': 'wrong'})
+    assert response.status_code == 200
+    db.session.expire_all()
+    assert db.session.get(User, user_id).password_hash == old_hash
+
+
+def test_register_uses_configured_method(app, client):
+    """Регистрация хеширует пароль по настройкам приложения, а не по умолчанию werkzeug"""
+    client.post('/auth/register', data={
+        'username': 'newcomer', 'password': 'secret123', 'password2': 'secret123'
+    })
+    user = User.query.filter_by(username='newcomer').one()
+    assert user.password_hash.startswith(app.config['PASSWORD_HASH_METHOD'] + '$')
+
+
+def test_login_busy_when_pool_is_full(app, client):
+    """Если пул хеширования занят, вход быстро отвечает 503 вместо ожидания"""
+    add_user('student', 'secret123', app.config['PASSWORD_HASH_METHOD'])
+    hasher = PasswordHasher(workers=1, queue=0, timeout=0.05)
+    app.extensions['password_hasher'] = hasher
+    started, release = threading.Event(), threading.Event()
+
+    def hold_slot():
+        started.set()
+        release.wait()
+
+    blocker = threading.Thread(target=hasher.run, args=(hold_slot,))
+    blocker.start()
+    started.wait()
+    try:
+        response = client.post('/auth/login', data={'username': 'student', 'password': 'secret123'})
+    finally:
+        release.set()
+        blocker.join()
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '5'
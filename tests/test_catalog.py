@@ -0,0 +1,100 @@
+import json
+from app import db
+from app.catalog import get_catalog, TaskRecord, CategoryRecord
+from app.models import User, TaskCategory, Task, CatalogVersion
+
+
+def test_snapshot_records(app, grammar):
+    """Снимок состоит из кортежей, проиндексированных по id и по категории"""
+    catalog = get_catalog()
+    assert isinstance(catalog.categories_by_id[grammar], CategoryRecord)
+    tasks = catalog.tasks_by_category[grammar]
+    assert all(isinstance(task, TaskRecord) for task in tasks)
+    assert [task.task_number for task in tasks] == [1, 2]
+    assert catalog.tasks_by_id[tasks[0].id] is tasks[0]
+    assert tasks[0].get_full_id() == f'{grammar:02d}01'
+
+
+def test_schema_seeds_version_row(app, record_queries):
+    """Строку счетчика создает схема, поэтому смена версии — один UPDATE"""
+    assert db.session.get(CatalogVersion, 1).version == 1
+    with record_queries() as statements:
+        db.session.add(TaskCategory(name='Grammar'))
+        db.session.commit()
+    assert [statement.split()[0] for statement in statements if 'catalog_version' in statement] == ['UPDATE']
+    assert db.session.get(CatalogVersion, 1).version == 2
+
+
+def test_snapshot_reused_until_write(app, grammar):
+    """Снимок переиспользуется, пока каталог не изменен"""
+    first = get_catalog()
+    assert get_catalog() is first
+
+    db.session.add(Task(category_id=grammar, task_number=3, content='Third task'))
+    db.session.commit()
+    second = get_catalog()
+    assert second.version > first.version
+    assert len(second.tasks_by_category[grammar]) == 3
+
+
+def test_solution_writes_keep_snapshot(app, grammar):
+    """Записи, не касающиеся каталога, не меняют его версию"""
+    first = get_catalog()
+    user = User(username='student')
+    user.set_password('secret')
+    db.session.add(user)
+    db.session.commit()
+    assert get_catalog() is first
+
+
+def test_api_write_bumps_version(client, grammar):
+    """Запись через API сразу видна в чтении"""
+    version = get_catalog().version
+    response = client.post('/api/tasks',
+                           data=json.dumps({'category_id': grammar, 'task_number': 5, 'content': 'New'}),
+                           content_type='application/json')
+    assert response.status_code == 201
+    assert get_catalog().version > version
+    response = client.get(f'/api/tasks?category_id={grammar}')
+    assert [task['task_number'] for task in json.loads(response.data)] == [1, 2, 5]
+
+
+def test_admin_add_task_bumps_version(client, grammar):
+    """admin.add_task инвалидирует снимок каталога"""
+    admin = User(username='teacher', is_admin=True)
+    admin.set_password('secret')
+    db.session.add(admin)
+    db.session.commit()
+    client.post('/auth/login', data={'username': 'teacher', 'password': 'secret'})
+
+    version = get_catalog().version
+    client.post('/admin/add_task', data={'category': grammar, 'content': 'Added from the dashboard'})
+    catalog = get_catalog()
+    assert catalog.version > version
+    assert catalog.tasks_by_category[grammar][-1].content == 'Added from the dashboard'
+
+
+def test_category_page_reads_snapshot(client, grammar, record_queries):
+    """Страница категории стоит одного запроса к БД (проверка версии)"""
+    client.get(f'/category/{grammar}')
+    with record_queries() as statements:
+        response = client.get(f'/category/{grammar}')
+    assert response.status_code == 200
+    assert b'Second task' in response.data
+    assert len(statements) == 1
+    assert client.get('/category/999').status_code == 404
+
+
+def test_large_catalog_keeps_texts_in_db(app, client, grammar):
+    """Тексты сверх CATALOG_CONTENT_MAX_CHARS не хранятся в снимке и читаются по id"""
+    app.config['CATALOG_CONTENT_MAX_CHARS'] = 10
+    db.session.add(Task(category_id=grammar, task_number=3, content='Third task'))
+    db.session.commit()
+    catalog = get_catalog()
+    assert not catalog.has_content and all(task.content is None for task in catalog.tasks)
+
+    response = client.get(f'/api/tasks?category_id={grammar}')
+    assert [task['content'] for task in response.get_json()] == ['First task', 'Second task', 'Third task']
+    task_id = catalog.tasks_by_category[grammar][2].id
+    assert client.get(f'/api/tasks/{task_id}').get_json()['content'] == 'Third task'
+    assert 'Third task' in client.get(f'/category/{grammar}').get_data(as_text=True)
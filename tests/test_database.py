@@ -0,0 +1,90 @@
+import sqlite3
+import threading
+from sqlalchemy import func, select, text
+from sqlalchemy.exc import OperationalError
+from app import create_app, db
+from app.database import configure_engine, engine_profile
+from app.models import TaskCategory
+from config import Config, TestConfig
+
+
+def make_app(tmp_path, **settings):
+    config = type('FileConfig', (TestConfig,), {
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'app.db'}",
+        **settings
+    })
+    return create_app(config)
+
+
+def read_while_writer_holds_lock(app, db_path):
+    """
+    Открывает отдельное соединение-писатель с незавершенной эксклюзивной транзакцией
+    и пробует прочитать таблицу через приложение. Возвращает результат чтения или ошибку.
+    """
+    with app.app_context():
+        db.create_all()
+        db.session.add(TaskCategory(name='Committed'))
+        db.session.commit()
+        db.session.remove()
+
+    writer = sqlite3.connect(db_path, isolation_level=None, timeout=0)
+    writer.execute('BEGIN EXCLUSIVE')
+    writer.execute("INSERT INTO task_categories (name) VALUES ('Uncommitted')")
+    outcome = {}
+
+    def reader():
+        with app.app_context():
+            try:
+                outcome['count'] = db.session.scalar(select(func.count()).select_from(TaskCategory))
+            except OperationalError as error:
+                outcome['error'] = error
+            finally:
+                db.session.remove()
+
+    thread = threading.Thread(target=reader)
+    thread.start()
+    thread.join(timeout=10)
+    writer.execute('ROLLBACK')
+    writer.close()
+    assert not thread.is_alive()
+    return outcome
+
+
+def test_sqlite_profile_pragmas(tmp_path):
+    """Профиль sqlite включает WAL, synchronous=NORMAL, busy_timeout и mmap"""
+    app = make_app(tmp_path)
+    with app.app_context():
+        with db.engine.connect() as connection:
+            assert connection.execute(text('PRAGMA journal_mode')).scalar() == 'wal'
+            assert connection.execute(text('PRAGMA synchronous')).scalar() == 1
+            assert connection.execute(text('PRAGMA busy_timeout')).scalar() == Config.SQLITE_BUSY_TIMEOUT_MS
+            assert connection.execute(text('PRAGMA mmap_size')).scalar() == Config.SQLITE_MMAP_SIZE
+
+
+def test_readers_not_blocked_by_writer_in_wal(tmp_path):
+    """В WAL читатель не ждет писателя и видит последнее подтвержденное состояние"""
+    app = make_app(tmp_path)
+    outcome = read_while_writer_holds_lock(app, tmp_path / 'app.db')
+    assert outcome == {'count': 1}
+
+
+def test_readers_blocked_without_profile(tmp_path):
+    """Без профиля (журнал отката) тот же читатель получает 'database is locked'"""
+    app = make_app(tmp_path, DB_ENGINE_PROFILE='none',
+                   SQLALCHEMY_ENGINE_OPTIONS={'connect_args': {'timeout': 0.2}})
+    outcome = read_while_writer_holds_lock(app, tmp_path / 'app.db')
+    assert 'locked' in str(outcome['error'])
+
+
+def test_server_profile_pool_options():
+    """Профиль server передает настройки пула в параметры движка"""
+    app = create_app(TestConfig)
+    app.config.update(SQLALCHEMY_DATABASE_URI='postgresql://db/app', DB_ENGINE_PROFILE=None,
+                      SQLALCHEMY_ENGINE_OPTIONS={'pool_recycle': 60})
+    assert engine_profile(app) == 'server'
+    configure_engine(app)
+    options = app.config['SQLALCHEMY_ENGINE_OPTIONS']
+    assert options['pool_size'] == Config.DB_POOL_SIZE
+    assert options['max_overflow'] == Config.DB_MAX_OVERFLOW
+    assert options['pool_pre_ping'] is True
+    assert options['pool_recycle'] == 60
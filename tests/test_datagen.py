@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import func
+from app import db
+from app.catalog import get_catalog
+from app.datagen import generate, DatabaseNotEmpty, STUDENT_PASSWORD
+from app.models import User, Task, Solution
+
+
+def test_generate_counts_and_distributions(app):
+    counts = generate(users=50, categories=3, tasks_per_category=10, solutions=3000, chunk_size=700)
+    assert counts == {'users': 51, 'categories': 3, 'tasks': 30, 'solutions': 3000}
+    assert db.session.scalar(db.select(func.count()).select_from(Solution)) == 3000
+
+    # Каталог виден сразу: версия увеличена вместе с данными
+    assert len(get_catalog().tasks) == 30
+
+    # Непроверенные решения — среди недавних, но проверенных большинство
+    pending = db.session.scalar(db.select(func.count()).where(Solution.is_reviewed == False))
+    assert 0 < pending < 3000 * 0.5
+    week_ago = datetime.utcnow() - timedelta(days=7)
+    recent = db.session.scalar(db.select(func.count()).where(Solution.submitted_at > week_ago))
+    assert recent > 3000 * 7 / 365 * 3
+    assert db.session.scalar(db.select(func.count()).where(Solution.reviewed_at < Solution.submitted_at)) == 0
+
+    # Первое задание категории популярнее последнего
+    per_number = dict(db.session.query(Task.task_number, func.count(Solution.id))
+                      .join(Solution, Solution.task_id == Task.id).group_by(Task.task_number).all())
+    assert per_number[1] > per_number[10]
+
+
+def test_generate_users_can_log_in(app, client):
+    generate(users=2, categories=1, tasks_per_category=1, solutions=5)
+    assert User.query.filter_by(username='admin').one().is_admin
+    student = User.query.filter_by(username='student2').one()
+    # Хеши созданы с настроенными параметрами: вход не перехеширует пароль
+    assert not student.password_needs_rehash()
+    stored_hash = student.password_hash
+    response = client.post('/auth/login', data={'username': 'student2', 'password': STUDENT_PASSWORD})
+    assert response.status_code == 302
+    db.session.expire_all()
+    assert User.query.filter_by(username='student2').one().password_hash == stored_hash
+
+
+def test_generate_requires_empty_database(app):
+    generate(users=1, categories=1, tasks_per_category=1, solutions=0)
+    with pytest.raises(DatabaseNotEmpty):
+        generate(users=1, categories=1, tasks_per_category=1, solutions=0)
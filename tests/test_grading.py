@@ -0,0 +1,97 @@
+import pytest
+from app import db
+from app.grading import grade, grade_pending, save_grades
+from app.models import User, TaskCategory, Task, Solution, UserProgress
+
+BLANK_TASK = 'Complete the sentence: When I arrived, they ___ (to leave).'
+NEGATIVE_TASK = 'Make the sentence negative: They play football every Sunday.'
+
+
+@pytest.mark.parametrize('key, task, answer, verdict', [
+    ('had left', BLANK_TASK, 'had left', True),
+    ('had left', BLANK_TASK, '  HAD   left. ', True),
+    ('had left', BLANK_TASK, "they'd left", True),
+    ('had left', BLANK_TASK, 'When I arrived, they had left!', True),
+    ('had left', BLANK_TASK, 'left', False),
+    ('had left', BLANK_TASK, 'When I arrived, they were leaving.', False),
+    ('had left', BLANK_TASK, 'I am not sure but maybe the past perfect fits here', None),
+    ("They don't play football every Sunday.", NEGATIVE_TASK, 'They do not play football every Sunday', True),
+    ("They don't play football every Sunday.", NEGATIVE_TASK, 'They don’t play football every sunday.', True),
+    ("They don't play football every Sunday.", NEGATIVE_TASK, 'They dont play football every Sunday', True),
+    ("They don't play football every Sunday.", NEGATIVE_TASK, 'They never play football on Sundays.', None),
+    ('had left', BLANK_TASK, 'they havent left', False),
+    ('cannot|can not', 'Fill in: I ___ swim.', "can't", True),
+    ('', BLANK_TASK, 'had left', None),
+])
+def test_grade(key, task, answer, verdict):
+    assert grade(key, task, answer) is verdict
+
+
+@pytest.fixture
+def student_client(app, client):
+    student = User(username='student')
+    student.set_password('secret')
+    category = TaskCategory(name='Past Perfect')
+    db.session.add_all([student, Task(category=category, task_number=1, content=BLANK_TASK, answer_key='had left')])
+    db.session.commit()
+    client.post('/auth/login', data={'username': 'student', 'password': 'secret'})
+    return client
+
+
+def test_submit_grades_closed_form_answers(student_client):
+    task = Task.query.one()
+    student_client.post('/submit_solution', data={'task_id': task.id, 'content': "They'd left"})
+    student_client.post('/submit_solution', data={'task_id': task.id, 'content': 'Something long and unclear here'})
+
+    graded, pending = Solution.query.order_by(Solution.id).all()
+    assert graded.is_reviewed and graded.feedback.startswith('Верно!')
+    assert not pending.is_reviewed and pending.feedback is None
+    progress = UserProgress.query.one()
+    assert (progress.submitted_count, progress.reviewed_count) == (2, 1)
+
+
+def test_grade_pending_backlog_in_process_pool(app):
+    category = TaskCategory(name='Past Perfect')
+    student = User(username='student', password_hash='x')
+    keyed = Task(category=category, task_number=1, content=BLANK_TASK, answer_key='had left')
+    free_form = Task(category=category, task_number=2, content='Describe your holiday.')
+    answers = ['had left', 'left', 'A long answer I cannot really decide about', 'had left']
+    solutions = [Solution(user=student, task=keyed, content=answer) for answer in answers]
+    solutions.append(Solution(user=student, task=free_form, content='I went to the sea.'))
+    solutions.append(Solution(user=student, task=keyed, content='left', is_reviewed=True, feedback='Teacher'))
+    db.session.add_all(solutions)
+    db.session.add(UserProgress(user_id=1, category_id=1, submitted_count=6, reviewed_count=1))
+    db.session.commit()
+
+    assert grade_pending(workers=2, batch_size=2) == 3
+    db.session.expire_all()
+    assert [solution.is_reviewed for solution in solutions] == [True, True, False, True, False, True]
+    assert solutions[1].feedback.startswith('Неверно. Правильный ответ: had left')
+    assert solutions[5].feedback == 'Teacher'
+    assert UserProgress.query.one().reviewed_count == 4
+
+
+def test_save_grades_without_update_returning(app, monkeypatch):
+    """MySQL/MariaDB: строки блокируются SELECT ... FOR UPDATE, затем обновляются"""
+    monkeypatch.setattr(db.engine.dialect, 'update_returning', False)
+    student = User(username='student', password_hash='x')
+    task = Task(category=TaskCategory(name='Past Perfect'), task_number=1, content=BLANK_TASK, answer_key='had left')
+    solutions = [Solution(user=student, task=task, content='had left'),
+                 Solution(user=student, task=task, content='left', is_reviewed=True, feedback='Teacher')]
+    db.session.add_all(solutions)
+    db.session.commit()
+
+    assert save_grades([(solutions[0].id, 'Верно!'), (solutions[1].id, 'Верно!')]) == 1
+    db.session.expire_all()
+    assert [solution.feedback for solution in solutions] == ['Верно!', 'Teacher']
+    assert UserProgress.query.one().reviewed_count == 1
+
+
+def test_answer_key_is_writable_but_not_exposed(client):
+    client.post('/api/categories', json={'name': 'Tenses'})
+    created = client.post('/api/tasks', json={'category_id': 1, 'task_number': 1,
+                                              'content': BLANK_TASK, 'answer_key': 'had left'})
+    assert 'answer_key' not in created.get_json()
+    client.put('/api/tasks/1', json={'category_id': 1, 'task_number': 1, 'content': BLANK_TASK + ' '})
+    assert db.session.get(Task, 1).answer_key == 'had left'
+    assert 'had left' not in client.get('/api/tasks/1').get_data(as_text=True)
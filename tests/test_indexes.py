@@ -0,0 +1,58 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models import TaskCategory, Task, Solution, User
+
+
+def query_plan(query):
+    """Возвращает текст EXPLAIN QUERY PLAN для запроса ORM"""
+    compiled = query.statement.compile(db.engine, compile_kwargs={'literal_binds': True})
+    rows = db.session.execute(text(f'EXPLAIN QUERY PLAN {compiled}')).all()
+    return ' | '.join(row[-1] for row in rows)
+
+
+def assert_uses_index(plan, index_name):
+    assert f'INDEX {index_name}' in plan, plan
+    assert 'TEMP B-TREE' not in plan, plan
+
+
+def test_category_tasks_use_index(app):
+    """main.category: задания категории по порядку номеров"""
+    query = Task.query.filter_by(category_id=1).order_by(Task.task_number)
+    assert_uses_index(query_plan(query), 'ix_tasks_category_id_task_number')
+
+
+def test_last_task_number_uses_index(app):
+    """admin.add_task: последний номер задания в категории"""
+    query = Task.query.filter_by(category_id=1).order_by(Task.task_number.desc()).limit(1)
+    assert_uses_index(query_plan(query), 'ix_tasks_category_id_task_number')
+
+
+def test_student_history_uses_index(app):
+    """main.dashboard: решения студента, новые сверху"""
+    query = Solution.query.filter_by(user_id=1).order_by(Solution.submitted_at.desc())
+    assert_uses_index(query_plan(query), 'ix_solutions_user_id_submitted_at')
+
+
+def test_review_queue_uses_index(app):
+    """admin.solutions: непроверенные решения, новые сверху"""
+    query = db.session.query(Solution, User.username) \
+        .join(User, Solution.user_id == User.id) \
+        .filter(Solution.is_reviewed == False) \
+        .order_by(Solution.submitted_at.desc())
+    assert_uses_index(query_plan(query), 'ix_solutions_is_reviewed_submitted_at')
+
+
+def test_task_number_unique_in_category(app):
+    """Номер задания не может повторяться внутри категории"""
+    category = TaskCategory(name='Grammar')
+    db.session.add(category)
+    db.session.flush()
+    db.session.add_all([
+        Task(category_id=category.id, task_number=1, content='First'),
+        Task(category_id=category.id, task_number=1, content='Second'),
+    ])
+    with pytest.raises(IntegrityError):
+        db.session.commit()
+    db.session.rollback()
@@ -0,0 +1,67 @@
+import json
+import logging
+import pytest
+from flask import g
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from app import create_app, db
+from app.instrumentation import QueryStats
+from config import TestConfig
+
+
+class InstrumentedConfig(TestConfig):
+    SQL_INSTRUMENTATION = True
+
+
+@pytest.fixture
+def instrumented_client():
+    app = create_app(InstrumentedConfig)
+    with app.app_context():
+        db.create_all()
+        yield app.test_client()
+        db.session.remove()
+        db.drop_all()
+
+
+def test_server_timing_header(instrumented_client):
+    """Ответ содержит число запросов и время в БД"""
+    instrumented_client.get('/api/categories')
+    response = instrumented_client.get('/api/categories')
+    assert response.status_code == 200
+    timing = response.headers['Server-Timing']
+    assert timing.startswith('db;dur=')
+    assert 'desc="1 queries"' in timing
+
+
+def test_structured_log_line(instrumented_client, caplog):
+    """По каждому запросу пишется JSON-строка со статистикой SQL"""
+    with caplog.at_level(logging.INFO, logger='app.sql'):
+        instrumented_client.post('/api/categories',
+                                 data=json.dumps({'name': 'Grammar'}),
+                                 content_type='application/json')
+    records = [json.loads(r.getMessage()) for r in caplog.records if r.name == 'app.sql']
+    assert len(records) == 1
+    record = records[0]
+    assert record['path'] == '/api/categories'
+    assert record['status'] == 201
+    assert record['queries'] >= 2
+    assert record['slowest_statement']
+
+
+def test_disabled_by_default(client):
+    response = client.get('/api/categories')
+    assert 'Server-Timing' not in response.headers
+
+
+def test_failed_query_leaves_no_state_on_connection(instrumented_client):
+    """Упавший запрос не оставляет отметок в соединении пула"""
+    app = instrumented_client.application
+    with app.test_request_context(), db.engine.connect() as connection:
+        g.sql_stats = QueryStats()
+        info = dict(connection.info)
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                connection.execute(text('SELECT * FROM missing_table'))
+        connection.execute(text('SELECT 1'))
+        assert dict(connection.info) == info
+        assert g.sql_stats.count == 1
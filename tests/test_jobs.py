@@ -0,0 +1,148 @@
+import json
+import time
+from datetime import datetime, timedelta
+from app import db
+from app.jobs import handler, enqueue, claim_job, run_job, work, retry_delay, QUEUED, RUNNING, SUCCEEDED, FAILED
+from app.models import Job, Task, TaskCategory, Solution, UserProgress
+
+calls = []
+
+
+@handler('test.flaky')
+def flaky_job(context, fail_times):
+    calls.append(context.attempt)
+    if context.attempt <= fail_times:
+        raise RuntimeError('temporary failure')
+    context.progress(1, 1)
+    return {'attempt': context.attempt}
+
+
+def make_runnable(job_id):
+    """Сдвигает время повтора в прошлое, чтобы не ждать задержку"""
+    db.session.get(Job, job_id).run_after = datetime.utcnow() - timedelta(seconds=1)
+    db.session.commit()
+
+
+def test_job_is_claimed_once(app):
+    job_id = enqueue('test.flaky', {'fail_times': 0}).id
+    db.session.commit()
+
+    assert claim_job('worker-a') == job_id
+    assert claim_job('worker-b') is None
+    job = db.session.get(Job, job_id)
+    assert (job.status, job.locked_by, job.attempts) == (RUNNING, 'worker-a', 1)
+
+
+def test_retry_with_backoff_then_success(app):
+    calls.clear()
+    job_id = enqueue('test.flaky', {'fail_times': 1}).id
+    db.session.commit()
+
+    assert work(stop_when_idle=True) == 1
+    job = db.session.get(Job, job_id)
+    assert job.status == QUEUED and 'temporary failure' in job.error
+    assert job.run_after >= datetime.utcnow() + timedelta(seconds=retry_delay(1) - 5)
+    assert claim_job('worker') is None  # задержка еще не прошла
+
+    make_runnable(job_id)
+    assert work(stop_when_idle=True) == 1
+    job = db.session.get(Job, job_id)
+    assert job.status == SUCCEEDED and job.error is None
+    assert (job.progress_done, job.progress_total) == (1, 1)
+    assert calls == [1, 2]
+
+
+def test_job_fails_after_max_attempts(app):
+    job_id = enqueue('test.flaky', {'fail_times': 5}, max_attempts=2).id
+    db.session.commit()
+    run_job(claim_job('worker'), 'worker')
+    make_runnable(job_id)
+    assert run_job(claim_job('worker'), 'worker') == FAILED
+    assert db.session.get(Job, job_id).attempts == 2
+
+
+def test_expired_lease_is_reclaimed(app):
+    job_id = enqueue('test.flaky', {'fail_times': 0}).id
+    db.session.commit()
+    claim_job('crashed-worker')
+    db.session.get(Job, job_id).locked_until = datetime.utcnow() - timedelta(seconds=1)
+    db.session.commit()
+
+    assert claim_job('worker') == job_id
+    assert run_job(job_id, 'worker') == SUCCEEDED
+
+
+def test_sync_job_status_does_not_wait(client):
+    job_id = enqueue('test.flaky', {'fail_times': 0}).id
+    db.session.commit()
+
+    # Ожидание ?wait=N доступно только в асинхронном режиме: поток воркера не занимается
+    started = time.monotonic()
+    assert client.get(f'/api/jobs/{job_id}?wait=5').get_json()['status'] == QUEUED
+    assert time.monotonic() - started < 1
+
+    run_job(claim_job('worker-a'), 'worker-a')
+    assert client.get(f'/api/jobs/{job_id}').get_json()['status'] == SUCCEEDED
+
+
+def test_async_bulk_import_returns_202(app, client):
+    category = TaskCategory(name='Grammar')
+    db.session.add(category)
+    db.session.commit()
+    response = client.post('/api/tasks/bulk?async=1', json=[
+        {'category_id': category.id, 'task_number': 1, 'content': 'Task one'},
+        {'category_id': 999, 'task_number': 1, 'content': 'Task two'},
+    ])
+    assert response.status_code == 202
+    location = response.headers['Location']
+    assert client.get(location).get_json()['status'] == QUEUED
+    assert Task.query.count() == 0
+
+    work(stop_when_idle=True)
+    job = client.get(location).get_json()
+    assert job['status'] == SUCCEEDED
+    assert (job['result']['created'], job['result']['errors']) == (1, 1)
+    assert Task.query.count() == 1
+
+
+def test_async_export_result_file(app, client, tmp_path):
+    app.config['JOB_RESULTS_DIR'] = str(tmp_path)
+    category = TaskCategory(name='Grammar')
+    db.session.add(category)
+    db.session.flush()
+    db.session.add_all([Task(category_id=category.id, task_number=n, content=f'Task {n}') for n in (1, 2)])
+    db.session.commit()
+
+    response = client.get('/api/tasks?format=ndjson&async=1')
+    assert response.status_code == 202
+    job_id = response.get_json()['job']['id']
+    assert client.get(f'/api/jobs/{job_id}/result').status_code == 409
+
+    work(stop_when_idle=True)
+    result = client.get(f'/api/jobs/{job_id}/result')
+    assert result.status_code == 200
+    assert [json.loads(line)['content'] for line in result.get_data(as_text=True).splitlines()] == ['Task 1', 'Task 2']
+
+
+def test_async_category_delete_removes_contents(app, client, seed_solutions):
+    app.config['JOB_DELETE_BATCH_SIZE'] = 2
+    seed_solutions(5)
+    category_id = TaskCategory.query.one().id
+
+    response = client.delete(f'/api/categories/{category_id}?async=1')
+    assert response.status_code == 202
+    work(stop_when_idle=True)
+    job = client.get(response.headers['Location']).get_json()
+    assert job['status'] == SUCCEEDED
+    assert job['progress'] == {'done': 5, 'total': 5}
+    assert (TaskCategory.query.count(), Task.query.count(), Solution.query.count()) == (0, 0, 0)
+    assert UserProgress.query.count() == 0
+    assert client.get(f'/api/categories/{category_id}').status_code == 404
+
+
+def test_admin_starts_grading_job(app, admin_client):
+    admin_client.post('/admin/jobs/grade')
+    job = Job.query.one()
+    assert job.kind == 'grading.grade_pending'
+    page = admin_client.get('/admin/jobs').get_data(as_text=True)
+    assert 'grading.grade_pending' in page and QUEUED in page
@@ -0,0 +1,108 @@
+import pytest
+from app import db
+from app.models import User, TaskCategory, Task, Solution, UserProgress
+from app.progress import rebuild_progress
+
+DASHBOARD_QUERY_BUDGET = 4  # пользователь сессии, версия каталога, сводка, страница решений
+
+
+@pytest.fixture
+def tasks(app):
+    grammar, vocabulary = TaskCategory(name='Grammar'), TaskCategory(name='Vocabulary')
+    tasks = [Task(category=grammar, task_number=1, content='Grammar task'),
+             Task(category=vocabulary, task_number=1, content='Vocabulary task')]
+    db.session.add_all(tasks)
+    db.session.commit()
+    return [task.id for task in tasks]
+
+
+@pytest.fixture
+def student_client(admin_client, login):
+    """Тот же клиент, вошедший как студент (преподаватель teacher тоже создан)"""
+    student = User(username='student')
+    student.set_password('secret')
+    db.session.add(student)
+    db.session.commit()
+    login(admin_client, 'student')
+    return admin_client
+
+
+def progress_rows():
+    return {(row.user_id, row.category_id): (row.submitted_count, row.reviewed_count, row.pending_count)
+            for row in UserProgress.query}
+
+
+def test_submit_and_review_update_progress(tasks, student_client, login):
+    grammar_task, vocabulary_task = tasks
+    for task_id in (grammar_task, grammar_task, vocabulary_task):
+        student_client.post('/submit_solution', data={'task_id': task_id, 'content': 'My answer'})
+    student = User.query.filter_by(username='student').one()
+    grammar, vocabulary = (db.session.get(Task, task_id).category_id for task_id in tasks)
+    assert progress_rows() == {(student.id, grammar): (2, 0, 2), (student.id, vocabulary): (1, 0, 1)}
+
+    solution = Solution.query.filter_by(task_id=grammar_task).first()
+    login(student_client, 'teacher')
+    student_client.post(f'/admin/solution/{solution.id}', data={'feedback': 'Good answer, well done'})
+    student_client.post(f'/admin/review_solution/{solution.id}', data={'feedback': 'Updated feedback text'})
+    assert progress_rows()[(student.id, grammar)] == (2, 1, 1)
+
+    incremental = progress_rows()
+    rebuild_progress()
+    db.session.commit()
+    assert progress_rows() == incremental
+
+
+def test_submit_unknown_task_is_rejected(tasks, student_client):
+    response = student_client.post('/submit_solution', data={'task_id': 9999, 'content': 'My answer'},
+                                   follow_redirects=True)
+    assert 'Задание не найдено' in response.get_data(as_text=True)
+    assert Solution.query.count() == 0
+
+
+def test_dashboard_reads_summary_and_pages_history(app, tasks, student_client, record_queries):
+    app.config['DASHBOARD_PAGE_SIZE'] = 3
+    for number in range(5):
+        student_client.post('/submit_solution', data={'task_id': tasks[0], 'content': f'Answer {number}'})
+
+    student_client.get('/dashboard')
+    with record_queries() as statements:
+        page = student_client.get('/dashboard').get_data(as_text=True)
+    assert len(statements) <= DASHBOARD_QUERY_BUDGET
+    assert '<td>Grammar</td>' in page and '<td>5</td>' in page
+    assert 'Answer 4' in page and 'Answer 1' not in page
+
+    cursor = page.split('cursor=')[1].split('"')[0]
+    older = student_client.get(f'/dashboard?cursor={cursor}').get_data(as_text=True)
+    assert 'Answer 1' in older and 'Answer 0' in older and 'Answer 4' not in older
+
+
+def rebuilt_rows():
+    """Сводка, пересчитанная с нуля; текущая восстанавливается откатом"""
+    rebuild_progress()
+    rows = progress_rows()
+    db.session.rollback()
+    return rows
+
+
+def test_catalog_changes_keep_progress_consistent(tasks, student_client, login):
+    grammar_task, vocabulary_task = tasks
+    for task_id in (grammar_task, grammar_task, vocabulary_task):
+        student_client.post('/submit_solution', data={'task_id': task_id, 'content': 'My answer'})
+    login(student_client, 'teacher')
+    solution = Solution.query.filter_by(task_id=grammar_task).first()
+    student_client.post(f'/admin/solution/{solution.id}', data={'feedback': 'Good answer, well done'})
+    student = User.query.filter_by(username='student').one()
+    grammar, vocabulary = (db.session.get(Task, task_id).category_id for task_id in tasks)
+
+    response = student_client.put(f'/api/tasks/{grammar_task}', json={
+        'category_id': vocabulary, 'task_number': 2, 'content': 'Grammar task'})
+    assert response.status_code == 200
+    assert progress_rows() == rebuilt_rows() == {(student.id, vocabulary): (3, 1, 2)}
+
+    assert student_client.delete(f'/api/tasks/{vocabulary_task}').status_code == 204
+    assert progress_rows() == rebuilt_rows() == {(student.id, vocabulary): (2, 1, 1)}
+
+    assert student_client.delete(f'/api/categories/{vocabulary}').status_code == 204
+    assert progress_rows() == rebuilt_rows() == {}
+    assert Task.query.count() == 0 and Solution.query.filter(Solution.task_id.isnot(None)).count() == 0
+    assert db.session.get(TaskCategory, grammar) is not None
@@ -0,0 +1,172 @@
+import threading
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy.dialects import mssql, mysql, postgresql
+from app import create_app, db
+from app.admin.queue import claim_solutions, claim_next, release_solution
+from app.database import claim_rows
+from app.models import User, Solution
+from config import TestConfig
+
+
+def make_reviewers(count):
+    reviewers = [User(username=f'reviewer{n}', password_hash='x', is_admin=True) for n in range(count)]
+    db.session.add_all(reviewers)
+    db.session.commit()
+    return [reviewer.id for reviewer in reviewers]
+
+
+def pending_ids_in_order():
+    return [solution.id for solution in
+            Solution.query.filter_by(is_reviewed=False).order_by(Solution.submitted_at, Solution.id)]
+
+
+def test_claims_are_disjoint_and_oldest_first(app, seed_solutions):
+    seed_solutions(10)
+    first, second = make_reviewers(2)
+    pending = pending_ids_in_order()
+
+    assert claim_solutions(first, 3) == pending[:3]
+    assert claim_solutions(second, 3) == pending[3:5]
+    assert claim_solutions(first, 3) == []
+
+
+def test_expired_lease_returns_to_queue(app, seed_solutions):
+    seed_solutions(2)
+    first, second = make_reviewers(2)
+    claimed = claim_solutions(first, 1)
+    Solution.query.filter_by(id=claimed[0]).update({'claim_expires_at': datetime.utcnow() - timedelta(seconds=1)})
+    db.session.commit()
+
+    assert claim_solutions(second, 1) == claimed
+    assert db.session.get(Solution, claimed[0]).claimed_by == second
+
+
+def test_release_and_claim_next_respect_owner(app, seed_solutions):
+    app.config['REVIEW_CLAIM_BATCH'] = 2
+    seed_solutions(8)
+    first, second = make_reviewers(2)
+    claimed = claim_next(first)
+    assert len(claimed) == 2
+    assert claim_next(first) == []  # уже держит REVIEW_CLAIM_BATCH решений
+
+    assert not release_solution(claimed[0], second)
+    assert release_solution(claimed[0], first)
+    assert claim_next(second)[0] == claimed[0]
+
+
+def test_queue_pages_claim_and_review(app, admin_client, seed_solutions):
+    seed_solutions(4)
+    assert 'нет решений в работе' in admin_client.get('/admin/queue').get_data(as_text=True)
+
+    admin_client.post('/admin/queue/claim')
+    held = Solution.query.filter(Solution.claimed_by.isnot(None)).all()
+    assert len(held) == 2
+    page = admin_client.get('/admin/queue').get_data(as_text=True)
+    assert all(solution.content in page for solution in held)
+
+    response = admin_client.post(f'/admin/review_solution/{held[0].id}?from=queue',
+                                 data={'feedback': 'Well done, no mistakes'})
+    assert response.headers['Location'].endswith('/admin/queue')
+    reviewed = db.session.get(Solution, held[0].id)
+    assert reviewed.is_reviewed and reviewed.claimed_by is None
+
+
+def test_review_respects_other_reviewers_lease(app, admin_client, seed_solutions):
+    seed_solutions(4)
+    other = make_reviewers(1)[0]
+    held, free = claim_solutions(other, 1)[0], pending_ids_in_order()[1]
+
+    for path in (f'/admin/solution/{held}', f'/admin/review_solution/{held}'):
+        page = admin_client.post(path, data={'feedback': 'Well done, no mistakes'},
+                                 follow_redirects=True).get_data(as_text=True)
+        assert 'проверяет другой преподаватель' in page
+    solution = db.session.get(Solution, held)
+    assert not solution.is_reviewed and solution.claimed_by == other
+
+    # Свободное решение или решение с истекшей арендой можно проверить сразу
+    Solution.query.filter_by(id=held).update({'claim_expires_at': datetime.utcnow() - timedelta(seconds=1)})
+    db.session.commit()
+    for solution_id in (held, free):
+        admin_client.post(f'/admin/solution/{solution_id}', data={'feedback': 'Well done, no mistakes'})
+        solution = db.session.get(Solution, solution_id)
+        assert solution.is_reviewed and solution.claimed_by is None
+
+
+def test_concurrent_claims_never_overlap(tmp_path, seed_solutions):
+    config = type('FileConfig', (TestConfig,), {'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'app.db'}"})
+    app = create_app(config)
+    with app.app_context():
+        db.create_all()
+        seed_solutions(80)
+        reviewers = make_reviewers(8)
+        db.session.remove()
+
+    results = {}
+    barrier = threading.Barrier(len(reviewers))
+
+    def reviewer(reviewer_id):
+        with app.app_context():
+            barrier.wait()
+            results[reviewer_id] = claim_solutions(reviewer_id, 5)
+
+    threads = [threading.Thread(target=reviewer, args=(reviewer_id,)) for reviewer_id in reviewers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    claimed = [solution_id for ids in results.values() for solution_id in ids]
+    assert len(claimed) == len(set(claimed)) == 40
+
+
+class CompilingSession:
+    """Сессия без соединения: записывает SQL, скомпилированный для диалекта"""
+
+    def __init__(self, dialect, ids=()):
+        self.dialect = dialect
+        self.ids = list(ids)
+        self.statements = []
+
+    def get_bind(self):
+        return self
+
+    def compile(self, statement):
+        self.statements.append(str(statement.compile(dialect=self.dialect)))
+
+    def scalars(self, statement):
+        self.compile(statement)
+        return self
+
+    def all(self):
+        return self.ids
+
+    def execute(self, statement, execution_options=None):
+        self.compile(statement)
+        return self
+
+
+def claim(session):
+    return claim_rows(session, Solution, Solution.is_reviewed == False,
+                      [Solution.submitted_at, Solution.id], 5, {'claimed_by': 1})
+
+
+def test_claim_rows_on_mysql_locks_then_updates():
+    session = CompilingSession(mysql.dialect(), ids=[4, 2])
+    assert claim(session) == [4, 2]
+    locked, updated = session.statements
+    assert locked.endswith('FOR UPDATE SKIP LOCKED') and 'LIMIT' in locked
+    assert updated.startswith('UPDATE solutions') and 'IN (__[POSTCOMPILE_id_1])' in updated
+    assert 'RETURNING' not in updated and 'SELECT' not in updated
+
+
+def test_claim_rows_on_postgresql_is_one_statement():
+    session = CompilingSession(postgresql.dialect())
+    claim(session)
+    [statement] = session.statements
+    assert 'FOR UPDATE SKIP LOCKED' in statement and 'RETURNING' in statement
+
+
+def test_claim_rows_rejects_unsupported_dialect():
+    with pytest.raises(NotImplementedError, match='mssql'):
+        claim(CompilingSession(mssql.dialect()))
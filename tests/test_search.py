@@ -0,0 +1,121 @@
+import os
+import pytest
+from sqlalchemy import bindparam, create_engine, text
+from app import create_app, db
+from app.models import User, TaskCategory, Task, Solution
+from app.search import parse_terms, match_expression, InvalidQuery, FTS_TABLES, FTS_TRIGGERS
+from config import TestConfig
+
+MIGRATIONS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+
+
+@pytest.fixture
+def corpus(app):
+    category = TaskCategory(name='Tenses')
+    student = User(username='student', password_hash='x')
+    texts = [
+        'Present Perfect: I have lived here since 2010.',
+        'Present Perfect or Past Simple? She has worked since Monday.',
+        'Past Simple: I lived in Paris.',
+        'Present Simple: she works since... no, every day.',
+    ]
+    tasks = [Task(category=category, task_number=n, content=content) for n, content in enumerate(texts, 1)]
+    solutions = [
+        Solution(user=student, task=tasks[0], content='I have been living here since 2010.'),
+        Solution(user=student, task=tasks[1], content='She worked on Monday.',
+                 feedback='Use Present Perfect with since.', is_reviewed=True),
+    ]
+    db.session.add_all(tasks + solutions)
+    db.session.commit()
+    return tasks, solutions
+
+
+def search_ids(client, **params):
+    response = client.get('/api/search', query_string=params)
+    assert response.status_code == 200
+    return [hit['id'] for hit in response.get_json()], response
+
+
+def test_parse_terms_treats_syntax_literally():
+    assert parse_terms('"Present  Perfect" since') == ['Present Perfect', 'since']
+    assert match_expression(parse_terms('NEAR(a b) OR *')) == '"NEAR(a" AND "b)" AND "OR" AND "*"'
+    with pytest.raises(InvalidQuery):
+        parse_terms(' "" ')
+
+
+def test_task_search_ranks_phrase_and_all_words(client, corpus):
+    tasks, _ = corpus
+    ids, response = search_ids(client, q='"Present Perfect" since')
+    assert sorted(ids) == [tasks[0].id, tasks[1].id]
+    hit = response.get_json()[0]
+    assert '<mark>Present Perfect</mark>' in hit['highlight'] and '<mark>' not in hit['snippet']
+
+    assert search_ids(client, q='NEAR(OR *')[0] == []
+    assert client.get('/api/search', query_string={'q': '  '}).status_code == 400
+
+
+def test_index_follows_updates_and_deletes(client, corpus):
+    tasks, _ = corpus
+    tasks[2].content = 'Future Simple: I will live in Paris.'
+    db.session.delete(tasks[3])
+    db.session.commit()
+    assert search_ids(client, q='Paris')[0] == [tasks[2].id]
+    assert search_ids(client, q='lived Paris')[0] == []
+    assert search_ids(client, q='every day')[0] == []
+
+
+def test_pages_do_not_overlap(client, corpus):
+    tasks, _ = corpus
+    for sort in ('rank', 'recent'):
+        first, response = search_ids(client, q='since', limit=2, sort=sort)
+        second, last = search_ids(client, q='since', limit=2, sort=sort, cursor=response.headers['X-Next-Cursor'])
+        assert sorted(first + second) == [tasks[0].id, tasks[1].id, tasks[3].id]
+        assert 'X-Next-Cursor' not in last.headers
+
+
+def test_solution_search_is_for_teachers(client, admin_client, corpus):
+    _, solutions = corpus
+    client.get('/auth/logout')
+    assert client.get('/api/search', query_string={'q': 'since', 'scope': 'solutions'}).status_code == 403
+
+    client.post('/auth/login', data={'username': 'teacher', 'password': 'secret'})
+    ids, _ = search_ids(client, q='"Present Perfect"', scope='solutions')
+    assert ids == [solutions[1].id]
+
+    page = client.get('/admin/search', query_string={'q': 'since', 'scope': 'solutions'}).get_data(as_text=True)
+    assert f'/admin/solution/{solutions[0].id}' in page and '<mark>since</mark>' in page
+
+
+def test_bulk_generation_rebuilds_index_and_keeps_triggers(app, client):
+    from app.datagen import generate
+    generate(users=3, categories=2, tasks_per_category=3, solutions=50)
+    assert len(search_ids(client, q='"to work"', limit=100)[0]) == 6
+
+    task = db.session.get(Task, 1)
+    task.content = 'Describe your favourite holiday.'
+    db.session.commit()
+    assert search_ids(client, q='holiday')[0] == [1]
+
+
+def fts_schema(path, build):
+    """Определения таблиц и триггеров FTS в файловой базе, созданной build()"""
+    config = type('FileConfig', (TestConfig,), {'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}'})
+    with create_app(config, web=False, migrations=True).app_context():
+        build()
+    engine = create_engine(f'sqlite:///{path}')
+    with engine.connect() as connection:
+        rows = connection.execute(text('SELECT name, sql FROM sqlite_master WHERE name IN :names')
+                                  .bindparams(bindparam('names', expanding=True)),
+                                  {'names': list(FTS_TABLES + FTS_TRIGGERS)}).all()
+    engine.dispose()
+    return dict(rows)
+
+
+def test_migrations_match_fts_ddl(tmp_path):
+    """Миграции 0008/0009 хранят свои копии DDL: схема после них совпадает с create_all"""
+    pytest.importorskip('flask_migrate')
+    from flask_migrate import upgrade
+    migrated = fts_schema(tmp_path / 'migrated.db', lambda: upgrade(directory=MIGRATIONS))
+    created = fts_schema(tmp_path / 'created.db', db.create_all)
+    assert len(created) == len(FTS_TABLES + FTS_TRIGGERS)
+    assert migrated == created
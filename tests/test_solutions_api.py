@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta
+import pytest
+from app import db
+from app.models import User, TaskCategory, Task, Solution
+
+START = datetime(2024, 3, 1, 12, 0)
+
+
+@pytest.fixture
+def solutions(app):
+    """Два студента, две категории; решения отправлены с интервалом в час"""
+    students = [User(username=name) for name in ('student', 'other')]
+    for student in students:
+        student.set_password('secret')
+    tasks = [Task(category=TaskCategory(name=name), task_number=1, content=f'{name} task')
+             for name in ('Grammar', 'Vocabulary')]
+    solutions = [
+        Solution(user=students[number % 2], task=tasks[number % 3 == 0], content=f'Answer {number}',
+                 feedback='Well done' if number % 2 else None, is_reviewed=bool(number % 2),
+                 submitted_at=START + timedelta(hours=number))
+        for number in range(6)
+    ]
+    db.session.add_all(solutions)
+    db.session.commit()
+    return solutions
+
+
+def list_ids(client, **params):
+    response = client.get('/api/solutions', query_string=params)
+    assert response.status_code == 200
+    return [solution['id'] for solution in response.get_json()], response
+
+
+def test_pages_follow_submission_order(admin_client, solutions):
+    newest_first = [solution.id for solution in reversed(solutions)]
+    first, response = list_ids(admin_client, limit=4)
+    second, last = list_ids(admin_client, limit=4, cursor=response.headers['X-Next-Cursor'])
+    assert first + second == newest_first
+    assert 'X-Next-Cursor' not in last.headers
+    assert admin_client.get('/api/solutions', query_string={'cursor': 'bad'}).status_code == 400
+
+
+def test_filters(admin_client, solutions):
+    grammar, vocabulary = solutions[1].task, solutions[0].task
+    ids = lambda **params: sorted(list_ids(admin_client, **params)[0])
+    expected = lambda condition: sorted(solution.id for solution in solutions if condition(solution))
+
+    assert ids(user_id=solutions[1].user_id) == expected(lambda s: s.user_id == solutions[1].user_id)
+    assert ids(task_id=vocabulary.id) == expected(lambda s: s.task_id == vocabulary.id)
+    assert ids(category_id=grammar.category_id) == expected(lambda s: s.task_id == grammar.id)
+    assert ids(is_reviewed='false') == expected(lambda s: not s.is_reviewed)
+    assert ids(submitted_from='2024-03-01T14:00:00', submitted_to='2024-03-01T19:00:00+03:00') \
+        == sorted([solutions[2].id, solutions[3].id])
+    assert admin_client.get('/api/solutions', query_string={'submitted_from': 'yesterday'}).status_code == 400
+
+
+def test_summary_does_not_load_texts(admin_client, solutions, record_queries):
+    admin_client.get('/api/solutions')
+    with record_queries() as statements:
+        response = admin_client.get('/api/solutions', query_string={'fields': 'summary', 'is_reviewed': 'true'})
+    data = response.get_json()
+    assert len(data) == 3 and all('content' not in item and 'feedback' not in item for item in data)
+    select = next(statement for statement in statements if 'FROM solutions' in statement)
+    assert 'solutions.content' not in select.split('WHERE')[0] and 'solutions.feedback' not in select
+
+    item = admin_client.get(f'/api/solutions/{solutions[1].id}').get_json()
+    assert (item['content'], item['feedback']) == ('Answer 1', 'Well done')
+
+
+def test_students_see_only_own_solutions(client, solutions, login):
+    assert client.get('/api/solutions').status_code == 401
+    login(client, 'student')
+    own = sorted(solution.id for solution in solutions if solution.user.username == 'student')
+    assert sorted(list_ids(client)[0]) == own
+    other = next(solution for solution in solutions if solution.user.username == 'other')
+    assert client.get('/api/solutions', query_string={'user_id': other.user_id}).status_code == 403
+    assert client.get(f'/api/solutions/{other.id}').status_code == 404
+    assert client.get(f'/api/solutions/{own[0]}').status_code == 200
+
+
+def test_cursor_survives_deleted_anchor(admin_client, solutions):
+    # Два решения с одинаковым временем: порядок внутри него задает id
+    solutions[2].submitted_at = solutions[3].submitted_at
+    db.session.commit()
+    ordered = sorted(solutions, key=lambda solution: (solution.submitted_at, solution.id), reverse=True)
+    first, response = list_ids(admin_client, limit=3)
+    assert first == [solution.id for solution in ordered[:3]]
+    db.session.delete(ordered[2])
+    db.session.commit()
+    rest, _ = list_ids(admin_client, cursor=response.headers['X-Next-Cursor'])
+    assert rest == [solution.id for solution in ordered[3:]]
@@ -0,0 +1,66 @@
+import json
+import statistics
+import subprocess
+import sys
+from app import create_app
+from config import TestConfig
+
+# Модули веб-части, которые не должны загружаться в воркерах и скриптах
+WEB_ONLY_MODULES = ('flask_restful', 'flask_wtf', 'wtforms', 'flask_migrate', 'alembic', 'app.main', 'app.admin')
+
+# Импорт зависимостей, общий для всех процессов приложения
+DEPENDENCIES = 'import flask, flask_sqlalchemy, flask_login'
+
+
+def startup_time(code, setup='', runs=3):
+    """Медиана времени выполнения code (после setup) в новых процессах, мс"""
+    code = f'{setup}\nimport time\nstarted = time.perf_counter()\n{code}\nprint((time.perf_counter() - started) * 1000)'
+    return statistics.median(
+        float(subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout)
+        for _ in range(runs)
+    )
+
+
+def test_scripts_skip_web_modules():
+    code = ('import json, sys; from app import create_app; from app.jobs import load_handlers; '
+            'create_app(web=False); load_handlers(); '
+            f'print(json.dumps([m for m in {WEB_ONLY_MODULES!r} if m in sys.modules]))')
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    assert json.loads(result.stdout) == []
+
+
+def test_worker_registers_all_handlers():
+    code = ('import json; from app.jobs import HANDLERS, load_handlers; load_handlers(); '
+            'print(json.dumps(sorted(HANDLERS)))')
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    assert json.loads(result.stdout) == ['categories.delete', 'grading.grade_pending', 'tasks.export', 'tasks.import']
+
+
+def test_app_without_web_part():
+    app = create_app(TestConfig, web=False)
+    assert not app.blueprints and 'migrate' not in app.extensions
+    assert 'catalog' in app.extensions and 'password_hasher' in app.extensions
+    assert 'migrate' in create_app(TestConfig, web=False, migrations=True).extensions
+
+
+def test_web_app_loads_migrate_on_demand():
+    code = ('import json, sys; from app import create_app; create_app(); '
+            "print(json.dumps([m for m in ('flask_migrate', 'alembic') if m in sys.modules]))")
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    assert json.loads(result.stdout) == []
+
+    app = create_app(TestConfig)
+    assert 'migrate' not in app.extensions
+    result = app.test_cli_runner().invoke(args=['db', '--help'])
+    assert result.exit_code == 0 and 'upgrade' in result.output
+    assert 'migrate' in app.extensions
+
+
+def test_startup_stays_small_relative_to_dependencies():
+    # Собственное время старта сравнивается с импортом зависимостей на той же машине:
+    # при записи базовой линии web занимал ~0.3 от него, скрипты — менее половины web
+    dependencies = startup_time(DEPENDENCIES)
+    web = startup_time('from app import create_app; create_app()', DEPENDENCIES)
+    cli = startup_time('from app import create_app; create_app(web=False)', DEPENDENCIES)
+    assert web < dependencies * 0.5
+    assert cli < web * 0.75
@@ -0,0 +1,49 @@
+import re
+from app import create_app, db
+from app.models import Task, User
+from config import TestConfig
+
+CSRF_FIELD_RE = re.compile(r'name="csrf_token" type="hidden" value="([^"]+)"')
+
+
+def test_anonymous_page_is_a_cache_lookup(app, client, grammar, record_queries):
+    client.get(f'/category/{grammar}')
+    with record_queries() as statements:
+        response = client.get(f'/category/{grammar}')
+    assert 'First task' in response.get_data(as_text=True)
+    assert len(statements) == 1  # только версия каталога
+
+    db.session.add(Task(category_id=grammar, task_number=3, content='Third task'))
+    db.session.commit()
+    assert 'Third task' in client.get(f'/category/{grammar}').get_data(as_text=True)
+
+
+def test_fragment_depends_on_viewer(app, admin_client, grammar, login):
+    student = User(username='student')
+    student.set_password('secret')
+    db.session.add(student)
+    db.session.commit()
+
+    assert 'Отправить решение' not in admin_client.get(f'/category/{grammar}').get_data(as_text=True)
+    login(admin_client, 'student')
+    app.config['WTF_CSRF_ENABLED'] = True
+    page = admin_client.get(f'/category/{grammar}').get_data(as_text=True)
+    assert page.count('Отправить решение') == 2
+    assert '\x00' not in page
+    # Поле CSRF в кэшированных карточках — токен текущей сессии
+    tokens = set(CSRF_FIELD_RE.findall(page))
+    assert len(tokens) == 1
+    assert tokens == set(CSRF_FIELD_RE.findall(admin_client.get(f'/category/{grammar}').get_data(as_text=True)))
+
+
+def test_bytecode_cache_written_to_directory(tmp_path):
+    class CachedConfig(TestConfig):
+        JINJA_BYTECODE_CACHE_DIR = str(tmp_path)
+
+    app = create_app(CachedConfig)
+    with app.app_context():
+        db.create_all()
+        assert app.test_client().get('/').status_code == 200
+        db.session.remove()
+        db.drop_all()
+    assert any(path.name.startswith('__jinja2_') for path in tmp_path.iterdir())
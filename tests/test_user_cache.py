@@ -0,0 +1,58 @@
+from flask import g
+from app import db
+from app.models import User
+from app.user_cache import UserCache, CachedUser, get_user_cache, load_user
+
+
+def fresh_request(client, url):
+    """Запрос, в котором пользователь сессии загружается заново (g общий для тестов в одном контексте)"""
+    g.pop('_login_user', None)
+    return client.get(url)
+
+
+def test_authenticated_requests_skip_user_query(app, admin_client, record_queries):
+    fresh_request(admin_client, '/admin/stats/user-cache')
+    before = get_user_cache().stats()
+    with record_queries() as statements:
+        response = fresh_request(admin_client, '/admin/stats/user-cache')
+    assert response.get_json()['hits'] == before['hits'] + 1
+    assert not any('FROM users' in statement for statement in statements)
+
+
+def test_loader_returns_detached_record(app, admin_client):
+    teacher = User.query.filter_by(username='teacher').one()
+    user = load_user(str(teacher.id))
+    assert isinstance(user, CachedUser)
+    assert (user.id, user.username, user.is_admin) == (teacher.id, 'teacher', True)
+    assert load_user(str(teacher.id)) is user
+    assert load_user('999') is None and load_user('abc') is None
+
+
+def test_changes_invalidate_after_commit(app):
+    student = User(username='student', password_hash='x')
+    db.session.add(student)
+    db.session.commit()
+    assert load_user(str(student.id)).is_admin is False
+
+    student.is_admin = True
+    db.session.flush()
+    assert load_user(str(student.id)).is_admin is False  # до commit запись прежняя
+    db.session.commit()
+    assert load_user(str(student.id)).is_admin is True
+
+    db.session.query(User).filter_by(id=student.id).update({'username': 'renamed'})
+    db.session.commit()
+    assert load_user(str(student.id)).username == 'renamed'
+
+
+def test_ttl_and_lru_bounds():
+    cache = UserCache(size=2, ttl=60)
+    for user_id in (1, 2, 3):
+        cache.put(CachedUser(user_id, f'user{user_id}', False))
+    assert cache.get(1) is None and cache.get(3).username == 'user3'
+    assert cache.stats()['evictions'] == 1
+
+    expired = UserCache(size=2, ttl=0)
+    expired.put(CachedUser(1, 'user1', False))
+    assert expired.get(1) is None
+    assert expired.stats()['misses'] == 1
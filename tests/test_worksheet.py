@@ -0,0 +1,76 @@
+import pytest
+from app import db
+from app.models import Task, TaskCategory, Solution, User, UserProgress
+
+
+@pytest.fixture
+def student_client(app, client, grammar, login):
+    student = User(username='student')
+    student.set_password('secret')
+    db.session.add(student)
+    keyed = Task.query.filter_by(task_number=1).one()
+    keyed.content = 'Complete the sentence: When I arrived, they ___ (to leave).'
+    keyed.answer_key = 'had left'
+    db.session.commit()
+    login(client, 'student')
+    return client
+
+
+def test_form_submits_all_answers_in_one_insert(app, student_client, grammar, record_queries):
+    tasks = {task.task_number: task.id for task in Task.query}
+    student_client.get(f'/category/{grammar}/worksheet')
+    with record_queries() as statements:
+        response = student_client.post(f'/category/{grammar}/worksheet', data={
+            f'answer-{tasks[1]}': 'had left', f'answer-{tasks[2]}': 'My answer', 'answer-999': 'ignored',
+        })
+    assert response.status_code == 302
+    assert sum(1 for statement in statements if statement.startswith('INSERT INTO solutions')) == 1
+    assert sum(1 for statement in statements if 'catalog_version' in statement) == 1
+
+    solutions = {solution.task_id: solution for solution in Solution.query}
+    assert set(solutions) == {tasks[1], tasks[2]}
+    assert solutions[tasks[1]].is_reviewed and not solutions[tasks[2]].is_reviewed
+    progress = UserProgress.query.one()
+    assert (progress.submitted_count, progress.reviewed_count) == (2, 1)
+
+
+def test_json_reports_each_answer(app, student_client, grammar):
+    other = TaskCategory(name='Vocabulary')
+    db.session.add(other)
+    db.session.flush()
+    foreign = Task(category_id=other.id, task_number=1, content='Other task')
+    db.session.add(foreign)
+    db.session.commit()
+    first, second = (task.id for task in Task.query.filter_by(category_id=grammar).order_by(Task.task_number))
+
+    response = student_client.post(f'/category/{grammar}/worksheet', json={'answers': [
+        {'task_id': first, 'content': 'wrong'},
+        {'task_id': second, 'content': 'My answer'},
+        {'task_id': first, 'content': 'again'},
+        {'task_id': foreign.id, 'content': 'answer'},
+        {'task_id': second, 'content': ' '},
+    ]})
+    assert response.status_code == 207
+    data = response.get_json()
+    assert (data['submitted'], data['errors']) == (2, 3)
+    assert [result['status'] for result in data['results']] == ['submitted', 'submitted', 'error', 'error', 'error']
+    assert data['results'][0]['verdict'] is False and data['results'][1]['verdict'] is None
+    assert {solution.id for solution in Solution.query} == {result['solution_id'] for result in data['results'][:2]}
+
+    assert student_client.post(f'/category/{grammar}/worksheet', json={'tasks': []}).status_code == 400
+    assert student_client.post(f'/category/{grammar}/worksheet', json={'answers': []}).status_code == 400
+
+
+def test_insert_without_returning(app, student_client, grammar, monkeypatch):
+    """MySQL/MariaDB: INSERT без RETURNING, id решений читаются отдельным запросом"""
+    monkeypatch.setattr(db.engine.dialect, 'insert_executemany_returning', False)
+    first, second = (task.id for task in Task.query.filter_by(category_id=grammar).order_by(Task.task_number))
+    student_client.post(f'/category/{grammar}/worksheet', json={'answers': [{'task_id': first, 'content': 'old'}]})
+
+    response = student_client.post(f'/category/{grammar}/worksheet', json={'answers': [
+        {'task_id': second, 'content': 'My answer'}, {'task_id': first, 'content': 'had left'},
+    ]})
+    assert response.status_code == 201
+    ids = {result['task_id']: result['solution_id'] for result in response.get_json()['results']}
+    assert {task_id: db.session.get(Solution, solution_id).content for task_id, solution_id in ids.items()} \
+        == {second: 'My answer', first: 'had left'}
@@ -0,0 +1,42 @@
+# Процессы выполнения фоновых задач (таблица jobs)
+import argparse
+import multiprocessing
+import signal
+
+from app import create_app
+from app.jobs import work
+
+
+def run_worker(stop, once):
+    # Ctrl+C обрабатывает родительский процесс: воркер доделывает текущую задачу и выходит
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    app = create_app(web=False)
+    with app.app_context():
+        work(stop_when_idle=once, stop=stop)
+
+
+def main():
+    app = create_app(web=False)
+    parser = argparse.ArgumentParser(description='Выполнение фоновых задач приложения')
+    parser.add_argument('--processes', type=int, default=app.config['JOB_WORKERS'], help='число процессов-воркеров')
+    parser.add_argument('--once', action='store_true', help='выполнить готовые задачи и завершиться')
+    args = parser.parse_args()
+
+    stop = multiprocessing.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+    processes = [multiprocessing.Process(target=run_worker, args=(stop, args.once))
+                 for _ in range(max(args.processes, 1))]
+    for process in processes:
+        process.start()
+    print(f'Запущено воркеров: {len(processes)}')
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        stop.set()
+        for process in processes:
+            process.join()
+
+
+if __name__ == '__main__':
+    main()